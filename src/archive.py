@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from src.model import DailyRound, DailyRoundResult, GameResults, Location
+from src.scoring import parse_distance
+
+logger = logging.getLogger(__name__)
+
+DAILIES = "dailies"
+RESULTS = "results"
+
+# numeric columns per table; string columns are stored as offsets into one UTF-8 blob
+NUMERIC_COLUMNS: dict[str, dict[str, str]] = {
+    DAILIES: {"daily_number": "<i4", "round": "<i1", "lat": "<f8", "lng": "<f8", "year": "<i2"},
+    RESULTS: {
+        "daily_number": "<i4", "round": "<i1", "score": "<i4", "year_error": "<i2",
+        "distance_km": "<f8", "recorded_at": "<f8",
+    },
+}
+STRING_COLUMNS: dict[str, tuple[str, ...]] = {
+    DAILIES: ("no", "url", "description", "license", "country", "street_view"),
+    RESULTS: ("bot", "distance"),
+}
+
+
+class StringColumn:
+    """Strings as (start, end) byte offsets into a shared UTF-8 blob; selecting rows never copies the blob."""
+
+    def __init__(self, blob: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        self.blob = blob
+        self.starts = starts
+        self.ends = ends
+        self._codes: Optional[tuple[np.ndarray, list[str]]] = None
+
+    @classmethod
+    def from_strings(cls, values: Sequence[str]) -> StringColumn:
+        encoded = [value.encode("utf-8") for value in values]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        ends = np.cumsum(lengths)
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, ends - lengths, ends)
+
+    @classmethod
+    def concat(cls, columns: Sequence[StringColumn]) -> StringColumn:
+        blobs, starts, ends, shift = [], [], [], 0
+        for column in columns:
+            blobs.append(column.blob)
+            starts.append(column.starts + shift)
+            ends.append(column.ends + shift)
+            shift += len(column.blob)
+        return cls(
+            np.concatenate(blobs) if blobs else np.empty(0, dtype=np.uint8),
+            np.concatenate(starts) if starts else np.empty(0, dtype=np.int64),
+            np.concatenate(ends) if ends else np.empty(0, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> str:
+        return bytes(self.blob[self.starts[index]:self.ends[index]]).decode("utf-8")
+
+    def take(self, index: np.ndarray) -> StringColumn:
+        return StringColumn(self.blob, self.starts[index], self.ends[index])
+
+    def codes(self) -> tuple[np.ndarray, list[str]]:
+        """Dictionary-encodes the column (vectorized): an int code per row plus the sorted distinct values."""
+        if self._codes is None:
+            lengths = self.ends - self.starts
+            width = int(lengths.max()) if len(self) else 0
+            if width == 0:
+                self._codes = (np.zeros(len(self), dtype=np.int32), [""] if len(self) else [])
+            else:
+                # pad every string into a fixed width row, then let np.unique compare the rows as bytes
+                positions = self.starts[:, None] + np.arange(width)[None, :]
+                valid = np.arange(width)[None, :] < lengths[:, None]
+                padded = np.where(valid, self.blob[np.minimum(positions, len(self.blob) - 1)], 0).astype(np.uint8)
+                vocab, codes = np.unique(padded.view(f"S{width}").ravel(), return_inverse=True)
+                self._codes = (codes.astype(np.int32), [v.decode("utf-8") for v in vocab])
+        return self._codes
+
+    def compact(self) -> tuple[np.ndarray, np.ndarray]:
+        """A dense blob and offsets (n + 1) for writing."""
+        lengths = self.ends - self.starts
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if len(self) == 0:
+            return np.empty(0, dtype=np.uint8), offsets
+        index = np.repeat(self.starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return self.blob[index], offsets
+
+
+class Table:
+    """A set of equally long numeric and string columns."""
+
+    def __init__(self, numeric: dict[str, np.ndarray], strings: dict[str, StringColumn]):
+        self.numeric = numeric
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(next(iter(self.numeric.values())))
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.numeric[column]
+
+    def take(self, index: np.ndarray) -> Table:
+        return type(self)(
+            {name: column[index] for name, column in self.numeric.items()},
+            {name: column.take(index) for name, column in self.strings.items()},
+        )
+
+    def between(self, daily_from: Optional[int] = None, daily_to: Optional[int] = None) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if daily_from is not None:
+            mask &= self["daily_number"] >= daily_from
+        if daily_to is not None:
+            mask &= self["daily_number"] <= daily_to
+        return mask
+
+
+class LazyDailyRounds(Sequence[DailyRound]):
+    """`DailyRound` objects built on access from an archived dailies table."""
+
+    def __init__(self, table: DailyTable):
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        t = self.table
+        return DailyRound(
+            No=t.strings["no"][index],
+            URL=t.strings["url"][index],
+            Year=str(int(t["year"][index])),
+            Location=Location(lat=float(t["lat"][index]), lng=float(t["lng"][index])),
+            Description=t.strings["description"][index] or None,
+            License=t.strings["license"][index] or None,
+            Country=t.strings["country"][index] or None,
+            StreetView=t.strings["street_view"][index] or None,
+        )
+
+
+class DailyTable(Table):
+    def filter(self, daily_from: Optional[int] = None, daily_to: Optional[int] = None) -> DailyTable:
+        return self.take(np.flatnonzero(self.between(daily_from, daily_to)))
+
+    def daily_numbers(self) -> np.ndarray:
+        return np.unique(self["daily_number"])
+
+    def rounds(self) -> LazyDailyRounds:
+        return LazyDailyRounds(self)
+
+    def rounds_for(self, daily_number: int) -> list[DailyRound]:
+        table = self.take(np.flatnonzero(self["daily_number"] == daily_number))
+        order = np.argsort(table["round"], kind="stable")
+        return list(table.take(order).rounds())
+
+
+class ResultTable(Table):
+    def filter(
+        self,
+        bot: Optional[str] = None,
+        daily_from: Optional[int] = None,
+        daily_to: Optional[int] = None,
+    ) -> ResultTable:
+        mask = self.between(daily_from, daily_to)
+        if bot is not None:
+            codes, vocab = self.strings["bot"].codes()
+            mask &= codes == (vocab.index(bot) if bot in vocab else -1)
+        return self.take(np.flatnonzero(mask))
+
+    def bots(self) -> list[str]:
+        return self.strings["bot"].codes()[1]
+
+    def totals(self) -> dict[str, dict[int, int]]:
+        """Total score per bot and daily, aggregated without building any models."""
+        codes, vocab = self.strings["bot"].codes()
+        key = codes.astype(np.int64) * 2**32 + self["daily_number"].astype(np.int64)
+        unique, inverse = np.unique(key, return_inverse=True)
+        sums = np.bincount(inverse, weights=self["score"], minlength=len(unique))
+        totals: dict[str, dict[int, int]] = {}
+        for k, total in zip(unique, sums):
+            totals.setdefault(vocab[int(k // 2**32)], {})[int(k % 2**32)] = int(total)
+        return totals
+
+    def game_results(self) -> Iterator[tuple[str, GameResults]]:
+        """Yields (bot, GameResults) per archived game, built one at a time."""
+        codes, vocab = self.strings["bot"].codes()
+        order = np.lexsort((self["round"], self["daily_number"], codes))
+        games = np.stack([codes[order], self["daily_number"][order]], axis=1)
+        boundaries = np.flatnonzero(np.any(np.diff(games, axis=0) != 0, axis=1)) + 1
+        for rows in np.split(order, boundaries):
+            if len(rows) == 0:
+                continue
+            rounds = [
+                DailyRoundResult(
+                    score=int(self["score"][i]),
+                    year=int(self["year_error"][i]),
+                    distance=self.strings["distance"][i],
+                )
+                for i in rows
+            ]
+            yield vocab[codes[rows[0]]], GameResults(
+                daily_number=int(self["daily_number"][rows[0]]),
+                total_score=sum(r.score for r in rounds),
+                rounds=rounds,
+            )
+
+
+@dataclass
+class CompactionStats:
+    segments_before: int
+    rows_before: int
+    rows_after: int
+
+
+class Archive:
+    """
+    Archive of daily answers and bot results under `root`, keyed by daily number.
+    Every append writes a small immutable segment of .npy columns (numeric columns
+    and UTF-8 blobs with offsets), so concurrent writers never conflict. Loading
+    memory-maps the segments; newer rows replace older ones with the same key.
+    `compact` merges all segments of a table into one.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        for kind in (DAILIES, RESULTS):
+            (self.root / kind).mkdir(parents=True, exist_ok=True)
+
+    # ----------------------------
+    # Writing
+    # ----------------------------
+    def append_dailies(self, daily_number: int, rounds: Sequence[DailyRound]) -> None:
+        if not rounds:
+            return
+        n = len(rounds)
+        self._write_segment(DAILIES, {
+            "daily_number": np.full(n, daily_number),
+            "round": np.arange(1, n + 1),
+            "lat": np.array([r.Location.lat for r in rounds]),
+            "lng": np.array([r.Location.lng for r in rounds]),
+            "year": np.array([int(r.Year) for r in rounds]),
+        }, {
+            "no": [r.No for r in rounds],
+            "url": [str(r.URL) for r in rounds],
+            "description": [r.Description or "" for r in rounds],
+            "license": [r.License or "" for r in rounds],
+            "country": [r.Country or "" for r in rounds],
+            "street_view": [str(r.StreetView or "") for r in rounds],
+        })
+
+    def append_results(self, bot: str, results: GameResults, recorded_at: Optional[float] = None) -> None:
+        if not results.rounds:
+            return
+        n = len(results.rounds)
+        self._write_segment(RESULTS, {
+            "daily_number": np.full(n, results.daily_number),
+            "round": np.arange(1, n + 1),
+            "score": np.array([r.score for r in results.rounds]),
+            "year_error": np.array([r.year for r in results.rounds]),
+            "distance_km": np.array([parse_distance(r.distance) for r in results.rounds]),
+            "recorded_at": np.full(n, recorded_at if recorded_at is not None else time.time()),
+        }, {
+            "bot": [bot] * n,
+            "distance": [r.distance for r in results.rounds],
+        })
+
+    def _write_segment(self, kind: str, numeric: dict[str, np.ndarray], strings: dict[str, list[str]]) -> None:
+        name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        table = Table(
+            {column: np.asarray(numeric[column], dtype=dtype) for column, dtype in NUMERIC_COLUMNS[kind].items()},
+            {column: StringColumn.from_strings(strings[column]) for column in STRING_COLUMNS[kind]},
+        )
+        self._write_table(self.root / kind / name, table)
+
+    @staticmethod
+    def _write_table(path: Path, table: Table) -> None:
+        """Writes to a temporary directory first; a segment appears completely or not at all."""
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.mkdir()
+        for column, values in table.numeric.items():
+            np.save(tmp / f"{column}.npy", values)
+        for column, strings in table.strings.items():
+            blob, offsets = strings.compact()
+            np.save(tmp / f"{column}.blob.npy", blob)
+            np.save(tmp / f"{column}.offsets.npy", offsets)
+        (tmp / "meta.json").write_text(json.dumps({"rows": len(table)}))
+        os.rename(tmp, path)
+
+    # ----------------------------
+    # Reading
+    # ----------------------------
+    def _segments(self, kind: str) -> list[Path]:
+        return sorted(p for p in (self.root / kind).iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    @staticmethod
+    def _read_segment(path: Path, kind: str) -> Table:
+        numeric = {
+            column: np.load(path / f"{column}.npy", mmap_mode="r")
+            for column in NUMERIC_COLUMNS[kind]
+        }
+        strings = {}
+        for column in STRING_COLUMNS[kind]:
+            offsets = np.load(path / f"{column}.offsets.npy", mmap_mode="r")
+            blob = np.load(path / f"{column}.blob.npy", mmap_mode="r")
+            strings[column] = StringColumn(blob, offsets[:-1], offsets[1:])
+        return Table(numeric, strings)
+
+    def _load(self, kind: str) -> Table:
+        segments = [self._read_segment(path, kind) for path in self._segments(kind)]
+        if len(segments) == 1:
+            table = segments[0]
+        else:
+            table = Table(
+                {
+                    column: np.concatenate([s.numeric[column] for s in segments])
+                    if segments else np.empty(0, dtype=dtype)
+                    for column, dtype in NUMERIC_COLUMNS[kind].items()
+                },
+                {column: StringColumn.concat([s.strings[column] for s in segments]) for column in STRING_COLUMNS[kind]},
+            )
+        return table.take(self._latest_rows(kind, table))
+
+    @staticmethod
+    def _latest_rows(kind: str, table: Table) -> np.ndarray:
+        """Indexes of the newest row per key, ordered by key (segments are read oldest first)."""
+        key = table["daily_number"].astype(np.int64) * 256 + table["round"].astype(np.int64)
+        if kind == RESULTS:
+            codes, _ = table.strings["bot"].codes()
+            key = codes.astype(np.int64) * 2**40 + key
+        _, last = np.unique(key[::-1], return_index=True)
+        return len(key) - 1 - last
+
+    def dailies(self) -> DailyTable:
+        table = self._load(DAILIES)
+        return DailyTable(table.numeric, table.strings)
+
+    def results(self) -> ResultTable:
+        table = self._load(RESULTS)
+        return ResultTable(table.numeric, table.strings)
+
+    def has_daily(self, daily_number: int) -> bool:
+        return any(
+            bool((np.load(path / "daily_number.npy", mmap_mode="r") == daily_number).any())
+            for path in self._segments(DAILIES)
+        )
+
+    # ----------------------------
+    # Maintenance
+    # ----------------------------
+    def compact(self) -> dict[str, CompactionStats]:
+        """Rewrites each table as one deduplicated segment and removes the old segments."""
+        stats: dict[str, CompactionStats] = {}
+        for kind in (DAILIES, RESULTS):
+            segments = self._segments(kind)
+            if len(segments) <= 1:
+                continue
+            rows_before = sum(json.loads((p / "meta.json").read_text())["rows"] for p in segments)
+            table = self._load(kind)
+            # named after the newest segment, so rows appended meanwhile still sort after it
+            self._write_table(segments[-1].with_name(f"{segments[-1].name}-compacted"), table)
+            for path in segments:
+                shutil.rmtree(path)
+            stats[kind] = CompactionStats(len(segments), rows_before, len(table))
+            logger.info(f"Compacted {kind}: {len(segments)} segments, {rows_before} -> {len(table)} rows")
+        return stats
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    parser = argparse.ArgumentParser(description="Inspect or compact the dailies/results archive")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("root")
+    args = parser.parse_args()
+
+    archive = Archive(args.root)
+    if args.command == "compact":
+        archive.compact()
+
+    start = time.perf_counter()
+    dailies, results = archive.dailies(), archive.results()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{len(dailies.daily_numbers())} dailies, {len(results)} result rows, {len(results.bots())} bots "
+          f"(loaded in {elapsed:.1f}ms)")
+    for bot, totals in results.totals().items():
+        print(f"  {bot}: {len(totals)} games, mean {np.mean(list(totals.values())):.0f} points")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+from src.browser_server import connect_or_launch, endpoint_healthy
+from src.metrics import percentile
+from src.standin import StandInSite
+
+logger = logging.getLogger(__name__)
+
+
+async def time_to_first_navigation(url: str, endpoint: Optional[str]) -> float:
+    """What a scheduled run pays before game logic: Playwright start, browser, context, page and first goto."""
+    start = time.perf_counter()
+    async with async_playwright() as p:
+        browser, _ = await connect_or_launch(p, endpoint, headless=True)
+        try:
+            context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+            page = await context.new_page()
+            await page.goto(url, wait_until="domcontentloaded")
+            elapsed = time.perf_counter() - start
+            await context.close()
+        finally:
+            await browser.close()
+    return elapsed
+
+
+async def start_server(port: int, timeout: float = 30.0) -> asyncio.subprocess.Process:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "src.browser_server", "--port", str(port),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while not await endpoint_healthy(f"http://127.0.0.1:{port}"):
+        if process.returncode is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("Warm browser server did not become healthy")
+        await asyncio.sleep(0.2)
+    return process
+
+
+def report(mode: str, samples: list[float]) -> None:
+    print(
+        f"{mode:>5}: p50={statistics.median(samples) * 1000:7.0f}ms "
+        f"p95={percentile(samples, 95) * 1000:7.0f}ms (n={len(samples)})"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    async with StandInSite() as site:
+        cold = [await time_to_first_navigation(site.base_url, None) for _ in range(args.iterations)]
+        report("cold", cold)
+
+        server = await start_server(args.port)
+        try:
+            endpoint = f"http://127.0.0.1:{args.port}"
+            warm = [await time_to_first_navigation(site.base_url, endpoint) for _ in range(args.iterations)]
+            report("warm", warm)
+        finally:
+            server.terminate()
+            await server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time to first navigation with and without the warm browser server")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--port", type=int, default=9333)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
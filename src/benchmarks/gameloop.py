@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+from src.bots.base import BaseBot
+from src.bots.perfect import PerfectBot
+from src.bots.random_offset import RandomOffsetBot
+from src.custom_types import Guess
+from src.gameloop import GameLoopConfig
+from src.main import run_bots_parallel
+from src.metrics import percentile
+from src.model import DailyRound
+from src.standin import StandInSite
+
+logger = logging.getLogger(__name__)
+
+PHASES = [
+    "browser_launch",
+    "player_start",
+    "go_to_daily",
+    "get_answers",
+    "guess_for_round",
+    "make_guess",
+    "go_to_next_round",
+    "get_results",
+    "send_to_teams",
+]
+
+
+class DelayedBot(BaseBot):
+    """Wraps a bot and adds `latency_ms` (+ up to `jitter_ms`) to every guess, like a remote model would."""
+
+    def __init__(self, bot: BaseBot, latency_ms: float, jitter_ms: float = 0.0):
+        self.bot = bot
+        self.name = bot.name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    async def guess_for_round(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        await asyncio.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+        return await self.bot.guess_for_round(round_index, round_data)
+
+
+def make_bots(args: argparse.Namespace, count: int) -> list[BaseBot]:
+    bots: list[BaseBot] = []
+    for _ in range(count):
+        bot = PerfectBot() if args.bot == "perfect" else RandomOffsetBot(year_jitter=3)
+        bots.append(DelayedBot(bot, args.bot_latency_ms, args.bot_jitter_ms))
+    return bots
+
+
+def summarize(samples: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    return {
+        phase: {
+            "n": len(values),
+            "p50_ms": statistics.median(values) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+        }
+        for phase, values in samples.items()
+        if values
+    }
+
+
+async def measure_browser_launch(iterations: int) -> list[float]:
+    samples: list[float] = []
+    async with async_playwright() as p:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            browser = await p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-setuid-sandbox"])
+            samples.append(time.perf_counter() - start)
+            await browser.close()
+    return samples
+
+
+async def measure_phases(args: argparse.Namespace, config: GameLoopConfig) -> dict[str, list[float]]:
+    samples: dict[str, list[float]] = {phase: [] for phase in PHASES}
+    samples["browser_launch"] = await measure_browser_launch(args.iterations)
+
+    for i in range(args.iterations):
+        loops = await run_bots_parallel(make_bots(args, 1), headless=True, config=config)
+        for loop in loops:
+            for phase, values in loop.phase_seconds.items():
+                samples[phase].extend(values)
+        print(f"  iteration {i + 1}/{args.iterations} done", file=sys.stderr)
+    return samples
+
+
+async def measure_scaling(args: argparse.Namespace, config: GameLoopConfig) -> dict[str, dict[str, float]]:
+    """Wall time of one `run_bots_parallel` call (browser launch included) per number of bots."""
+    scaling: dict[str, dict[str, float]] = {}
+    for count in args.scale:
+        start = time.perf_counter()
+        await run_bots_parallel(make_bots(args, count), headless=True, config=config)
+        elapsed = time.perf_counter() - start
+        scaling[str(count)] = {
+            "wall_s": elapsed,
+            "per_bot_s": elapsed / count,
+            "rounds_per_s": count * config.rounds / elapsed,
+        }
+        print(
+            f"{count:>4} bot(s): {elapsed:7.2f}s wall, {elapsed / count:6.2f}s per bot, "
+            f"{count * config.rounds / elapsed:6.1f} rounds/s"
+        )
+    return scaling
+
+
+def report(summary: dict[str, dict[str, float]]) -> None:
+    for phase in PHASES:
+        if phase in summary:
+            stats = summary[phase]
+            print(f"{phase:>18}: p50={stats['p50_ms']:8.1f}ms p95={stats['p95_ms']:8.1f}ms (n={stats['n']})")
+
+
+def find_regressions(
+    summary: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    slack_ms: float,
+) -> list[str]:
+    """Phases whose p50 or p95 grew by more than `threshold` (relative) and `slack_ms` (absolute)."""
+    regressions: list[str] = []
+    for phase, stats in summary.items():
+        if phase not in baseline:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            before, after = baseline[phase][metric], stats[metric]
+            if after > before * (1 + threshold) and after - before > slack_ms:
+                regressions.append(f"{phase} {metric}: {before:.1f}ms -> {after:.1f}ms")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> int:
+    # every GameLoop logs each step at INFO, keep the benchmark output readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    async with StandInSite(latency_ms=args.network_latency_ms, jitter_ms=args.network_jitter_ms) as site:
+        config = GameLoopConfig(
+            pipeline_guesses=args.pipeline,
+            fast_guess=args.fast_guess,
+            base_url=site.base_url,
+            webhook_url=site.webhook_url,
+        )
+        print(
+            f"Measuring {args.iterations} game(s), bot latency {args.bot_latency_ms}ms, "
+            f"network latency {args.network_latency_ms}ms"
+        )
+        summary = summarize(await measure_phases(args, config))
+        report(summary)
+
+        scaling = await measure_scaling(args, config) if args.scale else {}
+
+    result = {"phases": summary, "scaling": scaling, "args": {
+        k: v for k, v in vars(args).items() if k not in ("baseline", "save_baseline")
+    }}
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2))
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["phases"]
+        regressions = find_regressions(summary, baseline, args.threshold, args.slack_ms)
+        if regressions:
+            print("Regressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No phase regressed more than {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-phase timings of GameLoop runs against the local stand-in")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--bot", choices=["perfect", "random"], default="perfect")
+    parser.add_argument("--bot-latency-ms", type=float, default=0.0, help="Added to every guess_for_round")
+    parser.add_argument("--bot-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--network-latency-ms", type=float, default=0.0, help="Added to every stand-in response")
+    parser.add_argument("--network-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--pipeline", action="store_true", help="Enable GameLoopConfig.pipeline_guesses")
+    parser.add_argument("--fast-guess", action="store_true", help="Enable GameLoopConfig.fast_guess")
+    parser.add_argument(
+        "--scale", type=lambda value: [int(n) for n in value.split(",") if n], default=[1, 4, 16, 64],
+        help="Comma separated bot counts for the scaling run, empty to skip",
+    )
+    parser.add_argument("--save-baseline", help="Write the results as JSON baseline")
+    parser.add_argument("--baseline", help="Compare against a JSON baseline, exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown per phase")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Ignore regressions smaller than this")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
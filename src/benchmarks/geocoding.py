@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+from urllib.parse import parse_qs
+
+from aiohttp import web
+
+from src.geocoders.azure import AzureMapsGeocoder
+from src.geocoders.azure_batch import AzureMapsBatchGeocoder
+from src.http_client import HttpClient
+from src.metrics import percentile
+from src.model import LLMLocation
+from src.rate_control import RateController
+
+logger = logging.getLogger(__name__)
+
+
+def build_stub_app(latency_ms: float, jitter_ms: float, max_parts: int) -> web.Application:
+    """Azure Maps stand-in: queries with more than `max_parts` comma separated parts find nothing."""
+
+    def results_for(query: str) -> dict:
+        if len(query.split(",")) > max_parts:
+            return {"results": []}
+        return {"results": [{"position": {"lat": 48.8566, "lon": 2.3522}}]}
+
+    async def search(request: web.Request) -> web.Response:
+        await asyncio.sleep((latency_ms + random.uniform(0, jitter_ms)) / 1000)
+        return web.json_response(results_for(request.query.get("query", "")))
+
+    async def search_batch(request: web.Request) -> web.Response:
+        await asyncio.sleep((latency_ms + random.uniform(0, jitter_ms)) / 1000)
+        body = await request.json()
+        items = []
+        for item in body["batchItems"]:
+            query = parse_qs(item["query"].lstrip("?")).get("query", [""])[0]
+            items.append({"statusCode": 200, "response": results_for(query)})
+        return web.json_response({"batchItems": items})
+
+    app = web.Application()
+    app.router.add_get("/search/address/json", search)
+    app.router.add_post("/search/address/batch/sync/json", search_batch)
+    return app
+
+
+async def measure(geocoder: AzureMapsGeocoder, locations: list[LLMLocation], iterations: int) -> list[float]:
+    """Time to resolve all `locations` one after another (as the rounds of a game would)."""
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for location in locations:
+            await geocoder.geocode(location)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def measure_batch(geocoder: AzureMapsBatchGeocoder, locations: list[LLMLocation], iterations: int) -> list[float]:
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await geocoder.geocode_many(locations)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(mode: str, samples: list[float]) -> None:
+    print(
+        f"{mode:>10}: p50={statistics.median(samples):7.1f}ms "
+        f"p95={percentile(samples, 95):7.1f}ms max={max(samples):7.1f}ms"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    runner = web.AppRunner(build_stub_app(args.latency_ms, args.jitter_ms, args.max_parts))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{runner.addresses[0][1]}/search/address"
+
+    locations = [
+        LLMLocation(country="France", city=f"Paris {i}", street="Rue de Rivoli", building="Louvre")
+        for i in range(args.rounds)
+    ]
+    print(f"Geocoding {len(locations)} location(s) per iteration")
+    try:
+        # the stub does not throttle, so only the request paths are measured (see rate_limit.py for that)
+        unlimited = RateController("stub", initial_concurrency=64, max_concurrency=64)
+        async with HttpClient() as http:
+            for concurrent in (False, True):
+                geocoder = AzureMapsGeocoder(concurrent=concurrent, search_url=f"{base_url}/json", rate_control=unlimited)
+                geocoder.use_http(http)
+                report("concurrent" if concurrent else "sequential", await measure(geocoder, locations, args.iterations))
+
+            batch_geocoder = AzureMapsBatchGeocoder(batch_url=f"{base_url}/batch/sync/json", rate_control=unlimited)
+            batch_geocoder.use_http(http)
+            report("batch", await measure_batch(batch_geocoder, locations, args.iterations))
+            print(f"{'requests':>10}: {http.stats.format_stats()}")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sequential, concurrent and batch geocoding against a local stub")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5, help="Locations geocoded per iteration")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--max-parts", type=int, default=2, help="Most specific query the stub can resolve")
+    args = parser.parse_args()
+    # settings are read on first use; the stub accepts any key
+    os.environ.setdefault("AZURE_MAPS_KEY", "stub")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# module -> (budget in ms, modules it must not pull in)
+SCENARIOS: dict[str, tuple[float, tuple[str, ...]]] = {
+    "src.main": (150.0, ("playwright", "openai", "aiohttp", "pydantic_settings", "pydantic")),
+    "src.bots.perfect": (400.0, ("openai", "pydantic_settings", "playwright")),
+    "src.gameloop": (1000.0, ("openai", "pydantic_settings")),
+    "src.bots.llm": (2500.0, ("playwright",)),
+}
+
+# module -> budget as a multiple of `import REFERENCE_MODULE` on the same interpreter, so it
+# holds on slow machines too; generous, it catches a heavy dependency creeping into startup
+RELATIVE_BUDGETS: dict[str, float] = {"src.main": 15.0}
+REFERENCE_MODULE = "json"
+
+
+@dataclass
+class ImportProfile:
+    total_ms: float
+    modules: dict[str, float]  # top level package -> cumulative ms
+
+    def heaviest(self, count: int) -> list[tuple[str, float]]:
+        """Heaviest third-party/stdlib packages; `src` itself is the total."""
+        packages = [item for item in self.modules.items() if item[0] != "src"]
+        return sorted(packages, key=lambda item: item[1], reverse=True)[:count]
+
+
+def _clean_env() -> dict[str, str]:
+    # no keys in the environment, so eager settings validation would show up as a failure
+    return {key: value for key, value in os.environ.items() if not key.startswith(("AZURE_", "TEAMS_"))}
+
+
+def _importtime(code: str) -> list[tuple[int, float, str]]:
+    """Runs `code` under -X importtime; returns (depth, cumulative ms, module) per import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=_clean_env(), check=True,
+    )
+    rows: list[tuple[int, float, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((depth, int(cumulative) / 1000, name.strip()))
+    return rows
+
+
+def startup_modules() -> set[str]:
+    """Modules the interpreter imports before any code runs; not charged to a profile."""
+    return {name for _, _, name in _importtime("pass")}
+
+
+def median_ms(module: str, startup: set[str], repeat: int = 5) -> float:
+    return statistics.median(profile(module, startup).total_ms for _ in range(repeat))
+
+
+def profile(module: str, startup: set[str]) -> ImportProfile:
+    rows = _importtime(f"import {module}")
+    modules: dict[str, float] = {}
+    total = 0.0
+    # importtime prints children before their parent; walking backwards visits parents first
+    stack: list[tuple[int, str]] = []
+    for depth, cumulative, name in reversed(rows):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        root = name.split(".")[0]
+        parent_root = stack[-1][1] if stack else None
+        stack.append((depth, root))
+        if name in startup:
+            continue
+        if depth == 0:
+            total += cumulative
+        # charge a package once, where another package first pulled it in
+        if root != parent_root:
+            modules[root] = modules.get(root, 0.0) + cumulative
+    return ImportProfile(total_ms=total, modules=modules)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time per entry module, enforced against budgets")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per module, the median is compared")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest packages to show per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply all budgets, e.g. on slow machines")
+    args = parser.parse_args()
+
+    startup = startup_modules()
+    failures: list[str] = []
+    for module, (budget_ms, forbidden) in SCENARIOS.items():
+        profiles = [profile(module, startup) for _ in range(args.repeat)]
+        total = statistics.median(p.total_ms for p in profiles)
+        loaded = set(profiles[-1].modules)
+        budget = budget_ms * args.scale
+
+        status = "ok" if total <= budget else "OVER BUDGET"
+        print(f"{module:>18}: {total:7.1f}ms (budget {budget:.0f}ms) {status}")
+        for name, ms in profiles[-1].heaviest(args.top):
+            print(f"{'':>20}{name:<20} {ms:7.1f}ms")
+
+        if total > budget:
+            failures.append(f"{module} takes {total:.1f}ms to import, budget {budget:.0f}ms")
+        for name in sorted(loaded.intersection(forbidden)):
+            failures.append(f"{module} imports {name}")
+
+    reference = median_ms(REFERENCE_MODULE, startup, args.repeat)
+    for module, factor in RELATIVE_BUDGETS.items():
+        total = median_ms(module, startup, args.repeat)
+        status = "ok" if total <= factor * reference else "OVER BUDGET"
+        print(f"{module:>18}: {total / reference:7.1f}x import {REFERENCE_MODULE} (budget {factor:.0f}x) {status}")
+        if total > factor * reference:
+            failures.append(f"{module} takes {total / reference:.1f}x import {REFERENCE_MODULE}, budget {factor:.0f}x")
+
+    if failures:
+        print("Import time checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All import time checks passed")
+
+
+if __name__ == "__main__":
+    main()
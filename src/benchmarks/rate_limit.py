@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+from src.http_client import HttpClient, raise_for_status
+from src.metrics import percentile
+from src.rate_control import RateController
+
+logger = logging.getLogger(__name__)
+
+
+def build_throttling_app(rps: float, burst: int, max_concurrent: int, latency_ms: float, jitter_ms: float) -> web.Application:
+    """
+    API stand-in that allows `rps` requests per second (bursts of `burst`) and
+    `max_concurrent` requests in flight; anything beyond gets a 429 with Retry-After,
+    like Azure OpenAI and Azure Maps do.
+    """
+    interval = 1.0 / rps
+    tolerance = (burst - 1) * interval
+    state = {"tat": 0.0, "in_flight": 0, "throttled": 0, "served": 0}
+
+    def throttled(retry_after: float) -> web.Response:
+        state["throttled"] += 1
+        return web.json_response(
+            {"error": {"code": "429", "message": "Rate limit is exceeded."}},
+            status=429,
+            headers={"retry-after-ms": str(math.ceil(retry_after * 1000)), "Retry-After": str(math.ceil(retry_after))},
+        )
+
+    async def handle(request: web.Request) -> web.Response:
+        now = time.monotonic()
+        tat = max(state["tat"], now)
+        if tat - tolerance > now:
+            return throttled(tat - tolerance - now)
+        if state["in_flight"] >= max_concurrent:
+            return throttled(interval)
+        state["tat"] = tat + interval
+        state["in_flight"] += 1
+        try:
+            await asyncio.sleep((latency_ms + random.uniform(0, jitter_ms)) / 1000)
+        finally:
+            state["in_flight"] -= 1
+        state["served"] += 1
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app["state"] = state
+    app.router.add_post("/api", handle)
+    return app
+
+
+@dataclass
+class LoadResult:
+    mode: str
+    ok: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def report(self, server_throttled: int, controller: Optional[RateController]) -> str:
+        rate = self.ok / self.seconds if self.seconds > 0 else 0.0
+        lat = (
+            f"p50={percentile(self.latencies_ms, 50):.0f}ms p95={percentile(self.latencies_ms, 95):.0f}ms"
+            if self.latencies_ms else "no successes"
+        )
+        line = (
+            f"{self.mode:>10}: ok={self.ok} failed={self.failed} in {self.seconds:.1f}s "
+            f"({rate:.1f} req/s), 429s={server_throttled}, {lat}"
+        )
+        if controller is not None:
+            line += f"\n{'':>12}{controller.format_stats()}"
+        return line
+
+
+async def post(session: aiohttp.ClientSession, url: str) -> dict:
+    async with session.post(url, json={"input": "image"}) as resp:
+        await raise_for_status(resp)
+        return await resp.json()
+
+
+async def load(
+    url: str, http: HttpClient, requests: int, callers: int, controller: Optional[RateController]
+) -> LoadResult:
+    """`callers` tasks issue `requests` calls in total, like bots sharing one endpoint."""
+    result = LoadResult("controlled" if controller is not None else "direct")
+    session = await http.start()
+    remaining = iter(range(requests))
+
+    async def caller() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                if controller is None:
+                    await post(session, url)
+                else:
+                    await controller.call(lambda: post(session, url))
+            except aiohttp.ClientError:
+                result.failed += 1
+            else:
+                result.ok += 1
+                result.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(callers)))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+async def run(args: argparse.Namespace) -> bool:
+    app = build_throttling_app(args.server_rps, args.server_burst, args.server_concurrency, args.latency_ms, args.jitter_ms)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}/api"
+    state = app["state"]
+
+    print(
+        f"Stub allows {args.server_rps:g} req/s (burst {args.server_burst}) and {args.server_concurrency} in flight; "
+        f"{args.callers} callers send {args.requests} requests"
+    )
+    try:
+        async with HttpClient(limit_per_host=args.callers) as http:
+            direct = await load(url, http, args.requests, args.callers, None)
+            print(direct.report(state["throttled"], None))
+
+            await asyncio.sleep(2)  # let the stub's bucket refill
+            state["throttled"] = 0
+            controller = RateController(
+                "stub",
+                requests_per_second=args.client_rps,
+                burst=args.server_burst,
+                initial_concurrency=args.initial_concurrency,
+                max_concurrency=args.callers,
+                max_attempts=args.max_attempts,
+            )
+            controlled = await load(url, http, args.requests, args.callers, controller)
+            print(controlled.report(state["throttled"], controller))
+    finally:
+        await runner.cleanup()
+
+    rate = controlled.ok / controlled.seconds
+    print(f"Sustained {rate:.1f} req/s = {rate / args.server_rps:.0%} of the stub's limit")
+    return controlled.failed == 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test of src.rate_control against a throttling stub")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--callers", type=int, default=32, help="Concurrent callers (bots x rounds)")
+    parser.add_argument("--server-rps", type=float, default=20.0)
+    parser.add_argument("--server-burst", type=int, default=5)
+    parser.add_argument("--server-concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--client-rps", type=float, default=30.0,
+        help="Configured client rate, deliberately above the stub's so throttling has to be handled",
+    )
+    parser.add_argument("--initial-concurrency", type=float, default=16)
+    parser.add_argument("--max-attempts", type=int, default=8)
+    ok = asyncio.run(run(parser.parse_args()))
+    if not ok:
+        print("Rate-controlled requests failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    main()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from functools import partial
+
+from src.benchmarks.gameloop import DelayedBot
+from src.bots.perfect import PerfectBot
+from src.gameloop import GameLoopConfig
+from src.sharding import run_bots_sharded
+from src.standin import StandInSite
+
+logger = logging.getLogger(__name__)
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+
+    factories = [partial(DelayedBot, PerfectBot(), args.bot_latency_ms) for _ in range(args.bots)]
+    # the stand-in runs in this process; workers reach it over localhost
+    async with StandInSite(latency_ms=args.network_latency_ms) as site:
+        config = GameLoopConfig(pipeline_guesses=True, base_url=site.base_url, webhook_url=site.webhook_url)
+        print(f"{args.bots} bot(s), {config.rounds} rounds each")
+        for workers in args.workers:
+            start = time.perf_counter()
+            outcomes = await run_bots_sharded(factories, workers=workers, config=config)
+            elapsed = time.perf_counter() - start
+            ok = sum(outcome.ok for outcome in outcomes)
+            print(
+                f"{workers:>3} worker(s): {elapsed:7.2f}s, {ok * config.rounds / elapsed:6.1f} rounds/s, "
+                f"{ok}/{len(outcomes)} games ok"
+            )
+        print(f"Aggregated Teams messages received: {len(site.webhook_messages)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput of the sharded runner per worker count")
+    parser.add_argument("--bots", type=int, default=32)
+    parser.add_argument(
+        "--workers", type=lambda value: [int(n) for n in value.split(",") if n], default=[1, 2, 4, 8],
+        help="Comma separated worker counts",
+    )
+    parser.add_argument("--bot-latency-ms", type=float, default=0.0)
+    parser.add_argument("--network-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
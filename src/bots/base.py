@@ -1,14 +1,28 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from src.model import DailyRound
 from src.custom_types import Guess
 
+if TYPE_CHECKING:
+    from src.http_client import HttpClient
+
 
 class BaseBot(ABC):
     name: str = "BaseBot"
+    # settings keys the bot cannot work without, validated before a run starts
+    required_settings: tuple[str, ...] = ()
+    http: Optional[HttpClient] = None
+
+    def use_http(self, http: HttpClient) -> None:
+        """Injects the shared HTTP session of the run."""
+        self.http = http
+
+    def run_summary(self) -> Optional[str]:
+        """Optional statistics the bot wants to report at the end of a run."""
+        return None
 
     @abstractmethod
     async def guess_for_round(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
@@ -16,3 +30,17 @@ class BaseBot(ABC):
         Returns: (Location, Year)
         """
         raise NotImplementedError
+
+    async def hedge_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        """
+        Duplicate of a guess that runs past its usual latency, raced against it.
+        Override when the duplicate must not join the slow call (e.g. a shared cache entry).
+        """
+        return await self.guess_for_round(round_index, round_data)
+
+    async def fallback_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Optional[Guess]:
+        """
+        Cheap guess for a round whose budget ran out or whose guess failed.
+        None when the bot has no fallback, the round then fails as before.
+        """
+        return None
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from src.bots.llm import LLMBot
+from src.custom_types import Guess
+from src.model import DailyRound, LLMGuessResponse, LLMLocation, Location
+from src.rate_control import deadline
+from src.tasks import cancel_and_reap
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EnsembleStats:
+    rounds: int = 0
+    samples: int = 0
+    failed_samples: int = 0
+    early_stops: int = 0
+    distinct_locations: int = 0
+
+    def format_stats(self) -> str:
+        per_round = self.samples / self.rounds if self.rounds else 0.0
+        return (
+            f"rounds={self.rounds}, samples={self.samples} ({per_round:.1f}/round), failed={self.failed_samples}, "
+            f"early stops={self.early_stops}, distinct locations={self.distinct_locations}"
+        )
+
+
+def spherical_geometric_median(
+    lat: np.ndarray, lng: np.ndarray, weights: Optional[np.ndarray] = None, iterations: int = 200, tol: float = 1e-9
+) -> tuple[float, float]:
+    """
+    Point minimizing the weighted sum of great-circle distances to the given points
+    (degrees): Weiszfeld's iteration in the tangent plane of the current estimate, all
+    points at once. Robust to an outlying sample, unlike the mean: with three of five
+    samples in Paris it stays in Paris.
+    """
+    lat_r, lng_r = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lng, dtype=np.float64))
+    points = np.column_stack((np.cos(lat_r) * np.cos(lng_r), np.cos(lat_r) * np.sin(lng_r), np.sin(lat_r)))
+    w = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    # Weiszfeld only creeps towards an optimum at a sample, so test the samples first: one is
+    # the median when the pull of all others (sum of weighted unit directions) is at most its weight
+    cos_pair = np.clip(points @ points.T, -1.0, 1.0)
+    tangents = points[None, :, :] - cos_pair[:, :, None] * points[:, None, :]
+    norms = np.linalg.norm(tangents, axis=2)
+    directions = np.divide(tangents, norms[:, :, None], out=np.zeros_like(tangents), where=norms[:, :, None] > 1e-12)
+    pull = np.linalg.norm((w[None, :, None] * directions).sum(axis=1), axis=1)
+    slack = (w[None, :] * (cos_pair >= 1 - 1e-12)).sum(axis=1) - pull
+    if slack.max() >= 0:
+        x, y, z = points[np.argmax(slack)]
+        return float(np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))), float(np.degrees(np.arctan2(y, x)))
+
+    median = w @ points
+    if np.linalg.norm(median) < 1e-12:  # samples cancel out (e.g. antipodal), start at the heaviest
+        median = points[np.argmax(w)]
+    median = median / np.linalg.norm(median)
+    for _ in range(iterations):
+        cos_angle = np.clip(points @ median, -1.0, 1.0)
+        angles = np.arccos(cos_angle)
+        tangents = points - cos_angle[:, None] * median
+        norms = np.linalg.norm(tangents, axis=1)
+        far = angles > 1e-12  # a point at the estimate does not pull
+        if not far.any():
+            break
+        # unit directions towards the points, weighted by w / distance (Weiszfeld)
+        step = (w[far, None] * tangents[far] / norms[far, None]).sum(axis=0) / (w[far] / angles[far]).sum()
+        length = np.linalg.norm(step)
+        if length < tol:
+            break
+        median = np.cos(length) * median + np.sin(length) * step / length
+        median /= np.linalg.norm(median)
+
+    x, y, z = median
+    return float(np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))), float(np.degrees(np.arctan2(y, x)))
+
+
+def robust_year(years: list[int], trim: float = 0.0) -> int:
+    """Median of the years, or with `trim` > 0 the mean after dropping that fraction at both ends."""
+    values = np.sort(np.asarray(years, dtype=np.float64))
+    if trim <= 0:
+        return int(round(float(np.median(values))))
+    cut = min(int(len(values) * trim), (len(values) - 1) // 2)
+    return int(round(float(values[cut:len(values) - cut].mean())))
+
+
+def _location_key(location: LLMLocation) -> tuple[str, ...]:
+    return tuple(query.casefold() for query in location._build_query_strings())
+
+
+class EnsembleLLMBot(LLMBot):
+    """
+    Asks the model `samples` times per image (at most `max_concurrent_samples` of them at
+    once, on one downloaded image and the bot's one client; the rate controller limits
+    the bot as a whole), stops early once `agreement`
+    samples name the same place, geocodes the distinct places and combines them with a
+    spherical geometric median; the year is the median (or trimmed mean) of the samples.
+    """
+
+    name = "GPT 5.2 Ensemble 🤖"
+
+    def __init__(
+        self,
+        samples: int = 5,
+        max_concurrent_samples: int = 3,
+        agreement: int = 3,
+        year_trim: float = 0.0,
+        **kwargs: Any,
+    ):
+        # identical cached answers would defeat sampling
+        kwargs.setdefault("use_cache", False)
+        super().__init__(**kwargs)
+        self.samples = max(1, samples)
+        self.agreement = max(1, min(agreement, self.samples))
+        self.year_trim = year_trim
+        self.max_concurrent_samples = max(1, max_concurrent_samples)
+        self.ensemble_stats = EnsembleStats()
+
+    def run_summary(self) -> Optional[str]:
+        return f"Ensemble: {self.ensemble_stats.format_stats()}, {super().run_summary()}"
+
+    async def _guess(self, round_index: int, round_data: Optional[DailyRound], hedge: bool) -> Guess:
+        if round_data is None:
+            raise ValueError("EnsembleLLMBot requires round_data to get the image URL")
+
+        url = str(round_data.URL)
+        with deadline(self.round_timeout):
+            image = await self._fetch_image(url)
+            answers = await self._sample(image.data_uri)
+            self.ensemble_stats.rounds += 1
+            year = robust_year([answer.year for answer in answers], self.year_trim)
+
+            counts = Counter(_location_key(answer.location) for answer in answers)
+            distinct: dict[tuple[str, ...], LLMLocation] = {}
+            for answer in answers:
+                distinct.setdefault(_location_key(answer.location), answer.location)
+            self.ensemble_stats.distinct_locations += len(distinct)
+            # the majority answer, should geocoding not finish in time (see LLMBot.fallback_guess)
+            majority = distinct[counts.most_common(1)[0][0]]
+            self._pending_answers[url] = LLMGuessResponse(location=majority, year=year)
+            found = await self.geocoder.geocode_many(list(distinct.values()))
+
+        located = [(location, counts[key]) for key, location in zip(distinct, found) if location is not None]
+        if not located:
+            raise ValueError(f"No coordinates found for any of the sampled locations: {list(distinct.values())}")
+        lat, lng = spherical_geometric_median(
+            np.array([location.lat for location, _ in located]),
+            np.array([location.lng for location, _ in located]),
+            np.array([count for _, count in located], dtype=np.float64),
+        )
+        logger.info(
+            f"Round {round_index}: {len(answers)} sample(s), {len(distinct)} distinct location(s) "
+            f"-> lat={lat:.4f}, lng={lng:.4f}, year={year}"
+        )
+
+        self._pending_answers.pop(url, None)
+        return (Location(lat=lat, lng=lng), year)
+
+    async def _sample(self, image_uri: str) -> list[LLMGuessResponse]:
+        """
+        Up to `samples` model answers; calls not yet started are dropped (and running ones
+        cancelled) as soon as `agreement` answers name the same place.
+        """
+        answers: list[LLMGuessResponse] = []
+        votes: Counter[tuple[str, ...]] = Counter()
+        agreed = False
+        # per image, so pipelined rounds don't queue behind each other
+        slots = asyncio.Semaphore(self.max_concurrent_samples)
+
+        async def sample() -> None:
+            nonlocal agreed
+            async with slots:
+                if agreed:
+                    return  # queued behind the cap, no longer needed
+                self.ensemble_stats.samples += 1
+                answer, _ = await self._timed_parse_guess(image_uri)
+            answers.append(answer)
+            key = _location_key(answer.location)
+            votes[key] += 1
+            agreed = agreed or votes[key] >= self.agreement
+
+        tasks = [asyncio.create_task(sample()) for _ in range(self.samples)]
+        error: Optional[BaseException] = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    await next_done
+                except Exception as e:
+                    self.ensemble_stats.failed_samples += 1
+                    error = e
+                if agreed:
+                    break
+        finally:
+            if agreed and len(answers) < self.samples:
+                self.ensemble_stats.early_stops += 1
+            cancel_and_reap(tasks)
+
+        if not answers:
+            assert error is not None
+            raise error
+        return answers
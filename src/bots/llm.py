@@ -1,22 +1,30 @@
 from __future__ import annotations
 
-import base64
+import asyncio
+import logging
 from typing import Optional
 
-import aiohttp
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from src.bots.base import BaseBot
 from src.custom_types import Guess
+from src.geocoders.base import BaseGeocoder
+from src.geocoders.registry import create_geocoder
+from src.http_client import HttpClient
+from src.images import ImagePayload, ImagePipeline
+from src.llm_cache import LLMResponseCache, LLMResult, llm_cache_key
 from src.model import (
-    AzureMapsResponse,
-    AzureMapsResult,
     DailyRound,
     LLMGuessResponse,
     LLMLocation,
     Location,
 )
-from src.settings import settings
+from src.rate_control import DeadlineExceeded, RateController, deadline
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are an AI assisstant that helps me to play TimeGuessr. TimeGuessr is a game where you have to guess a location and year, based on a given image. Your goal is to estimate both of them, by considering the details in the image together with the world events. In your final answer, do not explain your answer, since I am using the location in an url."
 
 
 class LLMBot(BaseBot):
@@ -27,35 +35,164 @@ class LLMBot(BaseBot):
 
     name = "GPT 5.2 🤖"
 
-    def __init__(self):
-        self.client = OpenAI(
-            base_url=settings.AZURE_OPENAI_ENDPOINT,
-            api_key=settings.AZURE_OPENAI_API_KEY,
+    def __init__(
+        self,
+        request_timeout: float = 300.0,
+        max_retries: int = 2,
+        geocoder: Optional[BaseGeocoder] = None,
+        image_pipeline: Optional[ImagePipeline] = None,
+        model: str = "gpt-5.2-chat",
+        reasoning_effort: str = "medium",
+        response_cache: Optional[LLMResponseCache] = None,
+        use_cache: bool = True,
+        rate_control: Optional[RateController] = None,
+        round_timeout: Optional[float] = None,
+        fallback_reasoning_effort: str = "low",
+    ):
+        settings = get_settings()
+        self.request_timeout = request_timeout
+        # bounds a whole guess including backoff, on top of any deadline of the caller
+        self.round_timeout = round_timeout
+        self.model = model
+        self.reasoning_effort = reasoning_effort
+        self.fallback_reasoning_effort = fallback_reasoning_effort
+        # model answers per image URL whose round is not finished yet, for a country-level fallback
+        self._pending_answers: dict[str, LLMGuessResponse] = {}
+        if response_cache is None and use_cache and settings.LLM_CACHE_PATH:
+            response_cache = LLMResponseCache.shared(settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL_SECONDS)
+        # use_cache=False bypasses the cache, e.g. for deliberately stochastic runs
+        self.response_cache = response_cache if use_cache else None
+        self.geocoder = geocoder or create_geocoder(settings.GEOCODER)
+        self.image_pipeline = image_pipeline or ImagePipeline.shared(
+            cache_dir=settings.IMAGE_CACHE_DIR,
+            max_edge=settings.IMAGE_MAX_EDGE,
+            quality=settings.IMAGE_QUALITY,
         )
+        # settings this bot needs, validated before a run starts
+        self.required_settings = ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_KEY", *self.geocoder.required_settings)
+        # all bots on the same deployment share its rate limit
+        # (Azure enforces the per-minute quota per 10 seconds, so a sixth of it may start at once)
+        self.rate_control = rate_control or RateController.shared(
+            f"Azure OpenAI {settings.AZURE_OPENAI_ENDPOINT}",
+            requests_per_second=settings.AZURE_OPENAI_REQUESTS_PER_MINUTE / 60,
+            burst=max(1, int(settings.AZURE_OPENAI_REQUESTS_PER_MINUTE / 6)),
+            max_attempts=max_retries + 1,
+        )
+        self._client: Optional[AsyncOpenAI] = None
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Created on first use, so missing keys are reported by the settings validation of the run."""
+        if self._client is None:
+            settings = get_settings()
+            # retries are left to the rate controller, so it sees every 429 and Retry-After
+            self._client = AsyncOpenAI(
+                base_url=settings.required("AZURE_OPENAI_ENDPOINT"),
+                api_key=settings.required("AZURE_OPENAI_API_KEY"),
+                timeout=self.request_timeout,
+                max_retries=0,
+            )
+        return self._client
+
+    def use_http(self, http: HttpClient) -> None:
+        super().use_http(http)
+        self.geocoder.use_http(http)
+
+    def run_summary(self) -> Optional[str]:
+        summaries = [
+            f"Images: {self.image_pipeline.stats.format_stats()}",
+            f"Rate control: {self.rate_control.format_stats()}",
+            self.geocoder.run_summary(),
+        ]
+        if self.response_cache is not None:
+            summaries.append(f"LLM cache: {self.response_cache.stats.format_stats()}")
+        return ", ".join(s for s in summaries if s)
 
     async def guess_for_round(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        return await self._guess(round_index, round_data, hedge=False)
+
+    async def hedge_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        """A separate model call; joining the slow one in the response cache would not cut the tail."""
+        return await self._guess(round_index, round_data, hedge=True)
+
+    async def fallback_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Optional[Guess]:
+        """
+        Geocodes only the country of the model's answer when it arrived but geocoding did not
+        finish, otherwise asks the model again with `fallback_reasoning_effort`.
+        """
+        if round_data is None:
+            return None
+        url = str(round_data.URL)
+        answer = self._pending_answers.pop(url, None)
+        if answer is None:
+            image = await self._fetch_image(url)
+            answer, _ = await self._timed_parse_guess(image.data_uri, self.fallback_reasoning_effort)
+        country = LLMLocation(country=answer.location.country, city="")
+        return (await self._location_to_coordinates(country), answer.year)
+
+    async def _guess(self, round_index: int, round_data: Optional[DailyRound], hedge: bool) -> Guess:
         if round_data is None:
             raise ValueError("LLMBot requires round_data to get the image URL")
 
-        image_url = str(round_data.URL)
-        img_uri = await self._download_image_base64(image_url)
+        url = str(round_data.URL)
+        with deadline(self.round_timeout):
+            image = await self._fetch_image(url)
+            logger.info(
+                f"Round {round_index} image: {image.original_bytes}B original, {image.downloaded_bytes}B downloaded, "
+                f"{image.sent_bytes}B sent (saved {image.saved_download_bytes}B download, {image.saved_upload_bytes}B upload)"
+            )
 
-        llm_response: LLMGuessResponse = self._get_llm_guess(img_uri)
-        location: Location = await self._location_to_coordinates(llm_response.location)
+            llm_response: LLMGuessResponse = await self._get_llm_guess(image, shared=not hedge)
+            self._pending_answers[url] = llm_response
+            location: Location = await self._location_to_coordinates(llm_response.location)
 
+        self._pending_answers.pop(url, None)
         return (location, llm_response.year)
 
-    def _get_llm_guess(self, image_uri: str) -> LLMGuessResponse:
-        """Get structured guess from the LLM using the image."""
-        response = self.client.responses.parse(
-            model="gpt-5.2-chat",
+    async def _get_llm_guess(self, image: ImagePayload, shared: bool = True) -> LLMGuessResponse:
+        """
+        Get structured guess from the LLM using the image.
+        Awaits the async client so other bots keep running on the event loop while
+        the model reasons. Each attempt is bounded by `request_timeout`; throttled
+        attempts are retried by the rate controller until the round deadline.
+        Cancelling the calling task aborts the request.
+        Answers are served from the response cache when one is configured; with
+        `shared=False` a new call is made (and cached) even if one is in flight.
+        """
+        if self.response_cache is None:
+            answer, _ = await self._timed_parse_guess(image.data_uri)
+            return answer
+
+        key = llm_cache_key(image.content_id, SYSTEM_PROMPT, self.model, self.reasoning_effort)
+        if not shared:
+            result = await self._timed_parse_guess(image.data_uri)
+            await asyncio.to_thread(self.response_cache.put, key, result)
+            return result[0]
+        return await self.response_cache.get_or_compute(key, lambda: self._timed_parse_guess(image.data_uri))
+
+    async def _timed_parse_guess(self, image_uri: str, reasoning_effort: Optional[str] = None) -> LLMResult:
+        effort = reasoning_effort or self.reasoning_effort
+        try:
+            return await self.rate_control.call(
+                lambda: asyncio.wait_for(self._parse_guess(image_uri, effort), timeout=self.request_timeout)
+            )
+        except DeadlineExceeded:
+            logger.error("LLM guess did not finish before the round deadline")
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"LLM guess timed out after {self.request_timeout}s")
+            raise
+
+    async def _parse_guess(self, image_uri: str, reasoning_effort: str) -> LLMResult:
+        response = await self.client.responses.parse(
+            model=self.model,
             input=[
                 {
                     "role": "developer",
                     "content": [
                         {
                             "type": "input_text",
-                            "text": "You are an AI assisstant that helps me to play TimeGuessr. TimeGuessr is a game where you have to guess a location and year, based on a given image. Your goal is to estimate both of them, by considering the details in the image together with the world events. In your final answer, do not explain your answer, since I am using the location in an url.",
+                            "text": SYSTEM_PROMPT,
                         }
                     ],
                 },
@@ -70,7 +207,7 @@ class LLMBot(BaseBot):
                 },
             ],  # ty:ignore[invalid-argument-type]
             text_format=LLMGuessResponse,
-            reasoning={"effort": "medium"},
+            reasoning={"effort": reasoning_effort},  # ty:ignore[invalid-argument-type]
             tools=[],
             store=True,
             include=["reasoning.encrypted_content", "web_search_call.action.sources"],  # ty:ignore[invalid-argument-type]
@@ -80,72 +217,16 @@ class LLMBot(BaseBot):
         if answer is None:
             raise ValueError("No answer received from the model.")
 
-        return answer
-
-    async def _download_image_base64(self, url: str) -> str:
-        """Download an image from a URL and return it as a data URI for OpenAI."""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status < 200 or resp.status >= 300:
-                    text = await resp.text()
-                    raise aiohttp.ClientResponseError(
-                        request_info=resp.request_info,
-                        history=resp.history,
-                        status=resp.status,
-                        message=text,
-                        headers=resp.headers,
-                    )
-                content = await resp.read()
-                content_type = resp.headers.get("Content-Type", "image/jpeg")
-                base64_data = base64.b64encode(content).decode("utf-8")
-                return f"data:{content_type};base64,{base64_data}"
-
-    async def _azure_maps_search(
-        self,
-        session: aiohttp.ClientSession,
-        query: str,
-        *,
-        base_url: str = "https://atlas.microsoft.com/search/address/json",
-    ) -> list[AzureMapsResult]:
-        """
-        Async GET request to Azure Maps Search API.
-        """
-        params = {
-            "subscription-key": settings.AZURE_MAPS_KEY,
-            "api-version": "1.0",
-            "language": "en-US",
-            "query": query,
-        }
-
-        async with session.get(base_url, params=params) as resp:
-            if resp.status < 200 or resp.status >= 300:
-                text = await resp.text()
-                raise aiohttp.ClientResponseError(
-                    request_info=resp.request_info,
-                    history=resp.history,
-                    status=resp.status,
-                    message=text,
-                    headers=resp.headers,
-                )
-
-            data = await resp.json()
-            response_obj = AzureMapsResponse.model_validate(data)
-            return response_obj.results
+        total_tokens = response.usage.total_tokens if response.usage else 0
+        return answer, total_tokens
+
+    async def _fetch_image(self, url: str) -> ImagePayload:
+        """Download (or load from cache) the round image as a data URI for OpenAI."""
+        return await self.image_pipeline.fetch(url, self.http)
 
     async def _location_to_coordinates(self, location: LLMLocation) -> Location:
         """
-        Tries progressively less specific queries until Azure Maps returns a result.
+        Converts the LLM location to coordinates with the configured geocoder.
         Raises ValueError if nothing can be found even with the country-only fallback.
         """
-        queries = location._build_query_strings()
-
-        timeout = aiohttp.ClientTimeout(total=15)
-
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            for q in queries:
-                results = await self._azure_maps_search(session, q)
-                if results:
-                    r: AzureMapsResult = results[0]
-                    return Location(lat=r.position.lat, lng=r.position.lon)
-
-        raise ValueError(f"No coordinates found for location using fallbacks: {queries}")
\ No newline at end of file
+        return await self.geocoder.geocode(location)
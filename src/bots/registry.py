@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.bots.base import BaseBot
+
+# Bots by name as "module:Class"; a bot's module (and e.g. openai for the LLM bot)
+# is only imported when the bot is selected
+BOTS: dict[str, str] = {
+    "perfect": "src.bots.perfect:PerfectBot",
+    "random_offset": "src.bots.random_offset:RandomOffsetBot",
+    "llm": "src.bots.llm:LLMBot",
+    "ensemble": "src.bots.ensemble:EnsembleLLMBot",
+}
+
+
+def create_bot(name: str, **kwargs: Any) -> BaseBot:
+    try:
+        target = BOTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown bot {name!r}, choose from {', '.join(BOTS)}") from None
+
+    module_name, class_name = target.split(":")
+    bot_class = getattr(importlib.import_module(module_name), class_name)
+    return bot_class(**kwargs)
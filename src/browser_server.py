@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import aiohttp
+from playwright.async_api import Browser, Error as PlaywrightError, Playwright, async_playwright
+
+from src.metrics import format_bytes, process_tree_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = ["--no-sandbox", "--disable-setuid-sandbox"]
+
+
+async def endpoint_healthy(endpoint: str, timeout: float = 2.0) -> bool:
+    """True when a Chromium DevTools endpoint answers /json/version."""
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.get(f"{endpoint.rstrip('/')}/json/version") as resp:
+                return resp.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
+
+async def connect_or_launch(
+    playwright: Playwright,
+    endpoint: Optional[str],
+    headless: bool = True,
+    connect_timeout_ms: int = 5000,
+) -> tuple[Browser, bool]:
+    """
+    Attaches to the warm browser at `endpoint` over CDP, or launches a browser when
+    there is no endpoint or it is unhealthy. Returns the browser and whether it is shared;
+    closing a shared browser only disconnects from it.
+    """
+    if endpoint:
+        if await endpoint_healthy(endpoint):
+            try:
+                browser = await playwright.chromium.connect_over_cdp(endpoint, timeout=connect_timeout_ms)
+                logger.info(f"Attached to warm browser at {endpoint}")
+                return browser, True
+            except PlaywrightError as e:
+                logger.warning(f"Attaching to {endpoint} failed, launching a browser instead: {e}")
+        else:
+            logger.warning(f"Warm browser at {endpoint} is not healthy, launching a browser instead")
+
+    logger.info(f"Launching browser (headless={headless})")
+    browser = await playwright.chromium.launch(headless=headless, args=LAUNCH_ARGS if headless else None)
+    return browser, False
+
+
+class BrowserServer:
+    """
+    Keeps a Chromium running with remote debugging on `port` for `run_bots_parallel`
+    to attach to. The browser is relaunched when the health check fails, and
+    recycled after `recycle_seconds` or once the process tree exceeds `max_rss_bytes`,
+    as soon as no run has a context or page open. Runs attaching during a relaunch fall back
+    to launching their own browser.
+    """
+
+    def __init__(
+        self,
+        port: int = 9222,
+        headless: bool = True,
+        health_interval: float = 30.0,
+        recycle_seconds: float = 6 * 3600,
+        max_rss_bytes: Optional[int] = None,
+    ):
+        self.port = port
+        self.headless = headless
+        self.health_interval = health_interval
+        self.recycle_seconds = recycle_seconds
+        self.max_rss_bytes = max_rss_bytes
+        self.endpoint = f"http://127.0.0.1:{port}"
+
+        self.browser: Optional[Browser] = None
+        self.launched_at = 0.0
+        self.launches = 0
+
+    async def _launch(self, playwright: Playwright) -> None:
+        start = time.perf_counter()
+        self.browser = await playwright.chromium.launch(
+            headless=self.headless,
+            args=[*LAUNCH_ARGS, f"--remote-debugging-port={self.port}", "--remote-debugging-address=127.0.0.1"],
+        )
+        self.launched_at = time.monotonic()
+        self.launches += 1
+        logger.info(f"Warm browser #{self.launches} listening on {self.endpoint} ({time.perf_counter() - start:.2f}s)")
+
+    async def _close(self) -> None:
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except PlaywrightError as e:
+                logger.debug(f"Closing the warm browser failed: {e}")
+            self.browser = None
+
+    async def _busy(self) -> bool:
+        """
+        True while a run uses the browser: it has a context of its own (ContextPool opens
+        them as the run attaches, before any page navigates) or any page open, even a
+        blank one. The server itself opens neither. When the browser cannot be asked it
+        counts as busy, so recycling waits for the next check.
+        """
+        if self.browser is None:
+            return False
+        try:
+            session = await self.browser.new_browser_cdp_session()
+            try:
+                contexts = (await session.send("Target.getBrowserContexts"))["browserContextIds"]
+                targets = (await session.send("Target.getTargets"))["targetInfos"]
+            finally:
+                await session.detach()
+        except PlaywrightError as e:
+            logger.warning(f"Could not check whether the warm browser is in use: {e}")
+            return True
+        return bool(contexts) or any(t.get("type") == "page" for t in targets)
+
+    def _recycle_reason(self) -> Optional[str]:
+        age = time.monotonic() - self.launched_at
+        if age > self.recycle_seconds:
+            return f"age {age / 3600:.1f}h"
+        rss = process_tree_rss_bytes()
+        if self.max_rss_bytes and rss and rss > self.max_rss_bytes:
+            return f"RSS {format_bytes(rss)}"
+        return None
+
+    async def serve(self) -> None:
+        async with async_playwright() as p:
+            await self._launch(p)
+            try:
+                while True:
+                    await asyncio.sleep(self.health_interval)
+                    if self.browser is None or not self.browser.is_connected() or not await endpoint_healthy(self.endpoint):
+                        logger.warning("Warm browser failed its health check, relaunching")
+                        await self._close()
+                        await self._launch(p)
+                        continue
+
+                    reason = self._recycle_reason()
+                    if reason and not await self._busy():
+                        logger.info(f"Recycling warm browser ({reason})")
+                        await self._close()
+                        await self._launch(p)
+            finally:
+                await self._close()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    parser = argparse.ArgumentParser(description="Keep a warm Chromium running for scheduled bot runs")
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--health-interval", type=float, default=30.0, help="Seconds between health checks")
+    parser.add_argument("--recycle-hours", type=float, default=6.0)
+    parser.add_argument("--max-rss-mb", type=int, help="Recycle once the browser uses more memory than this")
+    args = parser.parse_args()
+
+    server = BrowserServer(
+        port=args.port,
+        headless=not args.headed,
+        health_interval=args.health_interval,
+        recycle_seconds=args.recycle_hours * 3600,
+        max_rss_bytes=args.max_rss_mb * 1024 * 1024 if args.max_rss_mb else None,
+    )
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
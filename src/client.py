@@ -1,62 +1,212 @@
 from __future__ import annotations
 
 import json
-from typing import List
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Iterable, List, Optional, TypeVar
 
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Error as PlaywrightError, Page, TimeoutError as PlaywrightTimeoutError
 
 from src.model import DailyRound, Location, DailyRoundResult, GameResults
 from src.custom_types import Year
 import logging
 
+T = TypeVar("T")
+
+DEFAULT_BASE_URL = "https://timeguessr.com/"
+ROUND_NAMES = ["one", "two", "three", "four", "five"]
+RESULT_FIELDS = ["Total", "Year", "Distance"]
+SNAPSHOT_KEYS = ["dailyArray", "dailyNumber"] + [f"{r}{f}" for r in ROUND_NAMES for f in RESULT_FIELDS]
+
+COORDS_SET_JS = "() => typeof localStorage.getItem('coords') === 'string' && localStorage.getItem('coords').length > 0"
+MAP_READY_JS = "() => window.mapkit && Array.isArray(mapkit.maps) && mapkit.maps.length > 0"
+
+# Resolves with "dialog" when the cookie dialog is shown, or "ready" once the map is usable
+CONSENT_OR_READY_JS = """() => {
+    const dialog = document.querySelector(".fc-dialog.fc-choice-dialog");
+    if (dialog && dialog.getClientRects().length > 0) return "dialog";
+    const mapReady = window.mapkit && Array.isArray(mapkit.maps) && mapkit.maps.length > 0
+        && document.querySelector("#googleMap .mk-map-view");
+    return mapReady ? "ready" : false;
+}"""
+
+# True once the map's size has been unchanged for a few animation frames (hover expansion done)
+MAP_SETTLED_JS = """(token) => {
+    const rect = document.querySelector("#googleMap").getBoundingClientRect();
+    const size = `${rect.width}x${rect.height}`;
+    let state = window.__tgbMapSettle;
+    if (!state || state.token !== token) state = window.__tgbMapSettle = { token, size: "", frames: 0 };
+    state.frames = state.size === size ? state.frames + 1 : 0;
+    state.size = size;
+    return state.frames >= 3;
+}"""
+
+# Page-side helper for the fast guess path, installed on first use. In one call it clears the
+# coords, converts the coordinate, clicks the map, waits for the coords to be persisted, sets
+# the (clamped) year slider, checks the coords are still there and optionally submits.
+FAST_GUESS_JS = """async ([lat, lng, year, timeoutMs, submit]) => {
+    if (!window.__tgbGuess) {
+        const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+        const coordsSet = () => {
+            const coords = localStorage.getItem("coords");
+            return typeof coords === "string" && coords.length > 0;
+        };
+        const dispatchClick = (target, x, y) => {
+            const init = { bubbles: true, cancelable: true, composed: true, clientX: x, clientY: y, button: 0, view: window };
+            target.dispatchEvent(new PointerEvent("pointerdown", { ...init, pointerId: 1, isPrimary: true }));
+            target.dispatchEvent(new MouseEvent("mousedown", init));
+            target.dispatchEvent(new PointerEvent("pointerup", { ...init, pointerId: 1, isPrimary: true }));
+            target.dispatchEvent(new MouseEvent("mouseup", init));
+            target.dispatchEvent(new MouseEvent("click", init));
+        };
+
+        window.__tgbGuess = async (lat, lng, year, timeoutMs, submit) => {
+            const mapElement = document.getElementById("googleMap");
+            const slider = document.getElementById("myRange");
+            if (!mapElement || !slider || !(window.mapkit && mapkit.maps && mapkit.maps.length > 0)) {
+                return { ok: false, reason: "page not ready" };
+            }
+            localStorage.removeItem("coords");
+            mapElement.scrollIntoView({ block: "center" });
+
+            const point = mapkit.maps[0].convertCoordinateToPointOnPage(new mapkit.Coordinate(lat, lng));
+            const x = point.x - window.scrollX;
+            const y = point.y - window.scrollY;
+            const rect = mapElement.getBoundingClientRect();
+            if (x < rect.left || x > rect.right || y < rect.top || y > rect.bottom) {
+                return { ok: false, reason: "coordinate outside the visible map" };
+            }
+            dispatchClick(document.elementFromPoint(x, y) || mapElement, x, y);
+
+            const deadline = performance.now() + timeoutMs;
+            while (!coordsSet() && performance.now() < deadline) await sleep(16);
+            if (!coordsSet()) return { ok: false, reason: "coords not persisted after click" };
+
+            const min = parseInt(slider.getAttribute("min") || "1900", 10);
+            const max = parseInt(slider.getAttribute("max") || "2026", 10);
+            const clamped = Math.max(min, Math.min(max, year));
+            slider.value = String(clamped);
+            slider.dispatchEvent(new Event("input", { bubbles: true }));
+            slider.dispatchEvent(new Event("change", { bubbles: true }));
+
+            if (!coordsSet()) return { ok: false, reason: "coords lost after setting the year" };
+            if (submit) {
+                const button = document.getElementById("makeGuess");
+                if (!button) return { ok: false, reason: "submit button not found" };
+                button.click();
+            }
+            return { ok: true, year: clamped, coords: localStorage.getItem("coords") };
+        };
+    }
+    return window.__tgbGuess(lat, lng, year, timeoutMs, submit);
+}"""
+
 
 class TimeGuessrClient:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, fast_guess: bool = False, base_url: str = DEFAULT_BASE_URL):
         self.page = page
-        
+        # e.g. the local stand-in site (src/standin.py) instead of timeguessr.com
+        self.base_url = base_url
+        # place, set and submit a guess with a single page-side call, falling back to the regular flow
+        self.fast_guess = fast_guess
+        # browser round trips per operation, e.g. {"evaluate": 12, "click": 10}
+        self.round_trips: Counter[str] = Counter()
+        # wall time of every step, e.g. {"make_guess.place_pin": [0.41, 0.38]}
+        self.step_seconds: defaultdict[str, list[float]] = defaultdict(list)
+
+    @property
+    def total_round_trips(self) -> int:
+        return sum(self.round_trips.values())
+
+    async def _rt(self, op: str, call: Awaitable[T]) -> T:
+        """Awaits a single page operation and counts it as one browser round trip."""
+        self.round_trips[op] += 1
+        return await call
+
+    @asynccontextmanager
+    async def _step(self, name: str) -> AsyncIterator[None]:
+        """Measures and logs the latency of one step of the game flow."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.step_seconds[name].append(elapsed)
+            logging.getLogger(__name__).info(f"Step '{name}' took {elapsed * 1000:.0f}ms")
+
     async def go_to_daily(self) -> None:
         logger = logging.getLogger(__name__)
         page = self.page
-        
-        logger.info("Navigating to timeguessr.com")
-        await page.goto("https://timeguessr.com/", wait_until="domcontentloaded")
+
+        logger.info(f"Navigating to {self.base_url}")
+        async with self._step("go_to_daily.navigate"):
+            await self._rt("goto", page.goto(self.base_url, wait_until="domcontentloaded"))
 
         logger.info("Clicking 'Daily' button")
-        await page.get_by_text("Daily", exact=True).click()
-        await page.wait_for_url("**/roundonedaily*", timeout=30000)
+        async with self._step("go_to_daily.daily"):
+            await self._rt("click", page.get_by_text("Daily", exact=True).click())
+            await self._rt("wait_for_url", page.wait_for_url("**/roundonedaily*", timeout=30000))
 
         logger.info("Clicking 'Continue to game' button")
-        await page.get_by_text("Continue to game", exact=True).click()
-        await page.wait_for_timeout(1000)
+        async with self._step("go_to_daily.continue"):
+            await self._rt("click", page.get_by_text("Continue to game", exact=True).click())
+
+        logger.info("Waiting for the cookie consent dialog or the map, whichever comes first")
+        async with self._step("go_to_daily.consent"):
+            await self._dismiss_consent_or_wait_ready()
 
-        logger.info("Checking for cookie consent dialog")
+    async def _dismiss_consent_or_wait_ready(self, timeout_ms: int = 15000) -> None:
+        page = self.page
+        logger = logging.getLogger(__name__)
+        try:
+            handle = await self._rt("wait_for_function", page.wait_for_function(CONSENT_OR_READY_JS, timeout=timeout_ms))
+            state = await self._rt("json_value", handle.json_value())
+        except PlaywrightTimeoutError:
+            logger.info(f"Neither cookie dialog nor map appeared within {timeout_ms}ms, continuing")
+            return
+
+        if state != "dialog":
+            logger.info("No cookie dialog appeared, map is ready")
+            return
+
+        logger.info("Cookie dialog found, clicking 'do not consent'")
         dialog = page.locator(".fc-dialog.fc-choice-dialog")
         try:
-            await dialog.wait_for(state="visible", timeout=15000)
-            logger.info("Cookie dialog found, clicking 'do not consent'")
-            await page.locator("button.fc-cta-do-not-consent").click()
-            await dialog.wait_for(state="hidden", timeout=15000)
+            await self._rt("click", page.locator("button.fc-cta-do-not-consent").click(timeout=timeout_ms))
+            await self._rt("wait_for", dialog.wait_for(state="hidden", timeout=timeout_ms))
             logger.info("Cookie dialog dismissed")
         except PlaywrightTimeoutError:
-            logger.info("No cookie dialog appeared")
+            logger.warning("Cookie dialog could not be dismissed")
+
+    async def _wait_for_map_settled(self, timeout_ms: int = 1000) -> None:
+        """Waits until the hovered map stopped resizing, bounded by `timeout_ms`."""
+        page = self.page
+        token = self.total_round_trips
+        try:
+            await self._rt("wait_for_function", page.wait_for_function(
+                MAP_SETTLED_JS, arg=token, polling="raf", timeout=timeout_ms,
+            ))
+        except PlaywrightTimeoutError:
+            logging.getLogger(__name__).debug(f"Map still resizing after {timeout_ms}ms, clicking anyway")
 
     async def _click_map_coordinate_exact(self, location: Location) -> None:
         page = self.page
         map_locator = page.locator("#googleMap")
-        await map_locator.scroll_into_view_if_needed()
+        await self._rt("scroll", map_locator.scroll_into_view_if_needed())
 
-        await page.wait_for_selector("#googleMap .mk-map-view", state="visible", timeout=30000)
+        await self._rt(
+            "wait_for_selector",
+            page.wait_for_selector("#googleMap .mk-map-view", state="visible", timeout=30000),
+        )
 
         # hover first so the map expands
-        await map_locator.hover()
-        await page.wait_for_timeout(400)
+        await self._rt("hover", map_locator.hover())
+        await self._wait_for_map_settled()
 
-        await page.wait_for_function(
-            "() => window.mapkit && Array.isArray(mapkit.maps) && mapkit.maps.length > 0",
-            timeout=30000,
-        )
+        await self._rt("wait_for_function", page.wait_for_function(MAP_READY_JS, timeout=30000))
 
-        pt = await page.evaluate(
+        pt = await self._rt("evaluate", page.evaluate(
             """([lat, lng]) => {
                 const map = mapkit.maps[0];
                 const coord = new mapkit.Coordinate(lat, lng);
@@ -64,63 +214,66 @@ class TimeGuessrClient:
                 return { x: p.x, y: p.y };
             }""",
             [location.lat, location.lng],
-        )
+        ))
 
-        await page.mouse.click(pt["x"], pt["y"])
-        await page.wait_for_timeout(200)
+        await self._rt("mouse_click", page.mouse.click(pt["x"], pt["y"]))
 
     async def _click_via_zoom(self, location: Location) -> None:
         page = self.page
         map_locator = page.locator("#googleMap")
 
         # hover first so the map expands
-        await map_locator.hover()
-        await page.wait_for_timeout(400)
-        
-        # Zoom in on the target location (higher zoom level)
-        await page.evaluate(
-            """([lat, lng]) => {
+        await self._rt("hover", map_locator.hover())
+        await self._wait_for_map_settled()
+
+        # Zoom in on the target location (higher zoom level), resolves once the map is idle again
+        await self._rt("evaluate", page.evaluate(
+            """([lat, lng, maxWaitMs]) => new Promise((resolve) => {
                 const map = mapkit.maps[0];
+                let done = false;
+                const finish = () => {
+                    if (done) return;
+                    done = true;
+                    map.removeEventListener("region-change-end", finish);
+                    resolve();
+                };
+                map.addEventListener("region-change-end", finish);
+                setTimeout(finish, maxWaitMs);
+
                 const coord = new mapkit.Coordinate(lat, lng);
                 map.setCenterAnimated(coord, false);
                 // Zoom in more
                 const currentZoom = map.cameraDistance;
                 map.cameraDistance = currentZoom * 0.3;
-            }""",
-            [location.lat, location.lng],
-        )
-        await page.wait_for_timeout(600)
+            })""",
+            [location.lat, location.lng, 1000],
+        ))
 
         # Click the center of the map
-        box = await map_locator.bounding_box()
+        box = await self._rt("bounding_box", map_locator.bounding_box())
         if box:
             center_x = box["x"] + box["width"] / 2
             center_y = box["y"] + box["height"] / 2
-            await page.mouse.click(center_x, center_y)
-        
-        await page.wait_for_timeout(200)
+            await self._rt("mouse_click", page.mouse.click(center_x, center_y))
 
     async def _place_pin(self, page: Page, location: Location) -> None:
         try:
             await self._click_map_coordinate_exact(location)
 
-            await page.wait_for_function(
-                "() => typeof localStorage.getItem('coords') === 'string' && localStorage.getItem('coords').length > 0",
-                timeout=3000,
-            )
+            await self._rt("wait_for_function", page.wait_for_function(COORDS_SET_JS, timeout=3000))
         except PlaywrightTimeoutError:
             await self._click_via_zoom(location)
 
     async def click_year_slider(self, year: Year) -> None:
         page = self.page
         slider = page.locator("#myRange")
-        await slider.wait_for(state="visible", timeout=30000)
+        await self._rt("wait_for", slider.wait_for(state="visible", timeout=30000))
 
-        min_year = int((await slider.get_attribute("min")) or "1900")
-        max_year = int((await slider.get_attribute("max")) or "2026")
+        min_year = int((await self._rt("get_attribute", slider.get_attribute("min"))) or "1900")
+        max_year = int((await self._rt("get_attribute", slider.get_attribute("max"))) or "2026")
         year = max(min_year, min(max_year, int(year)))
 
-        await page.evaluate(
+        await self._rt("evaluate", page.evaluate(
             """([year]) => {
                 const slider = document.getElementById("myRange");
                 slider.value = String(year);
@@ -128,80 +281,111 @@ class TimeGuessrClient:
                 slider.dispatchEvent(new Event("change", { bubbles: true }));
             }""",
             [year],
-        )
+        ))
+
+    async def _make_guess_fast(self, location: Location, year: Year, timeout_ms: int = 1500) -> bool:
+        """Places, sets and submits the guess in one page call; False if the regular flow is needed."""
+        logger = logging.getLogger(__name__)
+        try:
+            result = await self._rt("evaluate", self.page.evaluate(
+                FAST_GUESS_JS, [location.lat, location.lng, int(year), timeout_ms, True],
+            ))
+        except PlaywrightError as e:
+            logger.warning(f"Fast guess failed: {e}")
+            return False
+
+        if not result.get("ok"):
+            logger.warning(f"Fast guess not possible ({result.get('reason')}), using the regular flow")
+            return False
+        logger.info(f"Guess submitted via fast path (year={result.get('year')})")
+        return True
 
     async def make_guess(self, location: Location, year: Year) -> None:
         logger = logging.getLogger(__name__)
         page = self.page
 
         logger.info(f"Making guess: location=({location.lat}, {location.lng}), year={year}")
+
+        if self.fast_guess:
+            async with self._step("make_guess.fast"):
+                if await self._make_guess_fast(location, year):
+                    return
         
         # Reset coords
-        await page.evaluate("() => localStorage.removeItem('coords')")
+        await self._rt("evaluate", page.evaluate("() => localStorage.removeItem('coords')"))
         logger.debug("Cleared previous coordinates")
 
         # 1) place pin
         logger.info("Placing pin on map")
-        await self._place_pin(page, location)
-        
-        # wait until coords saved
-        await page.wait_for_function(
-                "() => typeof localStorage.getItem('coords') === 'string' && localStorage.getItem('coords').length > 0",
-                timeout=10000,
-        )
+        async with self._step("make_guess.place_pin"):
+            await self._place_pin(page, location)
+
+            # wait until coords saved
+            await self._rt("wait_for_function", page.wait_for_function(COORDS_SET_JS, timeout=10000))
         logger.info("Pin placed successfully")
 
         # 2) set year
         logger.info(f"Setting year to {year}")
-        await self.click_year_slider(year)
+        async with self._step("make_guess.set_year"):
+            await self.click_year_slider(year)
 
         # if coords got lost, re-place
-        coords = await page.evaluate("() => localStorage.getItem('coords')")
+        coords = await self._rt("evaluate", page.evaluate("() => localStorage.getItem('coords')"))
         if not coords:
             logger.warning("Coordinates lost, re-placing pin")
-            await self.click_map_coordinate_exact(location)  # ty:ignore[unresolved-attribute]
-            await page.wait_for_function(
-                "() => typeof localStorage.getItem('coords') === 'string' && localStorage.getItem('coords').length > 0",
-                timeout=10000,
-            )
+            await self._place_pin(page, location)
+            await self._rt("wait_for_function", page.wait_for_function(COORDS_SET_JS, timeout=10000))
             logger.info("Pin re-placed successfully")
 
         # 3) submit guess
         logger.info("Submitting guess")
-        await page.locator("#makeGuess").click()
+        async with self._step("make_guess.submit"):
+            await self._rt("click", page.locator("#makeGuess").click())
         logger.info("Guess submitted")
 
     async def go_to_next_round(self) -> None:
         next_round = self.page.locator("#nextRound")
-        await next_round.wait_for(state="visible", timeout=30000)
-        await next_round.click()
+        async with self._step("go_to_next_round"):
+            await self._rt("wait_for", next_round.wait_for(state="visible", timeout=30000))
+            await self._rt("click", next_round.click())
+
+    async def snapshot_storage(self, keys: Iterable[str] = SNAPSHOT_KEYS) -> dict[str, Optional[str]]:
+        """Reads several localStorage keys in a single browser round trip."""
+        return await self._rt("evaluate", self.page.evaluate(
+            "(keys) => Object.fromEntries(keys.map((key) => [key, localStorage.getItem(key)]))",
+            list(keys),
+        ))
 
     async def get_answers(self) -> List[DailyRound]:
         logger = logging.getLogger(__name__)
         logger.info("Retrieving answers from localStorage")
         
-        raw = await self.page.evaluate("() => localStorage.getItem('dailyArray')")
+        raw = (await self.snapshot_storage(["dailyArray"]))["dailyArray"]
         if raw is None:
             logger.error("localStorage key 'dailyArray' not found")
             raise RuntimeError("localStorage key 'dailyArray' not found")
 
+        return self._parse_answers(raw)
+
+    @staticmethod
+    def _parse_answers(raw: str) -> List[DailyRound]:
+        logger = logging.getLogger(__name__)
         data = json.loads(raw)[:5]
         logger.info(f"Retrieved {len(data)} daily rounds")
         logger.debug(f"Daily array data: {json.dumps(data, indent=2)}")
         return [DailyRound.model_validate(item) for item in data]
 
-    async def get_results(self) -> str:
-        """Formats the game results from localStorage into a shareable string."""
+    async def get_game_results(self) -> GameResults:
+        """Collects the game results from a single localStorage snapshot."""
         logger = logging.getLogger(__name__)
         logger.info("Fetching game results from localStorage")
-        
+
+        snapshot = await self.snapshot_storage()
+
         # Get daily number
-        daily_number = await self.page.evaluate("() => localStorage.getItem('dailyNumber')")
+        daily_number = snapshot["dailyNumber"]
         logger.info(f"Daily number: {daily_number}")
-        
-        # Round names in order
-        round_names = ["one", "two", "three", "four", "five"]
-        
+
         # Collect all round data
         game_results: GameResults = GameResults(
             daily_number=int(daily_number) if daily_number and daily_number.isdigit() else 0,
@@ -209,11 +393,11 @@ class TimeGuessrClient:
             rounds=[]
         )
         
-        for i, round_name in enumerate(round_names):
+        for i, round_name in enumerate(ROUND_NAMES):
             # Get score, year, distance
-            score: str = await self.page.evaluate(f"() => localStorage.getItem('{round_name}Total')")
-            year: str = await self.page.evaluate(f"() => localStorage.getItem('{round_name}Year')")
-            distance: str = await self.page.evaluate(f"() => localStorage.getItem('{round_name}Distance')")
+            score: str = snapshot[f"{round_name}Total"] or ""
+            year: str = snapshot[f"{round_name}Year"] or ""
+            distance: str = snapshot[f"{round_name}Distance"] or ""
 
             logger.info(f"Round {i+1}: score={score}, year={year}, distance={distance}")
             
@@ -225,4 +409,8 @@ class TimeGuessrClient:
             ))
         
         logger.info(f"Total score: {game_results.total_score}")
-        return game_results.format_results()
\ No newline at end of file
+        return game_results
+
+    async def get_results(self) -> str:
+        """Formats the game results from localStorage into a shareable string."""
+        return (await self.get_game_results()).format_results()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from playwright.async_api import Browser, BrowserContext, Error as PlaywrightError, Page
+
+logger = logging.getLogger(__name__)
+
+# The game only keeps state in localStorage and cookies of the page's origin
+RESET_STORAGE_JS = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+
+@dataclass
+class PooledContext:
+    context: BrowserContext
+    page: Page
+    uses: int = 0
+
+
+@dataclass
+class ContextPoolStats:
+    created: int = 0
+    reused: int = 0
+    discarded: int = 0
+    waits: int = 0
+    peak_in_use: int = 0
+    create_seconds: list[float] = field(default_factory=list)
+
+    def format_stats(self) -> str:
+        create = (
+            f"{statistics.median(self.create_seconds) * 1000:.0f}ms p50 / "
+            f"{max(self.create_seconds) * 1000:.0f}ms max"
+            if self.create_seconds else "n/a"
+        )
+        return (
+            f"created={self.created} (creation {create}), reused={self.reused}, "
+            f"discarded={self.discarded}, waits={self.waits}, peak in use={self.peak_in_use}"
+        )
+
+
+class ContextPool:
+    """
+    Bounded pool of browser contexts (each with one page) owned by a browser.
+    - at most `size` contexts exist, `acquire` waits for a free one
+    - `prewarm` contexts are created up front by `start`
+    - released contexts get their cookies and storage cleared and the page is
+      parked on about:blank; the HTTP cache is kept, so reused contexts load the
+      game faster. Contexts released with `discard=True`, or whose reset fails,
+      are closed instead.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        size: int = 4,
+        prewarm: int = 0,
+        width: int = 1920,
+        height: int = 1080,
+    ):
+        self.browser = browser
+        self.size = max(1, size)
+        self.prewarm = min(prewarm, self.size)
+        self.viewport = {"width": width, "height": height}
+        self.stats = ContextPoolStats()
+
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._idle: list[PooledContext] = []
+        self._in_use = 0
+        self._closed = False
+
+    async def start(self) -> None:
+        if self.prewarm:
+            entries = await asyncio.gather(*(self._create() for _ in range(self.prewarm)))
+            self._idle.extend(entries)
+            logger.info(f"Context pool pre-warmed {len(entries)} context(s)")
+
+    async def _create(self) -> PooledContext:
+        start = time.perf_counter()
+        context = await self.browser.new_context(viewport=self.viewport)
+        try:
+            page = await context.new_page()
+        except BaseException:
+            await context.close()
+            raise
+        self.stats.create_seconds.append(time.perf_counter() - start)
+        self.stats.created += 1
+        return PooledContext(context, page)
+
+    async def acquire(self) -> PooledContext:
+        if self._closed:
+            raise RuntimeError("Context pool is closed")
+        if self._semaphore.locked():
+            self.stats.waits += 1
+        await self._semaphore.acquire()
+        try:
+            if self._idle:
+                entry = self._idle.pop()
+                self.stats.reused += 1
+            else:
+                entry = await self._create()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        entry.uses += 1
+        self._in_use += 1
+        self.stats.peak_in_use = max(self.stats.peak_in_use, self._in_use)
+        return entry
+
+    async def release(self, entry: PooledContext, discard: bool = False) -> None:
+        try:
+            if discard or self._closed:
+                await self._discard(entry)
+                return
+            try:
+                await self._reset(entry)
+            except PlaywrightError as e:
+                logger.warning(f"Resetting a pooled context failed, discarding it: {e}")
+                await self._discard(entry)
+                return
+            self._idle.append(entry)
+        finally:
+            self._in_use -= 1
+            self._semaphore.release()
+
+    async def _reset(self, entry: PooledContext) -> None:
+        context = entry.context
+        if entry.page.is_closed():
+            entry.page = await context.new_page()
+        for page in context.pages:
+            if page is not entry.page:
+                await page.close()
+
+        await entry.page.evaluate(RESET_STORAGE_JS)
+        await context.clear_cookies()
+        await entry.page.goto("about:blank")
+
+    async def _discard(self, entry: PooledContext) -> None:
+        self.stats.discarded += 1
+        try:
+            await entry.context.close()
+        except PlaywrightError as e:
+            logger.debug(f"Closing a discarded context failed: {e}")
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for entry in idle:
+            try:
+                await entry.context.close()
+            except PlaywrightError as e:
+                logger.debug(f"Closing a pooled context failed: {e}")
+        logger.info(f"Context pool closed: {self.stats.format_stats()}")
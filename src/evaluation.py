@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.archive import Archive, DailyTable
+from src.bots.base import BaseBot
+from src.metrics import percentile
+from src.scoring import score_arrays
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GuessRecord:
+    bot: str
+    daily_number: int
+    round: int
+    lat: float = float("nan")
+    lng: float = float("nan")
+    year: int = 0
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> tuple[str, int, int]:
+        return self.bot, self.daily_number, self.round
+
+
+@dataclass
+class BotSummary:
+    bot: str
+    rounds: int
+    failed: int
+    mean_score: float
+    p50_score: float
+    p5_score: float
+    mean_distance_km: float
+    p50_distance_km: float
+    mean_year_error: float
+
+
+@dataclass
+class EvaluationReport:
+    summaries: list[BotSummary]
+    guessed: int
+    resumed: int
+    seconds: float
+    records: list[GuessRecord] = field(default_factory=list)
+
+    @property
+    def rounds_per_second(self) -> float:
+        return self.guessed / self.seconds if self.seconds > 0 else 0.0
+
+    def format_table(self) -> str:
+        lines = [
+            f"{'bot':<24} {'rounds':>6} {'failed':>6} {'mean':>7} {'p50':>7} {'p5':>7} "
+            f"{'mean km':>9} {'p50 km':>9} {'mean yrs':>8}"
+        ]
+        for s in self.summaries:
+            lines.append(
+                f"{s.bot:<24} {s.rounds:>6} {s.failed:>6} {s.mean_score:>7.0f} {s.p50_score:>7.0f} "
+                f"{s.p5_score:>7.0f} {s.mean_distance_km:>9.1f} {s.p50_distance_km:>9.1f} {s.mean_year_error:>8.1f}"
+            )
+        lines.append(
+            f"{self.guessed} new guesses in {self.seconds:.1f}s ({self.rounds_per_second:.1f} rounds/s), "
+            f"{self.resumed} resumed from the checkpoint"
+        )
+        return "\n".join(lines)
+
+
+class Checkpoint:
+    """Append-only JSON lines of finished guesses; an interrupted evaluation resumes from it."""
+
+    def __init__(self, path: Optional[str | Path]):
+        self.path = Path(path) if path else None
+        self._file = None
+
+    def load(self) -> dict[tuple[str, int, int], GuessRecord]:
+        records: dict[tuple[str, int, int], GuessRecord] = {}
+        if self.path is None or not self.path.exists():
+            return records
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = GuessRecord(**json.loads(line))
+                except (json.JSONDecodeError, TypeError):
+                    continue  # a line cut off by the interruption
+                records[record.key] = record
+        return records
+
+    def append(self, record: GuessRecord) -> None:
+        if self.path is None:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a+", encoding="utf-8")
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")  # don't append to a line cut off by an interruption
+        self._file.write(json.dumps(record.__dict__) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def summarize(records: Sequence[GuessRecord], dailies: DailyTable, bots: Sequence[str]) -> list[BotSummary]:
+    """Scores all guesses in one vectorized pass and aggregates them per bot."""
+    row_of = {
+        (int(d), int(r)): i for i, (d, r) in enumerate(zip(dailies["daily_number"], dailies["round"]))
+    }
+    ok = [r for r in records if r.error is None and (r.daily_number, r.round) in row_of]
+    rows = np.array([row_of[(r.daily_number, r.round)] for r in ok], dtype=np.int64)
+    scored = score_arrays(
+        [r.lat for r in ok], [r.lng for r in ok], [r.year for r in ok],
+        dailies["lat"][rows], dailies["lng"][rows], dailies["year"][rows],
+    )
+    bot_of = np.array([r.bot for r in ok], dtype=object)
+
+    summaries: list[BotSummary] = []
+    for bot in bots:
+        mask = bot_of == bot
+        failed = sum(1 for r in records if r.bot == bot and r.error is not None)
+        if not mask.any():
+            summaries.append(BotSummary(bot, 0, failed, *([float("nan")] * 6)))
+            continue
+        points = scored.points[mask].astype(np.float64)
+        km = scored.distance_km[mask]
+        summaries.append(BotSummary(
+            bot=bot,
+            rounds=int(mask.sum()),
+            failed=failed,
+            mean_score=float(points.mean()),
+            p50_score=float(np.median(points)),
+            p5_score=percentile(points.tolist(), 5),
+            mean_distance_km=float(km.mean()),
+            p50_distance_km=float(np.median(km)),
+            mean_year_error=float(scored.year_error[mask].mean()),
+        ))
+    return summaries
+
+
+async def evaluate(
+    bots: Sequence[BaseBot],
+    dailies: DailyTable,
+    concurrency: int = 8,
+    checkpoint_path: Optional[str | Path] = None,
+) -> EvaluationReport:
+    """
+    Feeds every archived round to every bot, at most `concurrency` guesses at a time
+    across all bots, and scores the guesses locally. Finished guesses are written to
+    the checkpoint, so running again with the same checkpoint only does what is left
+    (including the guesses that failed).
+    """
+    from src.http_client import HttpClient
+
+    names = [bot.name for bot in bots]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Bot names must be unique to tell results apart: {names}")
+
+    checkpoint = Checkpoint(checkpoint_path)
+    # failed guesses are tried again, they are often rate limits or timeouts
+    done = {key: record for key, record in checkpoint.load().items() if record.error is None}
+    rounds = dailies.rounds()
+    order = np.lexsort((dailies["round"], dailies["daily_number"]))
+    # round-robin over bots, so every bot makes progress and API load is spread
+    work: asyncio.Queue[tuple[BaseBot, int]] = asyncio.Queue()
+    for i in order:
+        for bot in bots:
+            if (bot.name, int(dailies["daily_number"][i]), int(dailies["round"][i])) not in done:
+                work.put_nowait((bot, int(i)))
+    total = work.qsize()
+    logger.info(f"Evaluating {len(bots)} bot(s) on {len(order)} round(s): {total} to guess, {len(done)} resumed")
+
+    records = dict(done)
+    guessed = 0
+
+    async def worker() -> None:
+        nonlocal guessed
+        while True:
+            try:
+                bot, i = work.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            daily_number, round_index = int(dailies["daily_number"][i]), int(dailies["round"][i])
+            record = GuessRecord(bot.name, daily_number, round_index)
+            try:
+                location, year = await bot.guess_for_round(round_index, rounds[i])
+                record.lat, record.lng, record.year = location.lat, location.lng, int(year)
+            except Exception as e:
+                logger.warning(f"[{bot.name}] Daily #{daily_number} round {round_index} failed: {e}")
+                record.error = f"{type(e).__name__}: {e}"
+            records[record.key] = record
+            checkpoint.append(record)
+            guessed += 1
+            if guessed % 100 == 0:
+                logger.info(f"{guessed}/{total} guesses done")
+
+    start = time.perf_counter()
+    try:
+        async with HttpClient() as http:
+            for bot in bots:
+                bot.use_http(http)
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        checkpoint.close()
+    seconds = time.perf_counter() - start
+
+    for bot in bots:
+        summary = bot.run_summary()
+        if summary:
+            logger.info(f"[{bot.name}] {summary}")
+
+    all_records = list(records.values())
+    return EvaluationReport(
+        summaries=summarize(all_records, dailies, names),
+        guessed=guessed,
+        resumed=len(done),
+        seconds=seconds,
+        records=all_records,
+    )
+
+
+def main() -> None:
+    from src.bots.registry import BOTS, create_bot
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    parser = argparse.ArgumentParser(description="Evaluate bots on archived dailies without a browser")
+    parser.add_argument("archive", help="Archive directory (see src/archive.py)")
+    parser.add_argument("--bot", dest="bots", action="append", choices=sorted(BOTS), required=True)
+    parser.add_argument("--concurrency", type=int, default=8, help="Guesses in flight across all bots")
+    parser.add_argument("--checkpoint", help="JSON lines file to resume from and append to")
+    parser.add_argument("--from", dest="daily_from", type=int)
+    parser.add_argument("--to", dest="daily_to", type=int)
+    args = parser.parse_args()
+
+    bots = [create_bot(name) for name in args.bots]
+    keys = [key for bot in bots for key in bot.required_settings]
+    if keys:
+        from src.settings import get_settings
+        get_settings().validate(*keys)
+
+    dailies = Archive(args.archive).dailies().filter(args.daily_from, args.daily_to)
+    report = asyncio.run(evaluate(bots, dailies, concurrency=args.concurrency, checkpoint_path=args.checkpoint))
+    print(report.format_table())
+
+
+if __name__ == "__main__":
+    main()
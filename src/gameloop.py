@@ -1,72 +1,311 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from src.bots.base import BaseBot
-from src.client import TimeGuessrClient
-from src.model import DailyRound
+from src.client import DEFAULT_BASE_URL, TimeGuessrClient
+from src.custom_types import Guess
+from src.http_client import HttpClient
+from src.metrics import percentile
+from src.model import DailyRound, GameResults
 from src.player import Player
+from src.rate_control import DeadlineExceeded, deadline
+from src.tasks import cancel_and_reap
 from src.teams import send_to_teams
 
 logger = logging.getLogger(__name__)
 
+# how a round's guess was produced, see GameLoop.round_paths
+PRIMARY, HEDGE, FALLBACK = "primary", "hedge", "fallback"
+
+# recent guess durations per bot name, across the games of the process, to hedge past their p95
+_guess_seconds_by_bot: defaultdict[str, deque[float]] = defaultdict(lambda: deque(maxlen=200))
+
 @dataclass
 class GameLoopConfig:
     rounds: int = 5
     keep_browser_open_ms: int = 0
+    # Start every round's guess right after the answers are known instead of one by one
+    pipeline_guesses: bool = False
+    max_concurrent_guesses: int = 5
+    # Place and submit each guess with a single page-side call, the regular flow stays as fallback
+    fast_guess: bool = False
+    # Site to play on and webhook for the results, None uses TEAMS_WEBHOOK_URL from the settings
+    base_url: str = DEFAULT_BASE_URL
+    webhook_url: Optional[str] = None
+    # Post the results to Teams at the end of the game, off when a caller aggregates them
+    send_results: bool = True
+    # Directory of the dailies/results archive (see src/archive.py), None to not archive
+    archive_path: Optional[str] = None
+    # Budget for one round's guess, None waits as long as it takes. When it runs out the bot's
+    # fallback guess gets `fallback_timeout_seconds` instead; other errors still fail the round.
+    round_deadline_seconds: Optional[float] = None
+    fallback_timeout_seconds: float = 30.0
+    # Race a duplicate against a guess that runs past the bot's p95; until `hedge_min_samples`
+    # guesses were timed, past `hedge_after_seconds`. None never hedges.
+    hedge_after_seconds: Optional[float] = None
+    hedge_min_samples: int = 20
 
 
 class GameLoop:
-    def __init__(self, bot: BaseBot, player: Player, config: Optional[GameLoopConfig] = None):
+    def __init__(
+        self,
+        bot: BaseBot,
+        player: Player,
+        config: Optional[GameLoopConfig] = None,
+        http: Optional[HttpClient] = None,
+    ):
         self.bot = bot
         self.player = player
         self.config = config or GameLoopConfig()
+        self.http = http
+        self.client: Optional[TimeGuessrClient] = None
+        # the formatted results once the game finished, or the error it failed with
+        self.results: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.guess_seconds: dict[int, float] = {}
+        self.guess_wait_seconds: dict[int, float] = {}
+        # which path produced each round's guess: PRIMARY, HEDGE or FALLBACK
+        self.round_paths: dict[int, str] = {}
+        # wall time per phase of the run, e.g. {"make_guess": [0.52, 0.48, ...]}
+        self.phase_seconds: defaultdict[str, list[float]] = defaultdict(list)
 
     async def run(self) -> None:
         logger.info(f"[{self.bot.name}] Starting game loop")
-        
+
+        completed = False
         try:
             logger.info(f"[{self.bot.name}] Starting player and initializing page")
-            page = await self.player.start()
-            client = TimeGuessrClient(page)
+            async with self._phase("player_start"):
+                page = await self.player.start()
+            client = self.client = TimeGuessrClient(
+                page, fast_guess=self.config.fast_guess, base_url=self.config.base_url
+            )
 
             logger.info(f"[{self.bot.name}] Navigating to daily game")
-            await client.go_to_daily()
-            
+            async with self._phase("go_to_daily"):
+                await client.go_to_daily()
+
             logger.info(f"[{self.bot.name}] Fetching answers for {self.config.rounds} rounds")
-            answers: list[DailyRound] = await client.get_answers()
+            async with self._phase("get_answers"):
+                answers: list[DailyRound] = await client.get_answers()
             logger.info(f"[{self.bot.name}] Retrieved {len(answers)} answer(s)")
 
-            for i in range(1, self.config.rounds + 1):
-                logger.info(f"[{self.bot.name}] Starting round {i}/{self.config.rounds}")
-                round_data = answers[i - 1] if i - 1 < len(answers) else None
-
-                location, year = await self.bot.guess_for_round(i, round_data)
-                logger.info(f"[{self.bot.name}] Round {i} guess -> lat={location.lat}, lng={location.lng}, year={year}")
+            pending: dict[int, asyncio.Task[Guess]] = {}
+            if self.config.pipeline_guesses:
+                logger.info(f"[{self.bot.name}] Prefetching guesses for all rounds")
+                pending = self._start_guesses(answers)
 
-                logger.info(f"[{self.bot.name}] Submitting guess for round {i}")
-                await client.make_guess(location, year)
-
-                logger.info(f"[{self.bot.name}] Moving to next round")
-                await client.go_to_next_round()
+            try:
+                await self._play_rounds(client, answers, pending)
+            finally:
+                cancel_and_reap(pending.values())
+            self._log_guess_timing()
+            summary = self.bot.run_summary()
+            if summary:
+                logger.info(f"[{self.bot.name}] {summary}")
 
             logger.info(f"[{self.bot.name}] All rounds completed, retrieving results")
-            results: str = f"{self.bot.name}\n{await client.get_results()}"
-            
-            logger.info(f"[{self.bot.name}] Sending results to Teams")
-            await send_to_teams(results)
-            logger.info(f"[{self.bot.name}] Results sent successfully")
+            async with self._phase("get_results"):
+                game_results = await client.get_game_results()
+            results: str = f"{self.bot.name}\n{game_results.format_results()}"
+            self.results = results
+            if self.config.archive_path:
+                await self._archive(answers, game_results)
+            logger.info(
+                f"[{self.bot.name}] Browser round trips: {client.total_round_trips} {dict(client.round_trips)}"
+            )
+
+            if self.config.send_results:
+                logger.info(f"[{self.bot.name}] Sending results to Teams")
+                async with self._phase("send_to_teams"):
+                    await send_to_teams(results, http=self.http, webhook_url=self.config.webhook_url)
+                logger.info(f"[{self.bot.name}] Results sent successfully")
 
             if self.config.keep_browser_open_ms > 0:
                 logger.info(f"[{self.bot.name}] Keeping browser open for {self.config.keep_browser_open_ms}ms")
                 await page.wait_for_timeout(self.config.keep_browser_open_ms)
 
-            logger.info(f"[{self.bot.name}] Closing player")
-            await self.player.close()
+            completed = True
             logger.info(f"[{self.bot.name}] Game loop completed successfully")
-            
+
         except Exception as e:
+            self.error = e
             logger.error(f"[{self.bot.name}] Error during game loop: {e}", exc_info=True)
             raise
+        finally:
+            # always release the context; after a failure its state is unknown, so don't reuse it
+            logger.info(f"[{self.bot.name}] Closing player")
+            await self.player.close(discard=not completed)
+
+    async def _play_rounds(
+        self,
+        client: TimeGuessrClient,
+        answers: list[DailyRound],
+        pending: dict[int, asyncio.Task[Guess]],
+    ) -> None:
+        for i in range(1, self.config.rounds + 1):
+            logger.info(f"[{self.bot.name}] Starting round {i}/{self.config.rounds}")
+            round_data = answers[i - 1] if i - 1 < len(answers) else None
+
+            start = time.perf_counter()
+            if i in pending:
+                location, year = await pending.pop(i)
+            else:
+                location, year = await self._timed_guess(i, round_data)
+            self.guess_wait_seconds[i] = time.perf_counter() - start
+            logger.info(f"[{self.bot.name}] Round {i} guess -> lat={location.lat}, lng={location.lng}, year={year}")
+
+            logger.info(f"[{self.bot.name}] Submitting guess for round {i}")
+            async with self._phase("make_guess"):
+                await client.make_guess(location, year)
+
+            logger.info(f"[{self.bot.name}] Moving to next round")
+            async with self._phase("go_to_next_round"):
+                await client.go_to_next_round()
+
+    async def _timed_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        start = time.perf_counter()
+        try:
+            guess, path = await self._budgeted_guess(round_index, round_data)
+            self.round_paths[round_index] = path
+            return guess
+        finally:
+            self.guess_seconds[round_index] = time.perf_counter() - start
+            self.phase_seconds["guess_for_round"].append(self.guess_seconds[round_index])
+
+    async def _budgeted_guess(self, round_index: int, round_data: Optional[DailyRound]) -> tuple[Guess, str]:
+        """
+        The bot's guess within `round_deadline_seconds` (rate-controlled calls back off
+        within it too), hedged once it runs past the bot's p95. Only when that budget
+        runs out (or a rate-controlled call gives up because it would) is the bot's
+        fallback guess used, if it has one; any other error fails the round.
+        Returns the guess and the path that produced it.
+        """
+        budget = self.config.round_deadline_seconds
+        start = time.perf_counter()
+        try:
+            with deadline(budget) as until:
+                async with asyncio.timeout(budget) as timeout:
+                    guess, path = await self._hedged_guess(round_index, round_data)
+        except TimeoutError as e:
+            # a timeout of the bot itself (e.g. one request, or its own deadline) is an error like any other
+            if budget is None or not (timeout.expired() or (isinstance(e, DeadlineExceeded) and e.until == until)):
+                raise
+            fallback = await self._fallback_guess(round_index, round_data)
+            if fallback is None:
+                raise
+            logger.warning(
+                f"[{self.bot.name}] Round {round_index} guess ran out of its {budget}s budget, using the fallback guess"
+            )
+            return fallback, FALLBACK
+
+        _guess_seconds_by_bot[self.bot.name].append(time.perf_counter() - start)
+        return guess, path
+
+    async def _hedged_guess(self, round_index: int, round_data: Optional[DailyRound]) -> tuple[Guess, str]:
+        tasks = {asyncio.create_task(self.bot.guess_for_round(round_index, round_data)): PRIMARY}
+        hedge_after = self._hedge_after()
+        error: Optional[BaseException] = None
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(
+                        f"[{self.bot.name}] Round {round_index} guess passed {hedge_after:.1f}s, hedging it"
+                    )
+                    tasks[asyncio.create_task(self.bot.hedge_guess(round_index, round_data))] = HEDGE
+                    hedge_after = None
+                    continue
+                for task in done:
+                    path = tasks.pop(task)
+                    if task.exception() is None:
+                        return task.result(), path
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            cancel_and_reap(tasks)
+
+    def _hedge_after(self) -> Optional[float]:
+        """Seconds after which a guess is hedged: the bot's p95 once known, else the configured start."""
+        if self.config.hedge_after_seconds is None:
+            return None
+        samples = _guess_seconds_by_bot[self.bot.name]
+        if len(samples) < self.config.hedge_min_samples:
+            return self.config.hedge_after_seconds
+        return percentile(list(samples), 95)
+
+    async def _fallback_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Optional[Guess]:
+        timeout = self.config.fallback_timeout_seconds
+        try:
+            with deadline(timeout):
+                async with asyncio.timeout(timeout):
+                    return await self.bot.fallback_guess(round_index, round_data)
+        except Exception as e:
+            logger.error(f"[{self.bot.name}] Fallback guess for round {round_index} failed: {e}")
+            return None
+
+    async def _archive(self, answers: list[DailyRound], game_results: GameResults) -> None:
+        """Stores the answers and results; a failing archive never fails the game."""
+        from src.archive import Archive
+
+        def write() -> None:
+            archive = Archive(self.config.archive_path)
+            if not archive.has_daily(game_results.daily_number):
+                archive.append_dailies(game_results.daily_number, answers)
+            archive.append_results(self.bot.name, game_results)
+
+        try:
+            await asyncio.to_thread(write)
+            logger.info(f"[{self.bot.name}] Archived daily #{game_results.daily_number}")
+        except Exception as e:
+            logger.warning(f"[{self.bot.name}] Archiving the results failed: {e}", exc_info=True)
+
+    @asynccontextmanager
+    async def _phase(self, name: str) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name].append(time.perf_counter() - start)
+
+    def _start_guesses(self, answers: list[DailyRound]) -> dict[int, asyncio.Task[Guess]]:
+        """
+        Starts the guess for every round right away, with at most
+        `max_concurrent_guesses` running at the same time. Errors surface
+        when the round's task is awaited, so they stay tied to that round.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.config.max_concurrent_guesses))
+
+        async def guarded(round_index: int, round_data: Optional[DailyRound]) -> Guess:
+            async with semaphore:
+                return await self._timed_guess(round_index, round_data)
+
+        tasks: dict[int, asyncio.Task[Guess]] = {}
+        for i in range(1, self.config.rounds + 1):
+            round_data = answers[i - 1] if i - 1 < len(answers) else None
+            tasks[i] = asyncio.create_task(guarded(i, round_data), name=f"{self.bot.name}-round-{i}")
+        return tasks
+
+    def _log_guess_timing(self) -> None:
+        """Compares the time spent guessing with the time the game actually waited for it."""
+        guessing = sum(self.guess_seconds.values())
+        waited = sum(self.guess_wait_seconds.values())
+        logger.info(
+            f"[{self.bot.name}] Guessing took {guessing:.2f}s in total, "
+            f"the game waited {waited:.2f}s for it (saved {guessing - waited:.2f}s vs sequential)"
+        )
+        paths = Counter(self.round_paths.values())
+        if paths[HEDGE] or paths[FALLBACK]:
+            slowest = {path: max(self.guess_seconds[i] for i, p in self.round_paths.items() if p == path) for path in paths}
+            logger.info(
+                f"[{self.bot.name}] Guess paths: {dict(paths)}, slowest per path: "
+                + ", ".join(f"{path}={seconds:.1f}s" for path, seconds in slowest.items())
+            )
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from src.model import Location
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedGeocode:
+    """A cached lookup; `location` is None for a remembered empty result."""
+    location: Optional[Location]
+
+
+@dataclass
+class GeocodeCacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def format_stats(self) -> str:
+        lookups = self.hits + self.negative_hits + self.misses
+        hit_rate = (self.hits + self.negative_hits) / lookups if lookups else 0.0
+        return (
+            f"lookups={lookups}, hits={self.hits}, negative hits={self.negative_hits}, "
+            f"misses={self.misses}, evictions={self.evictions}, hit rate={hit_rate:.0%}"
+        )
+
+
+class GeocodeCache:
+    """
+    Disk-backed geocoding cache keyed by the normalized query string.
+    Uses a single SQLite file, so pointing `path` at a mounted volume keeps
+    the cache across container restarts. Entries expire after a TTL (shorter
+    for empty results) and once `max_entries` is exceeded the least recently used
+    entries are evicted, down to `1 - evict_fraction` of it so this happens in batches.
+
+    All methods block on SQLite (every call commits, i.e. waits for the disk), so
+    async callers run them with `asyncio.to_thread`; they are thread-safe and the
+    `_many` variants share one commit between several queries.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float = 30 * 24 * 3600,
+        negative_ttl_seconds: float = 24 * 3600,
+        max_entries: int = 50_000,
+        evict_fraction: float = 0.1,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.evict_fraction = evict_fraction
+        self.stats = GeocodeCacheStats()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS geocode (
+                query TEXT PRIMARY KEY,
+                lat REAL,
+                lng REAL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS geocode_last_used ON geocode(last_used)")
+        # kept up to date by this instance, so puts don't count the table; recounted before evicting
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()
+        logger.info(f"Geocode cache opened at {self.path} ({self._count} entries)")
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        parts = (" ".join(part.split()) for part in query.casefold().split(","))
+        return ", ".join(part for part in parts if part)
+
+    def get(self, query: str) -> Optional[CachedGeocode]:
+        """Returns the cached lookup, or None when the query has to go to the network."""
+        return self.get_many([query])[query]
+
+    def get_many(self, queries: Iterable[str]) -> dict[str, Optional[CachedGeocode]]:
+        """`get` for several queries in one transaction (one commit for the `last_used` updates)."""
+        now = time.time()
+        found: dict[str, Optional[CachedGeocode]] = {}
+        with self._lock, self._transaction():
+            for query in queries:
+                if query not in found:
+                    found[query] = self._get(self.normalize_query(query), now)
+        return found
+
+    def _get(self, key: str, now: float) -> Optional[CachedGeocode]:
+        row = self._conn.execute(
+            "SELECT lat, lng, created_at FROM geocode WHERE query = ?", (key,)
+        ).fetchone()
+
+        if row is not None:
+            lat, lng, created_at = row
+            ttl = self.ttl_seconds if lat is not None else self.negative_ttl_seconds
+            if now - created_at <= ttl:
+                self._conn.execute("UPDATE geocode SET last_used = ? WHERE query = ?", (now, key))
+                if lat is None:
+                    self.stats.negative_hits += 1
+                    return CachedGeocode(location=None)
+                self.stats.hits += 1
+                return CachedGeocode(location=Location(lat=lat, lng=lng))
+            self._count -= self._conn.execute("DELETE FROM geocode WHERE query = ?", (key,)).rowcount
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, query: str, location: Optional[Location]) -> None:
+        """Stores a lookup result; pass None to remember that the query found nothing."""
+        self.put_many([(query, location)])
+
+    def put_many(self, results: Iterable[tuple[str, Optional[Location]]]) -> None:
+        """`put` for several results in one transaction."""
+        now = time.time()
+        with self._lock:
+            with self._transaction():
+                for query, location in results:
+                    self._put(self.normalize_query(query), location, now)
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _put(self, key: str, location: Optional[Location], now: float) -> None:
+        lat, lng = (location.lat, location.lng) if location else (None, None)
+        updated = self._conn.execute(
+            "UPDATE geocode SET lat = ?, lng = ?, created_at = ?, last_used = ? WHERE query = ?",
+            (lat, lng, now, now, key),
+        ).rowcount
+        if not updated:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (query, lat, lng, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, lat, lng, now, now),
+            )
+            self._count += 1
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _evict(self) -> None:
+        # other processes may share the file, so the running count is only a trigger
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()
+        if self._count <= self.max_entries:
+            return
+        overflow = self._count - int(self.max_entries * (1 - self.evict_fraction))
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM geocode WHERE query IN (SELECT query FROM geocode ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+            self._count -= overflow
+            self.stats.evictions += overflow
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+from src.geocache import GeocodeCache
+from src.geocoders.base import BaseGeocoder
+from src.http_client import raise_for_status, use_session
+from src.model import AzureMapsResponse, AzureMapsResult, LLMLocation, Location
+from src.rate_control import RateController
+from src.tasks import cancel_and_reap
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+AZURE_MAPS_SEARCH_URL = "https://atlas.microsoft.com/search/address/json"
+# per request, so it also applies on the shared session
+SEARCH_TIMEOUT = aiohttp.ClientTimeout(total=15)
+
+
+class AzureMapsGeocoder(BaseGeocoder):
+    """
+    Resolves LLM locations with the Azure Maps Search Address API,
+    trying progressively less specific queries.
+    """
+
+    name = "Azure Maps"
+    required_settings = ("AZURE_MAPS_KEY",)
+
+    def __init__(
+        self,
+        geocode_cache: Optional[GeocodeCache] = None,
+        concurrent: Optional[bool] = None,
+        search_url: str = AZURE_MAPS_SEARCH_URL,
+        rate_control: Optional[RateController] = None,
+    ):
+        settings = get_settings()
+        if geocode_cache is None and settings.GEOCODE_CACHE_PATH:
+            geocode_cache = GeocodeCache(settings.GEOCODE_CACHE_PATH)
+        self.geocode_cache = geocode_cache
+        self.concurrent = settings.GEOCODE_CONCURRENT if concurrent is None else concurrent
+        self.search_url = search_url
+        # one Azure Maps account, one rate limit for every geocoder of the process
+        self.rate_control = rate_control or RateController.shared(
+            "Azure Maps",
+            requests_per_second=settings.AZURE_MAPS_REQUESTS_PER_SECOND,
+            burst=5,
+        )
+
+    def run_summary(self) -> Optional[str]:
+        summary = f"Azure Maps rate control: {self.rate_control.format_stats()}"
+        if self.geocode_cache is None:
+            return summary
+        return f"{summary}, Geocode cache: {self.geocode_cache.stats.format_stats()}"
+
+    async def geocode(self, location: LLMLocation) -> Location:
+        """
+        Tries progressively less specific queries until Azure Maps returns a result.
+        Each query is looked up in the geocode cache (if configured) before going to the network.
+        With `concurrent` all fallbacks are sent at once, the result is the same.
+        Raises ValueError if nothing can be found even with the country-only fallback.
+        """
+        queries = location._build_query_strings()
+
+        async with use_session(self.http) as session:
+            if self.concurrent:
+                found = await self._geocode_concurrently(session, queries)
+                if found is not None:
+                    return found
+            else:
+                for q in queries:
+                    found = await self._geocode_query(session, q)
+                    if found is not None:
+                        return found
+
+        raise ValueError(f"No coordinates found for location using fallbacks: {queries}")
+
+    async def _search(self, session: aiohttp.ClientSession, query: str) -> list[AzureMapsResult]:
+        """
+        Async GET request to Azure Maps Search API, within the endpoint's rate control.
+        """
+        params = {
+            "subscription-key": get_settings().required("AZURE_MAPS_KEY"),
+            "api-version": "1.0",
+            "language": "en-US",
+            "query": query,
+        }
+        return await self.rate_control.call(lambda: self._get_results(session, params))
+
+    async def _get_results(self, session: aiohttp.ClientSession, params: dict[str, str]) -> list[AzureMapsResult]:
+        async with session.get(self.search_url, params=params, timeout=SEARCH_TIMEOUT) as resp:
+            await raise_for_status(resp)
+            data = await resp.json()
+            response_obj = AzureMapsResponse.model_validate(data)
+            return response_obj.results
+
+    async def _geocode_query(self, session: aiohttp.ClientSession, query: str) -> Optional[Location]:
+        """Resolves a single query, using and filling the geocode cache when it is configured."""
+        if self.geocode_cache is not None:
+            cached = await asyncio.to_thread(self.geocode_cache.get, query)
+            if cached is not None:
+                return cached.location
+
+        results = await self._search(session, query)
+        found = self._first_location(results)
+
+        if self.geocode_cache is not None:
+            await asyncio.to_thread(self.geocode_cache.put, query, found)
+        return found
+
+    async def _geocode_concurrently(
+        self, session: aiohttp.ClientSession, queries: list[str]
+    ) -> Optional[Location]:
+        """
+        Sends all fallback queries at once and returns the most specific one that succeeds.
+        Results are consumed in fallback order, so the outcome (including which error is
+        raised) matches the sequential loop; less specific requests still in flight are
+        cancelled as soon as a more specific one resolves.
+        """
+        tasks = [asyncio.create_task(self._geocode_query(session, q)) for q in queries]
+        try:
+            for task in tasks:
+                found = await task
+                if found is not None:
+                    return found
+            return None
+        finally:
+            cancel_and_reap(tasks)
+
+    @staticmethod
+    def _first_location(results: list[AzureMapsResult]) -> Optional[Location]:
+        if not results:
+            return None
+        r: AzureMapsResult = results[0]
+        return Location(lat=r.position.lat, lng=r.position.lon)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urlencode
+
+import aiohttp
+
+from src.geocache import GeocodeCache
+from src.geocoders.azure import AzureMapsGeocoder
+from src.http_client import raise_for_status, use_session
+from src.model import AzureMapsBatchResponse, AzureMapsResponse, LLMLocation, Location
+from src.rate_control import RateController
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+AZURE_MAPS_BATCH_URL = "https://atlas.microsoft.com/search/address/batch/sync/json"
+# Azure Maps accepts at most 100 queries in a synchronous batch
+MAX_BATCH_ITEMS = 100
+# per request, so it also applies on the shared session
+BATCH_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+QueryOutcome = Optional[Location] | Exception
+
+
+class AzureMapsBatchGeocoder(AzureMapsGeocoder):
+    """
+    Geocodes many locations with the Azure Maps Search Address Batch API.
+    `geocode_many` sends every fallback query of all locations in one request.
+    Single `geocode` calls (e.g. from several rounds or bots sharing this
+    instance) go out on the next event loop iteration when no batch is in flight,
+    so calls made together are sent together; while one is in flight they are
+    collected until it finishes (at most `batch_window` seconds) and sent as the next.
+    """
+
+    name = "Azure Maps (batch)"
+
+    def __init__(
+        self,
+        geocode_cache: Optional[GeocodeCache] = None,
+        batch_url: str = AZURE_MAPS_BATCH_URL,
+        batch_window: float = 0.25,
+        max_batch_size: int = 25,
+        rate_control: Optional[RateController] = None,
+    ):
+        super().__init__(geocode_cache=geocode_cache, rate_control=rate_control)
+        self.batch_url = batch_url
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.batch_requests = 0
+
+        self._pending: list[tuple[LLMLocation, asyncio.Future[Optional[Location]]]] = []
+        # the flush waiting for its window; every running flush is kept in `_flush_tasks`
+        # as the event loop only holds weak references to tasks
+        self._flush_task: asyncio.Task[None] | None = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+        self._in_flight = 0
+
+    def run_summary(self) -> Optional[str]:
+        summary = f"Azure Maps batch requests: {self.batch_requests}"
+        cache_summary = super().run_summary()
+        return f"{summary}, {cache_summary}" if cache_summary else summary
+
+    async def geocode(self, location: LLMLocation) -> Location:
+        future: asyncio.Future[Optional[Location]] = asyncio.get_running_loop().create_future()
+        self._pending.append((location, future))
+
+        if len(self._pending) >= self.max_batch_size or not self._in_flight:
+            self._schedule_flush(delay=0)
+        elif self._flush_task is None:
+            self._schedule_flush(delay=self.batch_window)
+
+        found = await future
+        if found is None:
+            raise ValueError(
+                f"No coordinates found for location using fallbacks: {location._build_query_strings()}"
+            )
+        return found
+
+    async def geocode_many(self, locations: list[LLMLocation]) -> list[Optional[Location]]:
+        """
+        Resolves all locations with one batched request (per 100 queries).
+        Per location the fallback order is kept: the most specific query with a
+        result wins, an error on a query that would have been needed is raised.
+        """
+        outcomes = await self._resolve_many(locations)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+        return [outcome for outcome in outcomes if not isinstance(outcome, Exception)]
+
+    def _schedule_flush(self, delay: float) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        self._flush_task = asyncio.create_task(self._flush_after(delay))
+        self._flush_tasks.add(self._flush_task)
+        self._flush_task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_task = None
+
+        batch, self._pending = self._pending, []
+        self._in_flight += 1
+        try:
+            outcomes = await self._resolve_many([location for location, _ in batch])
+        except Exception as e:
+            outcomes = [e] * len(batch)
+        finally:
+            self._in_flight -= 1
+            if self._pending and not self._in_flight:
+                # calls that came in meanwhile don't wait for the rest of the window
+                self._schedule_flush(delay=0)
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def _resolve_many(self, locations: list[LLMLocation]) -> list[QueryOutcome]:
+        query_lists = [location._build_query_strings() for location in locations]
+
+        unique = list(dict.fromkeys(q for queries in query_lists for q in queries))
+        cached = await asyncio.to_thread(self.geocode_cache.get_many, unique) if self.geocode_cache is not None else {}
+
+        outcomes: dict[str, QueryOutcome] = {}
+        missing: list[str] = []
+        for q in unique:
+            hit = cached.get(q)
+            if hit is not None:
+                outcomes[q] = hit.location
+            else:
+                missing.append(q)
+
+        if missing:
+            async with use_session(self.http) as session:
+                chunks = [missing[i:i + MAX_BATCH_ITEMS] for i in range(0, len(missing), MAX_BATCH_ITEMS)]
+                for chunk_outcomes in await asyncio.gather(*(self._search_batch(session, c) for c in chunks)):
+                    outcomes.update(chunk_outcomes)
+
+        if self.geocode_cache is not None and missing:
+            results = [(q, outcomes[q]) for q in missing if not isinstance(outcomes[q], Exception)]
+            await asyncio.to_thread(self.geocode_cache.put_many, results)
+
+        return [self._pick_most_specific(queries, outcomes) for queries in query_lists]
+
+    @staticmethod
+    def _pick_most_specific(queries: list[str], outcomes: dict[str, QueryOutcome]) -> QueryOutcome:
+        for q in queries:
+            outcome = outcomes[q]
+            if outcome is not None:
+                return outcome
+        return None
+
+    async def _search_batch(self, session: aiohttp.ClientSession, queries: list[str]) -> dict[str, QueryOutcome]:
+        """
+        Sync POST request to the Azure Maps Search Address Batch API.
+        Failed batch items are returned as exceptions for their query.
+        """
+        params = {
+            "subscription-key": get_settings().required("AZURE_MAPS_KEY"),
+            "api-version": "1.0",
+        }
+        payload = {
+            "batchItems": [
+                {"query": "?" + urlencode({"query": q, "language": "en-US", "limit": 1})}
+                for q in queries
+            ]
+        }
+
+        batch = await self.rate_control.call(lambda: self._post_batch(session, params, payload, len(queries)))
+
+        outcomes: dict[str, QueryOutcome] = {}
+        for q, item in zip(queries, batch.batchItems):
+            if item.statusCode != 200:
+                outcomes[q] = RuntimeError(f"Azure Maps batch item failed ({item.statusCode}) for query {q!r}")
+                continue
+            outcomes[q] = self._first_location(AzureMapsResponse.model_validate(item.response).results)
+        return outcomes
+
+    async def _post_batch(
+        self, session: aiohttp.ClientSession, params: dict[str, str], payload: dict, size: int
+    ) -> AzureMapsBatchResponse:
+        self.batch_requests += 1
+        logger.info(f"Sending Azure Maps batch request with {size} queries")
+        async with session.post(self.batch_url, params=params, json=payload, timeout=BATCH_TIMEOUT) as resp:
+            await raise_for_status(resp)
+            data = await resp.json()
+            return AzureMapsBatchResponse.model_validate(data)
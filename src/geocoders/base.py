@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Optional
+
+from src.model import LLMLocation, Location
+
+if TYPE_CHECKING:
+    from src.http_client import HttpClient
+
+
+class BaseGeocoder(ABC):
+    name: str = "BaseGeocoder"
+    # settings keys the geocoder cannot work without, e.g. ("AZURE_MAPS_KEY",)
+    required_settings: tuple[str, ...] = ()
+    http: Optional[HttpClient] = None
+
+    def use_http(self, http: HttpClient) -> None:
+        """Injects the shared HTTP session of the run."""
+        self.http = http
+
+    @abstractmethod
+    async def geocode(self, location: LLMLocation) -> Location:
+        """
+        Returns the coordinates of the most specific fallback query that resolves.
+        Raises ValueError if nothing can be found.
+        """
+        raise NotImplementedError
+
+    async def geocode_many(self, locations: list[LLMLocation]) -> list[Optional[Location]]:
+        """Geocodes several locations at once; None for locations that cannot be found."""
+
+        async def geocode_or_none(location: LLMLocation) -> Optional[Location]:
+            try:
+                return await self.geocode(location)
+            except ValueError:
+                return None
+
+        return list(await asyncio.gather(*(geocode_or_none(loc) for loc in locations)))
+
+    def run_summary(self) -> Optional[str]:
+        """Optional statistics the geocoder wants to report at the end of a run."""
+        return None
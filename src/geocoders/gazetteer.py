@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import math
+import mmap
+import re
+import struct
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.geocoders.base import BaseGeocoder
+from src.metrics import format_bytes, process_rss_bytes
+from src.model import LLMLocation, Location
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TGGZ"
+VERSION = 1
+# magic, version, n_records, n_keys, then offsets of lat, lng, population, country, kind, hash, record, json and json length
+HEADER = struct.Struct("<4sIII9Q")
+
+KIND_PLACE = 0
+KIND_COUNTRY = 1
+COUNTRY_FEATURE_CODES = {"PCL", "PCLI", "PCLIX", "PCLD", "PCLF", "PCLS", "TERR"}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+EARTH_RADIUS_KM = 6371.0
+
+
+def normalize_name(name: str) -> str:
+    """Accent-, case- and punctuation-insensitive form of a place name."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _distance_km(a: Location, b: Location) -> float:
+    lat1, lat2 = math.radians(a.lat), math.radians(b.lat)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(b.lng - a.lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _align(offset: int, to: int = 8) -> int:
+    return (offset + to - 1) // to * to
+
+
+@dataclass
+class GazetteerBuildStats:
+    rows_read: int = 0
+    records: int = 0
+    keys: int = 0
+    countries: int = 0
+    index_bytes: int = 0
+
+
+class GazetteerIndex:
+    """
+    Read-only, memory-mapped gazetteer index built by `build_index`.
+    Records are stored column-wise (lat, lng, population, country code, kind);
+    name and alias keys are 64-bit hashes sorted for binary search, with the
+    records of one key ordered by population (most populous first).
+    Only the pages touched by lookups become resident.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, n_records, n_keys, off_lat, off_lng, off_pop, off_cc, off_kind,
+         off_hash, off_rec, off_json, json_len) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a gazetteer index (version {VERSION})")
+
+        view = memoryview(self._mm)
+        self._lat = view[off_lat:off_lat + 4 * n_records].cast("f")
+        self._lng = view[off_lng:off_lng + 4 * n_records].cast("f")
+        self._population = view[off_pop:off_pop + 4 * n_records].cast("I")
+        self._country = view[off_cc:off_cc + 2 * n_records]
+        self._kind = view[off_kind:off_kind + n_records]
+        self._hashes = view[off_hash:off_hash + 8 * n_keys].cast("Q")
+        self._records = view[off_rec:off_rec + 4 * n_keys].cast("I")
+        self._views = [view, self._lat, self._lng, self._population, self._country,
+                       self._kind, self._hashes, self._records]
+
+        meta = json.loads(bytes(self._mm[off_json:off_json + json_len]))
+        self._country_codes: dict[str, str] = meta["countries"]
+        self._country_records: dict[str, int] = meta["country_records"]
+        self.n_records = n_records
+        self.n_keys = n_keys
+
+    @property
+    def mapped_bytes(self) -> int:
+        return len(self._mm)
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+    def country_code(self, country: str) -> Optional[str]:
+        """Resolves a country name, alias or ISO code to its ISO 3166 alpha-2 code."""
+        key = normalize_name(country)
+        if len(key) == 2 and key.upper() in self._country_records:
+            return key.upper()
+        return self._country_codes.get(key)
+
+    def find(self, name: str, country_code: Optional[str] = None) -> Optional[int]:
+        """Most populous place called `name` (optionally within a country), as record index."""
+        return next(self._candidates(name, country_code), None)
+
+    def find_near(self, name: str, near: int, max_km: float, country_code: Optional[str] = None) -> Optional[int]:
+        """Most populous place called `name` within `max_km` of record `near`, as record index."""
+        center = self.location(near)
+        for idx in self._candidates(name, country_code):
+            if _distance_km(center, self.location(idx)) <= max_km:
+                return idx
+        return None
+
+    def find_unambiguous(self, name: str) -> Optional[int]:
+        """Most populous place called `name` if all places of that name are in one country."""
+        candidates = list(self._candidates(name, None))
+        if not candidates or len({self.record_country(idx) for idx in candidates}) > 1:
+            return None
+        return candidates[0]
+
+    def _candidates(self, name: str, country_code: Optional[str]) -> Iterator[int]:
+        key = normalize_name(name)
+        if not key:
+            return
+
+        h = _key_hash(key)
+        lo = bisect_left(self._hashes, h)
+        hi = bisect_right(self._hashes, h, lo)
+        for pos in range(lo, hi):
+            idx = self._records[pos]
+            if country_code is None or self.record_country(idx) == country_code:
+                yield idx
+
+    def find_country(self, country_code: str) -> Optional[int]:
+        return self._country_records.get(country_code)
+
+    def record_country(self, idx: int) -> str:
+        return bytes(self._country[2 * idx:2 * idx + 2]).decode("ascii")
+
+    def location(self, idx: int) -> Location:
+        return Location(lat=self._lat[idx], lng=self._lng[idx])
+
+
+class GazetteerGeocoder(BaseGeocoder):
+    """
+    Offline geocoder backed by a local GeoNames-style gazetteer index.
+    Resolves the city within the country first, then refines it with a building or
+    street name only when such a place lies within `near_city_km` of the city (a street
+    named like a town elsewhere in the country must not win). Without a city it falls
+    back to the country itself (or its most populous place). A country the index does
+    not know (e.g. built without country rows or `--country-info`) only resolves a city
+    whose name exists in a single country, rather than guessing one (Paris, France for
+    "Paris, United States").
+    The index defaults to the GAZETTEER_INDEX_PATH setting.
+    """
+
+    name = "Gazetteer"
+    required_settings = ("GAZETTEER_INDEX_PATH",)
+
+    def __init__(self, index_path: Optional[str | Path] = None, near_city_km: float = 25.0):
+        start = time.perf_counter()
+        self.index = GazetteerIndex(index_path or get_settings().required("GAZETTEER_INDEX_PATH"))
+        self.near_city_km = near_city_km
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        logger.info(
+            f"Gazetteer index loaded in {(time.perf_counter() - start) * 1000:.1f}ms "
+            f"({self.index.n_records} places, {self.index.n_keys} keys, {format_bytes(self.index.mapped_bytes)} mapped)"
+        )
+
+    def run_summary(self) -> Optional[str]:
+        avg_us = self.lookup_seconds / self.lookups * 1e6 if self.lookups else 0.0
+        rss = process_rss_bytes()
+        return (
+            f"Gazetteer lookups={self.lookups}, avg={avg_us:.0f}us, "
+            f"index={format_bytes(self.index.mapped_bytes)}, process rss={format_bytes(rss) if rss else 'n/a'}"
+        )
+
+    async def geocode(self, location: LLMLocation) -> Location:
+        found = self.resolve(location)
+        if found is None:
+            raise ValueError(f"No gazetteer entry found for location: {location._build_query_strings()}")
+        return found
+
+    def resolve(self, location: LLMLocation) -> Optional[Location]:
+        start = time.perf_counter()
+        try:
+            idx = self._resolve_record(location)
+            return self.index.location(idx) if idx is not None else None
+        finally:
+            self.lookups += 1
+            self.lookup_seconds += time.perf_counter() - start
+
+    def _resolve_record(self, location: LLMLocation) -> Optional[int]:
+        country_code = self.index.country_code(location.country) if location.country else None
+        if not location.city:
+            city = None
+        elif country_code is not None:
+            city = self.index.find(location.city, country_code)
+        else:
+            city = self.index.find_unambiguous(location.city)
+
+        if city is not None:
+            for name in (location.building, location.street):
+                if name:
+                    idx = self.index.find_near(name, city, self.near_city_km, country_code)
+                    if idx is not None:
+                        return idx
+            return city
+
+        return self.index.find_country(country_code) if country_code is not None else None
+
+
+def _read_rows(path: Path) -> Iterator[list[str]]:
+    csv.field_size_limit(sys.maxsize)
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if row and not row[0].startswith("#"):
+                yield row
+
+
+def _names(row: list[str], max_aliases: int) -> list[str]:
+    names = {normalize_name(row[1]), normalize_name(row[2])}
+    aliases = 0
+    for alias in row[3].split(","):
+        key = normalize_name(alias)
+        if key and key.isascii() and key not in names and aliases < max_aliases:
+            names.add(key)
+            aliases += 1
+    names.discard("")
+    return sorted(names)
+
+
+def build_index(
+    tsv_path: str | Path,
+    out_path: str | Path,
+    country_info_path: Optional[str | Path] = None,
+    feature_classes: str = "PA",
+    min_population: int = 0,
+    max_aliases: int = 20,
+) -> GazetteerBuildStats:
+    """
+    Builds the binary index from a GeoNames dump (e.g. cities500.txt or allCountries.txt).
+    `country_info_path` (GeoNames countryInfo.txt) adds country names and ISO codes
+    for dumps without country rows.
+    """
+    stats = GazetteerBuildStats()
+    lat, lng, population = array("f"), array("f"), array("I")
+    country, kind = bytearray(), bytearray()
+    keys: list[tuple[int, int, int]] = []
+    country_codes: dict[str, str] = {}
+    country_records: dict[str, int] = {}
+    most_populous: dict[str, int] = {}
+
+    for row in _read_rows(Path(tsv_path)):
+        stats.rows_read += 1
+        if len(row) < 15 or row[6] not in feature_classes:
+            continue
+        cc = row[8].upper()
+        pop = int(row[14] or 0)
+        if len(cc) != 2 or (pop < min_population and row[7] not in COUNTRY_FEATURE_CODES):
+            continue
+
+        idx = len(population)
+        lat.append(float(row[4]))
+        lng.append(float(row[5]))
+        population.append(min(pop, 0xFFFFFFFF))
+        country += cc.encode("ascii")
+
+        names = _names(row, max_aliases)
+        if row[7] in COUNTRY_FEATURE_CODES:
+            kind.append(KIND_COUNTRY)
+            country_records[cc] = idx
+            for name in names:
+                country_codes.setdefault(name, cc)
+        else:
+            kind.append(KIND_PLACE)
+            keys.extend((_key_hash(name), -pop, idx) for name in names)
+            if cc not in most_populous or pop > population[most_populous[cc]]:
+                most_populous[cc] = idx
+
+    if country_info_path is not None:
+        for row in _read_rows(Path(country_info_path)):
+            if len(row) > 4:
+                cc = row[0].upper()
+                for name in (row[4], row[1]):
+                    country_codes.setdefault(normalize_name(name), cc)
+
+    for cc, idx in most_populous.items():
+        country_records.setdefault(cc, idx)
+    if not country_codes:
+        logger.warning("No country names in the dump, pass countryInfo.txt to resolve countries by name")
+
+    keys.sort()
+    n_records, n_keys = len(population), len(keys)
+    meta = json.dumps({"countries": country_codes, "country_records": country_records}).encode("utf-8")
+
+    off_lat = _align(HEADER.size)
+    off_lng = _align(off_lat + 4 * n_records)
+    off_pop = _align(off_lng + 4 * n_records)
+    off_cc = _align(off_pop + 4 * n_records)
+    off_kind = _align(off_cc + 2 * n_records)
+    off_hash = _align(off_kind + n_records)
+    off_rec = _align(off_hash + 8 * n_keys)
+    off_json = _align(off_rec + 4 * n_keys)
+
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "wb") as f:
+        def write_at(offset: int, data: bytes) -> None:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+
+        f.write(HEADER.pack(MAGIC, VERSION, n_records, n_keys, off_lat, off_lng, off_pop, off_cc,
+                            off_kind, off_hash, off_rec, off_json, len(meta)))
+        write_at(off_lat, lat.tobytes())
+        write_at(off_lng, lng.tobytes())
+        write_at(off_pop, population.tobytes())
+        write_at(off_cc, bytes(country))
+        write_at(off_kind, bytes(kind))
+        write_at(off_hash, array("Q", (k[0] for k in keys)).tobytes())
+        write_at(off_rec, array("I", (k[2] for k in keys)).tobytes())
+        write_at(off_json, meta)
+
+    stats.records = n_records
+    stats.keys = n_keys
+    stats.countries = len(country_records)
+    stats.index_bytes = out.stat().st_size
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query the offline gazetteer index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Turn a GeoNames TSV dump into the index format")
+    build.add_argument("tsv")
+    build.add_argument("index")
+    build.add_argument("--country-info", help="GeoNames countryInfo.txt for country names and codes")
+    build.add_argument("--feature-classes", default="PA", help="GeoNames feature classes to keep")
+    build.add_argument("--min-population", type=int, default=0)
+    build.add_argument("--max-aliases", type=int, default=20)
+
+    lookup = sub.add_parser("lookup", help="Resolve a location and report latency and memory")
+    lookup.add_argument("index")
+    lookup.add_argument("country")
+    lookup.add_argument("city")
+    lookup.add_argument("--street")
+    lookup.add_argument("--repeat", type=int, default=10000)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        start = time.perf_counter()
+        stats = build_index(args.tsv, args.index, args.country_info, args.feature_classes,
+                            args.min_population, args.max_aliases)
+        print(
+            f"Read {stats.rows_read} rows, wrote {stats.records} places, {stats.keys} keys and "
+            f"{stats.countries} countries ({format_bytes(stats.index_bytes)}) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        return
+
+    rss_before = process_rss_bytes()
+    geocoder = GazetteerGeocoder(args.index)
+    location = LLMLocation(country=args.country, city=args.city, street=args.street)
+    print(geocoder.resolve(location))
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        geocoder.resolve(location)
+    per_lookup_us = (time.perf_counter() - start) / args.repeat * 1e6
+    rss_after = process_rss_bytes()
+    rss_delta = format_bytes(rss_after - rss_before) if rss_before and rss_after else "n/a"
+    print(f"{per_lookup_us:.1f}us per lookup, rss +{rss_delta} after loading and querying the index")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.geocoders.base import BaseGeocoder
+
+# Geocoders of the LLM bots by name as "module:Class", selected with the GEOCODER setting
+GEOCODERS: dict[str, str] = {
+    "azure": "src.geocoders.azure:AzureMapsGeocoder",
+    "azure_batch": "src.geocoders.azure_batch:AzureMapsBatchGeocoder",
+    "gazetteer": "src.geocoders.gazetteer:GazetteerGeocoder",
+}
+
+
+def create_geocoder(name: str, **kwargs: Any) -> BaseGeocoder:
+    try:
+        target = GEOCODERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown geocoder {name!r}, choose from {', '.join(GEOCODERS)}") from None
+
+    module_name, class_name = target.split(":")
+    geocoder_class = getattr(importlib.import_module(module_name), class_name)
+    return geocoder_class(**kwargs)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HttpStats:
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+    def format_stats(self) -> str:
+        return (
+            f"requests={self.requests}, connections opened={self.connections_opened}, "
+            f"reused={self.connections_reused}, dns cache hits={self.dns_cache_hits}, "
+            f"misses={self.dns_cache_misses}"
+        )
+
+
+class HttpClient:
+    """
+    Application-scoped aiohttp session with a pooled, keep-alive connector.
+    One instance is shared by all bots and the Teams notifier of a run, so
+    TCP/TLS connections and DNS lookups are reused instead of redone per call.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        total_timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.stats = HttpStats()
+
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HttpClient is not started, use 'async with HttpClient()' or call start()")
+        return self._session
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                trace_configs=[self._trace_config()],
+            )
+            logger.info(
+                f"HTTP session started (limit={self.limit}, per host={self.limit_per_host}, "
+                f"keep-alive={self.keepalive_timeout}s, dns ttl={self.dns_cache_ttl}s)"
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"HTTP session closed: {self.stats.format_stats()}")
+        self._session = None
+
+    async def __aenter__(self) -> HttpClient:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.stats
+
+        async def on_request_start(session, ctx: SimpleNamespace, params) -> None:
+            stats.requests += 1
+
+        async def on_connection_create_end(session, ctx: SimpleNamespace, params) -> None:
+            stats.connections_opened += 1
+
+        async def on_connection_reuseconn(session, ctx: SimpleNamespace, params) -> None:
+            stats.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx: SimpleNamespace, params) -> None:
+            stats.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx: SimpleNamespace, params) -> None:
+            stats.dns_cache_misses += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+
+@asynccontextmanager
+async def use_session(http: Optional[HttpClient]) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yields the shared session of `http` when one is injected, otherwise a
+    short-lived session that is closed afterwards (standalone usage).
+    Either way, callers pass their own `timeout=` per request.
+    """
+    if http is not None:
+        yield await http.start()
+        return
+
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+async def raise_for_status(resp: aiohttp.ClientResponse) -> None:
+    """Like `resp.raise_for_status()`, with the response body as message and the headers kept (e.g. Retry-After)."""
+    if resp.status < 200 or resp.status >= 300:
+        raise aiohttp.ClientResponseError(
+            request_info=resp.request_info,
+            history=resp.history,
+            status=resp.status,
+            message=await resp.text(),
+            headers=resp.headers,
+        )
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar, Optional
+
+import aiohttp
+
+from src.http_client import HttpClient, raise_for_status, use_session
+
+logger = logging.getLogger(__name__)
+
+# multiple of 3, so every chunk encodes to base64 without padding
+_ENCODE_CHUNK = 3 * 64 * 1024
+_DOWNLOAD_CHUNK = 64 * 1024
+
+
+@dataclass
+class ImagePayload:
+    data_uri: str
+    sha256: str
+    content_type: str
+    original_bytes: int
+    sent_bytes: int
+    downloaded_bytes: int
+    from_cache: bool
+    # set when the image was re-encoded, e.g. "1536q85"
+    variant: Optional[str] = None
+
+    @property
+    def content_id(self) -> str:
+        """Identifies the exact image sent: the original hash plus the re-encoding, if any."""
+        return f"{self.sha256}-{self.variant}" if self.variant else self.sha256
+
+    @property
+    def saved_download_bytes(self) -> int:
+        return self.original_bytes - self.downloaded_bytes
+
+    @property
+    def saved_upload_bytes(self) -> int:
+        return self.original_bytes - self.sent_bytes
+
+
+@dataclass
+class ImagePipelineStats:
+    images: int = 0
+    cache_hits: int = 0
+    shared: int = 0
+    original_bytes: int = 0
+    downloaded_bytes: int = 0
+    sent_bytes: int = 0
+
+    def add(self, payload: ImagePayload) -> None:
+        self.images += 1
+        self.cache_hits += int(payload.from_cache)
+        self.original_bytes += payload.original_bytes
+        self.downloaded_bytes += payload.downloaded_bytes
+        self.sent_bytes += payload.sent_bytes
+
+    def format_stats(self) -> str:
+        return (
+            f"images={self.images}, cache hits={self.cache_hits}, shared in-flight={self.shared}, original={self.original_bytes}B, "
+            f"downloaded={self.downloaded_bytes}B, sent={self.sent_bytes}B"
+        )
+
+
+class ImagePipeline:
+    """
+    Fetches round images and turns them into data URIs for the LLM.
+    - `cache_dir`: content-addressed disk cache; blobs are stored by SHA-256 and
+      URLs map to blobs with their ETag, which is revalidated with If-None-Match.
+    - `max_edge`/`quality`: downscale and re-encode as JPEG before encoding (needs Pillow).
+    Downloads are streamed to disk (the cache, or a temporary file without one) and
+    base64 is encoded in chunks straight from disk into one buffer.
+    Concurrent fetches of the same URL share one download; use
+    `ImagePipeline.shared(...)` so every bot of a run uses the same instance.
+    """
+
+    _instances: ClassVar[dict[tuple[Optional[Path], Optional[int], int], ImagePipeline]] = {}
+
+    def __init__(
+        self,
+        cache_dir: Optional[str | Path] = None,
+        max_edge: Optional[int] = None,
+        quality: int = 85,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_edge = max_edge
+        self.quality = quality
+        self.stats = ImagePipelineStats()
+        self._in_flight: dict[str, asyncio.Future[ImagePayload]] = {}
+
+        if self.cache_dir is not None:
+            (self.cache_dir / "blobs").mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / "urls").mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def shared(
+        cls,
+        cache_dir: Optional[str | Path] = None,
+        max_edge: Optional[int] = None,
+        quality: int = 85,
+    ) -> ImagePipeline:
+        key = (Path(cache_dir).resolve() if cache_dir else None, max_edge, quality)
+        if key not in cls._instances:
+            cls._instances[key] = cls(*key)
+        return cls._instances[key]
+
+    async def fetch(self, url: str, http: Optional[HttpClient] = None) -> ImagePayload:
+        """
+        Joins a fetch of the same URL that is already running, or runs one.
+        A failed fetch is reported to every waiter; if the fetching task is
+        cancelled, the next waiter takes over.
+        """
+        while (in_flight := self._in_flight.get(url)) is not None:
+            try:
+                payload = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if in_flight.cancelled():
+                    continue
+                raise
+            self.stats.shared += 1
+            return payload
+
+        future: asyncio.Future[ImagePayload] = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            if self.cache_dir is None:
+                payload = await self._fetch_uncached(url, http)
+            else:
+                payload = await self._fetch_cached(url, http)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved by the caller, avoid the never-retrieved warning
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(url, None)
+
+        future.set_result(payload)
+        self.stats.add(payload)
+        logger.debug(
+            f"Image {payload.sha256[:12]}: original {payload.original_bytes}B, downloaded "
+            f"{payload.downloaded_bytes}B (saved {payload.saved_download_bytes}B), sent "
+            f"{payload.sent_bytes}B (saved {payload.saved_upload_bytes}B)"
+        )
+        return payload
+
+    async def _fetch_uncached(self, url: str, http: Optional[HttpClient]) -> ImagePayload:
+        async with use_session(http) as session:
+            async with session.get(url) as resp:
+                await raise_for_status(resp)
+                path, sha256, original_bytes = await self._download(resp)
+                content_type = resp.headers.get("Content-Type", "image/jpeg")
+
+        sent = path
+        try:
+            if self.max_edge:
+                sent, content_type = await asyncio.to_thread(self._downscaled_blob, path, content_type)
+            data_uri = await asyncio.to_thread(self._encode_file, sent, content_type)
+            sent_bytes = await asyncio.to_thread(os.path.getsize, sent)
+        finally:
+            path.unlink(missing_ok=True)
+            sent.unlink(missing_ok=True)
+
+        return ImagePayload(
+            variant=self._variant() if sent != path else None,
+            data_uri=data_uri,
+            sha256=sha256,
+            content_type=content_type,
+            original_bytes=original_bytes,
+            sent_bytes=sent_bytes,
+            downloaded_bytes=original_bytes,
+            from_cache=False,
+        )
+
+    async def _fetch_cached(self, url: str, http: Optional[HttpClient]) -> ImagePayload:
+        assert self.cache_dir is not None
+        meta_path = self.cache_dir / "urls" / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+        meta = await asyncio.to_thread(self._read_meta, meta_path)
+
+        downloaded = 0
+        from_cache = meta is not None and not meta.get("etag")
+        if not from_cache:
+            headers = {"If-None-Match": meta["etag"]} if meta and meta.get("etag") else {}
+            async with use_session(http) as session:
+                async with session.get(url, headers=headers) as resp:
+                    if resp.status == 304 and meta is not None:
+                        from_cache = True
+                    else:
+                        await raise_for_status(resp)
+                        sha256, downloaded = await self._store_blob(resp)
+                        meta = {
+                            "sha256": sha256,
+                            "etag": resp.headers.get("ETag"),
+                            "content_type": resp.headers.get("Content-Type", "image/jpeg"),
+                        }
+                        await asyncio.to_thread(meta_path.write_text, json.dumps(meta))
+
+        assert meta is not None
+        blob = self.cache_dir / "blobs" / meta["sha256"]
+        original_bytes = await asyncio.to_thread(os.path.getsize, blob)
+        content_type = meta["content_type"]
+        if self.max_edge:
+            blob, content_type = await asyncio.to_thread(self._downscaled_blob, blob, content_type)
+
+        data_uri = await asyncio.to_thread(self._encode_file, blob, content_type)
+        sent_bytes = await asyncio.to_thread(os.path.getsize, blob)
+        return ImagePayload(
+            variant=self._variant() if blob.name != meta["sha256"] else None,
+            data_uri=data_uri,
+            sha256=meta["sha256"],
+            content_type=content_type,
+            original_bytes=original_bytes,
+            sent_bytes=sent_bytes,
+            downloaded_bytes=downloaded,
+            from_cache=from_cache,
+        )
+
+    def _read_meta(self, meta_path: Path) -> Optional[dict]:
+        """The cached entry for a URL, or None when it or its blob is missing."""
+        assert self.cache_dir is not None
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if not (self.cache_dir / "blobs" / meta["sha256"]).exists():
+            return None
+        return meta
+
+    async def _store_blob(self, resp: aiohttp.ClientResponse) -> tuple[str, int]:
+        """Streams the body to a temporary file while hashing it, then moves it to its content address."""
+        assert self.cache_dir is not None
+        path, sha256, size = await self._download(resp, self.cache_dir / "blobs")
+        try:
+            await asyncio.to_thread(os.replace, path, self.cache_dir / "blobs" / sha256)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        return sha256, size
+
+    @staticmethod
+    async def _download(resp: aiohttp.ClientResponse, directory: Optional[Path] = None) -> tuple[Path, str, int]:
+        """Streams the body to a new temporary file in `directory` (default: the system's), returns it with its SHA-256 and size."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in resp.content.iter_chunked(_DOWNLOAD_CHUNK):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return Path(tmp_name), digest.hexdigest(), size
+
+    def _downscaled_blob(self, blob: Path, content_type: str) -> tuple[Path, str]:
+        """Derived blobs are cached next to the original, keyed by size and quality."""
+        derived = blob.with_name(f"{blob.name}-{self._variant()}")
+        if derived.exists():
+            return derived, "image/jpeg"
+
+        content, new_type = self._downscale(blob.read_bytes(), content_type)
+        if new_type == content_type and len(content) == blob.stat().st_size:
+            return blob, content_type
+        derived.write_bytes(content)
+        return derived, new_type
+
+    def _variant(self) -> str:
+        return f"{self.max_edge}q{self.quality}"
+
+    def _downscale(self, content: bytes, content_type: str) -> tuple[bytes, str]:
+        try:
+            from PIL import Image
+        except ImportError:
+            logger.warning("Pillow is not installed, sending images at full resolution")
+            return content, content_type
+
+        with Image.open(io.BytesIO(content)) as img:
+            if max(img.size) <= (self.max_edge or 0):
+                return content, content_type
+            img.thumbnail((self.max_edge, self.max_edge))
+            out = io.BytesIO()
+            img.convert("RGB").save(out, format="JPEG", quality=self.quality, optimize=True)
+
+        resized = out.getvalue()
+        if len(resized) >= len(content):
+            return content, content_type
+        return resized, "image/jpeg"
+
+    @staticmethod
+    def _encode_file(path: Path, content_type: str) -> str:
+        buffer = bytearray(f"data:{content_type};base64,".encode("ascii"))
+        with open(path, "rb") as f:
+            while chunk := f.read(_ENCODE_CHUNK):
+                buffer += base64.b64encode(chunk)
+        return buffer.decode("ascii")
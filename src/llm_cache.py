@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, ClassVar, Optional
+
+from src.model import LLMGuessResponse
+
+logger = logging.getLogger(__name__)
+
+# A computed answer together with the total tokens it cost
+LLMResult = tuple[LLMGuessResponse, int]
+
+
+@dataclass
+class LLMCacheStats:
+    hits: int = 0
+    misses: int = 0
+    shared: int = 0
+    tokens_avoided: int = 0
+
+    def format_stats(self) -> str:
+        return (
+            f"hits={self.hits}, misses={self.misses}, shared in-flight={self.shared}, "
+            f"tokens avoided={self.tokens_avoided}"
+        )
+
+
+def llm_cache_key(image_id: str, system_prompt: str, model: str, reasoning_effort: str) -> str:
+    """`image_id` is the content hash of the image sent (see ImagePayload.content_id)."""
+    prompt_sha256 = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    raw = json.dumps([image_id, prompt_sha256, model, reasoning_effort])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of parsed LLM answers, keyed by `llm_cache_key`.
+    Concurrent requests for the same key share a single model call (single-flight).
+    Use `LLMResponseCache.shared(path)` so every bot of a run uses the same
+    instance and therefore the same in-flight calls.
+
+    `get` and `put` block on SQLite, so async callers run them with
+    `asyncio.to_thread`; they are thread-safe.
+    """
+
+    _instances: ClassVar[dict[Path, LLMResponseCache]] = {}
+
+    def __init__(self, path: str | Path, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.stats = LLMCacheStats()
+        self._in_flight: dict[str, asyncio.Future[LLMResult]] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_response (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        logger.info(f"LLM response cache opened at {self.path}")
+
+    @classmethod
+    def shared(cls, path: str | Path, ttl_seconds: float = 7 * 24 * 3600) -> LLMResponseCache:
+        resolved = Path(path).resolve()
+        if resolved not in cls._instances:
+            cls._instances[resolved] = cls(resolved, ttl_seconds)
+        return cls._instances[resolved]
+
+    def get(self, key: str) -> Optional[LLMResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, total_tokens, created_at FROM llm_response WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            response, total_tokens, created_at = row
+            if time.time() - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_response WHERE key = ?", (key,))
+                return None
+        return LLMGuessResponse.model_validate_json(response), total_tokens
+
+    def put(self, key: str, result: LLMResult) -> None:
+        response, total_tokens = result
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response (key, response, total_tokens, created_at) VALUES (?, ?, ?, ?)",
+                (key, response.model_dump_json(), total_tokens, time.time()),
+            )
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[LLMResult]]) -> LLMGuessResponse:
+        """
+        Returns the cached answer, joins an identical call that is already running,
+        or runs `compute` and stores its result. A failed call is reported to every
+        waiter; if the calling task is cancelled, the next waiter takes over.
+        The call stays in flight until its result is stored, so no waiter misses both.
+        """
+        while True:
+            cached = await asyncio.to_thread(self.get, key)
+            if cached is not None:
+                self.stats.hits += 1
+                self.stats.tokens_avoided += cached[1]
+                return cached[0]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            try:
+                response, total_tokens = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if in_flight.cancelled():
+                    continue
+                raise
+            self.stats.shared += 1
+            self.stats.tokens_avoided += total_tokens
+            return response
+
+        self.stats.misses += 1
+        future: asyncio.Future[LLMResult] = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await compute()
+            await asyncio.to_thread(self.put, key, result)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved by the caller, avoid the never-retrieved warning
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        future.set_result(result)
+        return result[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
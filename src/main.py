@@ -1,11 +1,16 @@
+import argparse
 import logging
 import asyncio
-from playwright.async_api import async_playwright
+import os
+import time
+from typing import TYPE_CHECKING, Optional
 
-from src.bots.perfect import PerfectBot
-from src.bots.llm import LLMBot
-from src.gameloop import GameLoop
-from src.player import Player
+# Heavy dependencies (playwright, aiohttp, openai, settings) are imported where
+# they are used, so selecting a bot only loads what that bot needs
+if TYPE_CHECKING:
+    from src.bots.base import BaseBot
+    from src.gameloop import GameLoop, GameLoopConfig
+    from src.request_filter import RequestFilterConfig
 
 # Configure logging at module level
 logging.basicConfig(
@@ -16,42 +21,149 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-async def run_bots_parallel(bots, headless: bool = False):
+def required_settings(bots: list["BaseBot"], config: "GameLoopConfig") -> list[str]:
+    """Settings keys the selected bots and the notifier need."""
+    keys = [key for bot in bots for key in bot.required_settings]
+    if config.send_results and not config.webhook_url:
+        keys.append("TEAMS_WEBHOOK_URL")
+    return list(dict.fromkeys(keys))
+
+
+async def run_bots_parallel(
+    bots: list["BaseBot"],
+    headless: bool = False,
+    config: Optional["GameLoopConfig"] = None,
+    request_filter: Optional["RequestFilterConfig"] = None,
+    pool_size: Optional[int] = None,
+    prewarm_contexts: int = 0,
+    return_exceptions: bool = False,
+    browser_endpoint: Optional[str] = None,
+) -> list["GameLoop"]:
+    """
+    Plays the game with every bot in its own browser context. Contexts come from a
+    pool of `pool_size` (default: one per bot); with fewer contexts than bots,
+    bots wait for a free one, which caps the browser's memory.
+    With `return_exceptions`, failed games don't abort the run; see `GameLoop.error`.
+    `browser_endpoint` attaches to a warm browser (see src/browser_server.py) when it is healthy.
+    """
+    from playwright.async_api import async_playwright
+
+    from src.browser_server import connect_or_launch
+    from src.context_pool import ContextPool
+    from src.gameloop import GameLoop, GameLoopConfig
+    from src.http_client import HttpClient
+    from src.metrics import PeakRssMonitor, format_bytes
+    from src.player import Player
+
+    config = config or GameLoopConfig()
+    keys = required_settings(bots, config)
+    if keys:
+        # fail before launching a browser rather than after the first game
+        from src.settings import get_settings
+        get_settings().validate(*keys)
+
     logger.info(f"Starting parallel execution for {len(bots)} bot(s)")
     async with async_playwright() as p:
-        logger.info(f"Launching browser (headless={headless})")
-        browser = await p.chromium.launch(headless=headless,
-        args=["--no-sandbox", "--disable-setuid-sandbox"] if headless else None)
+        start = time.perf_counter()
+        browser, shared = await connect_or_launch(p, browser_endpoint, headless=headless)
+        logger.info(f"Browser ready in {time.perf_counter() - start:.2f}s ({'warm' if shared else 'launched'})")
 
+        http = HttpClient()
+        pool = ContextPool(
+            browser, size=pool_size or len(bots), prewarm=prewarm_contexts, width=1920, height=1080
+        )
+        rss = PeakRssMonitor()
+        rss.start()
         try:
+            await http.start()
+            await pool.start()
+            loops: list[GameLoop] = []
             tasks = []
             for bot in bots:
                 logger.info(f"Setting up player for bot: {bot.name}")
-                player = Player(p, browser, width=1920, height=1080)
-                loop = GameLoop(bot=bot, player=player)
+                bot.use_http(http)
+                player = Player(p, browser, width=1920, height=1080, request_filter=request_filter, pool=pool)
+                loop = GameLoop(bot=bot, player=player, config=config, http=http)
+                loops.append(loop)
                 tasks.append(asyncio.create_task(loop.run()))
 
             logger.info("Running all bot tasks in parallel")
-            await asyncio.gather(*tasks)
-            logger.info("All bots completed successfully")
+            await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+            failed = sum(loop.error is not None for loop in loops)
+            if failed:
+                logger.warning(f"{failed} of {len(loops)} bot(s) failed")
+            else:
+                logger.info("All bots completed successfully")
+            return loops
 
         except Exception as e:
             logger.error(f"Error during bot execution: {e}", exc_info=True)
             raise
         finally:
-            logger.info("Closing browser")
+            await http.close()
+            await pool.close()
+            peak = await rss.stop()
+            if peak is not None:
+                logger.info(f"Peak RSS (this process, driver and browser): {format_bytes(peak)}")
+            logger.info("Disconnecting from warm browser" if shared else "Closing browser")
             await browser.close()
 
-def main() -> None:
+def main(argv: Optional[list[str]] = None) -> None:
+    from src.bots.registry import BOTS, create_bot
+    from src.geocoders.registry import GEOCODERS
+
+    parser = argparse.ArgumentParser(description="Play today's TimeGuessr daily with one or more bots")
+    parser.add_argument(
+        "--bot", dest="bots", action="append", choices=sorted(BOTS),
+        help="Bot to run, repeat for several (default: llm)",
+    )
+    parser.add_argument(
+        "--geocoder", choices=sorted(GEOCODERS),
+        help="Geocoder of the LLM bots (default: the GEOCODER setting, azure)",
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        help="Split the bots over this many processes, each with its own browser (default: all in this process)",
+    )
+    args = parser.parse_args(argv)
+
     try:
+        from src.gameloop import GameLoopConfig
+        from src.request_filter import RequestFilterConfig
+        from src.settings import get_settings
+
+        if args.geocoder:
+            # through the environment, so worker processes pick it up too
+            os.environ["GEOCODER"] = args.geocoder
+            get_settings.cache_clear()
+        bot_names = args.bots or ["llm"]
+        config = GameLoopConfig(
+            pipeline_guesses=True,
+            archive_path=get_settings().ARCHIVE_PATH,
+            # a stuck reasoning call gets hedged, and replaced by a cheap guess rather than failing the game
+            round_deadline_seconds=240,
+            hedge_after_seconds=120,
+        )
+        if args.workers:
+            from functools import partial
+
+            from src.sharding import run_bots_sharded
+
+            asyncio.run(run_bots_sharded(
+                [partial(create_bot, name) for name in bot_names],
+                workers=args.workers,
+                headless=True,
+                config=config,
+                request_filter=RequestFilterConfig(),
+            ))
+            return
+
         asyncio.run(run_bots_parallel(
-            bots=[
-                # PerfectBot(),
-                LLMBot(),
-                # RandomOffsetBot(max_lat_offset=0.01, max_lng_offset=0.01, year_jitter=3, seed=42),
-                # add more bots here later
-            ],
-            headless=True
+            bots=[create_bot(name) for name in bot_names],
+            headless=True,
+            config=config,
+            request_filter=RequestFilterConfig(),
+            browser_endpoint=get_settings().BROWSER_ENDPOINT,
         ))
     except Exception as e:
         logger.info(f"Error running bots: {e}")
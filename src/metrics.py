@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_rss_bytes(pid: int | str = "self") -> Optional[int]:
+    """Resident set size of a process from /proc, None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _child_pids() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # the command name may contain spaces, the parent pid follows its closing bracket
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree_rss_bytes(root_pid: Optional[int] = None) -> Optional[int]:
+    """
+    Summed RSS of a process and all its descendants (for this process: the
+    Playwright driver and every browser process), None where /proc is not available.
+    Shared pages are counted once per process, so this overestimates somewhat.
+    """
+    root = root_pid or os.getpid()
+    if process_rss_bytes(root) is None:
+        return None
+
+    children = _child_pids()
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        total += process_rss_bytes(pid) or 0
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class PeakRssMonitor:
+    """Samples `process_tree_rss_bytes` in the background and keeps the peak."""
+
+    def __init__(self, interval: float = 0.5, root_pid: Optional[int] = None):
+        self.interval = interval
+        self.root_pid = root_pid
+        self.peak_bytes: Optional[int] = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def sample(self) -> None:
+        rss = process_tree_rss_bytes(self.root_pid)
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="peak-rss-monitor")
+
+    async def stop(self) -> Optional[int]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.sample()
+        return self.peak_bytes
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile, `pct` in 0..100."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -99,3 +99,10 @@ class AzureMapsResponse(BaseModel):
     results: list[AzureMapsResult]
 
 
+class AzureMapsBatchItem(BaseModel):
+    statusCode: int
+    response: dict
+
+
+class AzureMapsBatchResponse(BaseModel):
+    batchItems: list[AzureMapsBatchItem]
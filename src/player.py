@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import logging
-from playwright.async_api import Browser, BrowserContext, Page, Playwright
+from typing import Optional
+
+from playwright.async_api import Browser, BrowserContext, Error as PlaywrightError, Page, Playwright
+
+from src.context_pool import ContextPool, PooledContext
+from src.request_filter import RequestFilter, RequestFilterConfig
 
 logger = logging.getLogger(__name__)
 
@@ -13,27 +18,59 @@ class Player:
         browser: Browser,
         width: int = 1920,
         height: int = 1080,
+        request_filter: Optional[RequestFilterConfig] = None,
+        pool: Optional[ContextPool] = None,
     ):
         self.playwright = playwright
         self.browser = browser
         self.width = width
         self.height = height
+        # when set, contexts are checked out of the pool (with its viewport) instead of created
+        self.pool = pool
 
         self.context: BrowserContext | None = None
         self.page: Page | None = None
+        self._pooled: Optional[PooledContext] = None
+        self.request_filter = (
+            RequestFilter(request_filter) if request_filter is not None and request_filter.enabled else None
+        )
 
     async def start(self) -> Page:
-        logger.info(f"Creating browser context with viewport {self.width}x{self.height}")
-        self.context = await self.browser.new_context(
-            viewport={"width": self.width, "height": self.height}
-        )
-        logger.info("Creating new page")
-        self.page = await self.context.new_page()
+        if self.pool is not None:
+            logger.info("Checking out browser context from the pool")
+            self._pooled = await self.pool.acquire()
+            self.context, self.page = self._pooled.context, self._pooled.page
+        else:
+            logger.info(f"Creating browser context with viewport {self.width}x{self.height}")
+            self.context = await self.browser.new_context(
+                viewport={"width": self.width, "height": self.height}
+            )
+            logger.info("Creating new page")
+            self.page = await self.context.new_page()
+        if self.request_filter is not None:
+            await self.request_filter.install(self.page)
         logger.info("Player started successfully")
         return self.page
 
-    async def close(self) -> None:
-        if self.context is not None:
+    async def close(self, discard: bool = False) -> None:
+        """
+        Returns the context to the pool, or closes it when there is no pool.
+        `discard` closes a pooled context as well, e.g. after a failed game. Safe to call twice.
+        """
+        if self.request_filter is not None and self.page is not None:
+            try:
+                await self.request_filter.uninstall(self.page)
+            except PlaywrightError as e:
+                logger.debug(f"Removing the request filter failed: {e}")
+            logger.info(f"Request filter: {self.request_filter.stats.format_stats()}")
+
+        if self._pooled is not None and self.pool is not None:
+            pooled, self._pooled = self._pooled, None
+            logger.info("Returning browser context to the pool")
+            await self.pool.release(pooled, discard=discard)
+        elif self.context is not None:
             logger.info("Closing browser context")
             await self.context.close()
             logger.info("Browser context closed")
+        self.context = None
+        self.page = None
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import math
+import random
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, ClassVar, Iterator, Optional, TypeVar
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# statuses worth another attempt; 429/503 also mean "slow down"
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# absolute event loop time by which the current round must be done, see `deadline`
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("rate_control_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The round deadline passed (or would pass) before the call could succeed."""
+
+    def __init__(self, message: str, until: Optional[float] = None):
+        super().__init__(message)
+        # the deadline (event loop time) that was exceeded, see `deadline`
+        self.until = until
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Bounds every rate-controlled call in this context (including tasks created in it)
+    to `seconds` from now. Nested deadlines keep the earliest one; None adds no bound.
+    """
+    current = _deadline.get()
+    if seconds is not None:
+        until = asyncio.get_running_loop().time() + seconds
+        current = until if current is None else min(current, until)
+    token = _deadline.set(current)
+    try:
+        yield current
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    """Time left until the current deadline, None without one."""
+    until = _deadline.get()
+    return None if until is None else until - asyncio.get_running_loop().time()
+
+
+@dataclass
+class RateControlStats:
+    calls: int = 0
+    throttled: int = 0
+    retries: int = 0
+    failed: int = 0
+    deadline_exceeded: int = 0
+    bucket_wait_seconds: float = 0.0
+    peak_in_flight: int = 0
+
+    def format_stats(self) -> str:
+        return (
+            f"calls={self.calls}, throttled={self.throttled}, retries={self.retries}, failed={self.failed}, "
+            f"deadline exceeded={self.deadline_exceeded}, bucket wait={self.bucket_wait_seconds:.1f}s, "
+            f"peak in flight={self.peak_in_flight}"
+        )
+
+
+@dataclass
+class ThrottleSignal:
+    retryable: bool
+    throttled: bool
+    retry_after: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    Request rate limit of `rate` per second with bursts of up to `burst`, kept as a
+    theoretical arrival time (GCRA) so callers reserve their slot without a lock.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.burst = max(1, burst)
+        self._tat = 0.0
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float) -> None:
+        self.rate = rate
+        self._interval = 1.0 / rate
+        self._tolerance = (self.burst - 1) * self._interval
+
+    def reserve(self, now: float) -> float:
+        """Takes the next slot and returns how long to wait for it."""
+        tat = max(self._tat, now)
+        self._tat = tat + self._interval
+        return max(0.0, tat - self._tolerance - now)
+
+    def pause(self, now: float, seconds: float) -> None:
+        """No slot is handed out for `seconds`, e.g. after a Retry-After."""
+        self._tat = max(self._tat, now + seconds + self._tolerance)
+
+    async def acquire(self) -> float:
+        wait = self.reserve(asyncio.get_running_loop().time())
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit that grows by `increase` per limit's worth of successes and is
+    multiplied by `decrease` on throttling (at most once per `cooldown` seconds, so a
+    burst of 429s from the same overload counts once).
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        minimum: float = 1,
+        maximum: float = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._last_decrease = -math.inf
+
+    def _has_room(self) -> bool:
+        return self.in_flight < max(1, int(self.limit))
+
+    async def acquire(self) -> None:
+        if self._has_room() and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just before the cancellation
+            else:
+                waiter.cancel()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+        self._wake()
+
+    def on_throttle(self) -> bool:
+        """Lowers the limit unless it was lowered within the cooldown; returns whether it was."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        logger.info(f"Throttled, concurrency limit lowered to {self.limit:.1f}")
+        return True
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Seconds from `retry-after-ms` or `Retry-After` (seconds or an HTTP date), None if absent."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(error: BaseException) -> ThrottleSignal:
+    """
+    Whether `error` is worth a retry and a throttling signal. Understands aiohttp's
+    ClientResponseError and the openai client's status and connection errors.
+    """
+    status = getattr(error, "status", None)
+    if not isinstance(status, int):
+        status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        headers = getattr(error, "headers", None)
+        if headers is None:
+            headers = getattr(getattr(error, "response", None), "headers", None)
+        return ThrottleSignal(
+            retryable=status in RETRYABLE_STATUSES,
+            throttled=status in THROTTLE_STATUSES,
+            retry_after=parse_retry_after(headers),
+        )
+
+    openai = sys.modules.get("openai")
+    if isinstance(error, (aiohttp.ClientConnectionError, ConnectionError)) or (
+        openai is not None and isinstance(error, openai.APIConnectionError)
+    ):
+        return ThrottleSignal(retryable=True, throttled=False)
+    return ThrottleSignal(retryable=False, throttled=False)
+
+
+class RateController:
+    """
+    Shared gate in front of one API endpoint. Every call waits for a token of the
+    endpoint's bucket and a slot of its AIMD concurrency limit; throttling lowers both
+    the concurrency limit and the bucket's rate (which recover additively up to the
+    configured `requests_per_second`) and pauses the bucket for the Retry-After.
+    Throttled and transient failures are retried with jittered exponential backoff
+    (at least the Retry-After) until `max_attempts` or the round deadline.
+    Use `RateController.shared(name)` so every bot of a process competes for the same capacity.
+    """
+
+    _instances: ClassVar[dict[str, RateController]] = {}
+    # fraction of every endpoint's configured rate this process may use; sharded workers
+    # (src/sharding.py) each get 1/workers so together they stay within the quota
+    rate_share: ClassVar[float] = 1.0
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: Optional[float] = None,
+        burst: int = 1,
+        initial_concurrency: Optional[float] = None,
+        max_concurrency: float = 32,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        rate_decrease: float = 0.8,
+    ):
+        self.name = name
+        self.max_rate = requests_per_second
+        self.rate_decrease = rate_decrease
+        self.bucket = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        # starts wide open, only throttling signals lower it
+        self.limiter = AIMDLimiter(
+            initial=max_concurrency if initial_concurrency is None else initial_concurrency, maximum=max_concurrency
+        )
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = RateControlStats()
+
+    @classmethod
+    def shared(cls, name: str, **kwargs) -> RateController:
+        """
+        The controller of endpoint `name`; `kwargs` only apply when it is created, with
+        `requests_per_second` scaled by `rate_share`.
+        """
+        if name not in cls._instances:
+            if kwargs.get("requests_per_second"):
+                kwargs["requests_per_second"] *= cls.rate_share
+            cls._instances[name] = cls(name, **kwargs)
+        return cls._instances[name]
+
+    def format_stats(self) -> str:
+        rate = f", rate={self.bucket.rate:.1f}/s" if self.bucket is not None else ""
+        return f"{self.stats.format_stats()}, concurrency limit={self.limiter.limit:.1f}{rate}"
+
+    def _on_success(self) -> None:
+        self.limiter.on_success()
+        if self.bucket is not None and self.max_rate and self.bucket.rate < self.max_rate:
+            # additive increase of the rate as well, one request/s per second's worth of successes
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + 1 / self.bucket.rate))
+
+    def _on_throttle(self, now: float, retry_after: Optional[float]) -> None:
+        self.stats.throttled += 1
+        if not self.limiter.on_throttle() or self.bucket is None:
+            return
+        # the configured rate is more than the endpoint grants right now
+        self.bucket.set_rate(max(self.max_rate / 100, self.bucket.rate * self.rate_decrease))
+        if retry_after:
+            self.bucket.pause(now, retry_after)
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform between 0 and the exponential delay of `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Runs `request()` (a fresh awaitable per attempt) under the endpoint's limits."""
+        self.stats.calls += 1
+        loop = asyncio.get_running_loop()
+        until = _deadline.get()
+        try:
+            async with asyncio.timeout_at(until):
+                return await self._call(request, loop, until)
+        except TimeoutError as e:
+            if until is not None and loop.time() >= until and not isinstance(e, DeadlineExceeded):
+                self.stats.deadline_exceeded += 1
+                raise DeadlineExceeded(f"{self.name}: round deadline passed", until) from e
+            raise
+
+    async def _call(self, request: Callable[[], Awaitable[T]], loop: asyncio.AbstractEventLoop, until: Optional[float]) -> T:
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.bucket is not None:
+                self.stats.bucket_wait_seconds += await self.bucket.acquire()
+            await self.limiter.acquire()
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.limiter.in_flight)
+            try:
+                result = await request()
+            except Exception as e:
+                signal = classify(e)
+                if signal.throttled:
+                    self._on_throttle(loop.time(), signal.retry_after)
+                if not signal.retryable or attempt >= self.max_attempts:
+                    self.stats.failed += 1
+                    raise
+
+                delay = max(self.backoff(attempt), signal.retry_after or 0.0)
+                if until is not None and loop.time() + delay >= until:
+                    self.stats.deadline_exceeded += 1
+                    raise DeadlineExceeded(
+                        f"{self.name}: retrying in {delay:.1f}s would pass the round deadline", until
+                    ) from e
+                self.stats.retries += 1
+                logger.warning(f"{self.name}: attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                self._on_success()
+                return result
+            finally:
+                self.limiter.release()
+            await asyncio.sleep(delay)
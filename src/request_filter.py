@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page, Request, Response, Route
+
+logger = logging.getLogger(__name__)
+
+# Hosts the game needs: the site itself, MapKit JS (script, tiles, services)
+DEFAULT_ALLOW_HOSTS = (
+    "timeguessr.com",
+    "apple-mapkit.com",
+    "apple-cloudkit.com",
+    "ls.apple.com",
+)
+
+# Ads, consent management and analytics loaded by timeguessr.com or its ad stack
+DEFAULT_DENY_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagservices.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "fundingchoicesmessages.google.com",
+    "googleadservices.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "pubmatic.com",
+    "rubiconproject.com",
+    "openx.net",
+    "casalemedia.com",
+    "taboola.com",
+    "outbrain.com",
+    "moatads.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+)
+
+DEFAULT_BLOCK_EXTENSIONS = ("woff", "woff2", "ttf", "otf", "eot", "mp4", "webm", "mp3")
+
+
+@dataclass
+class RequestFilterConfig:
+    enabled: bool = True
+    # allowlisted hosts (and their subdomains) are never blocked
+    allow_hosts: tuple[str, ...] = DEFAULT_ALLOW_HOSTS
+    deny_hosts: tuple[str, ...] = DEFAULT_DENY_HOSTS
+    # fonts and media files are not needed to play
+    block_extensions: tuple[str, ...] = DEFAULT_BLOCK_EXTENSIONS
+
+
+@dataclass
+class RequestFilterStats:
+    blocked: int = 0
+    # size of the aborted requests (URL, headers and body); their responses are never seen
+    blocked_bytes: int = 0
+    allowlisted: int = 0
+    responses: int = 0
+    # Content-Length of the responses that did load, with or without the filter
+    loaded_bytes: int = 0
+    blocked_hosts: Counter[str] = field(default_factory=Counter)
+    blocked_types: Counter[str] = field(default_factory=Counter)
+
+    def format_stats(self) -> str:
+        top_hosts = ", ".join(f"{host}={count}" for host, count in self.blocked_hosts.most_common(5))
+        return (
+            f"blocked={self.blocked} requests of {self.blocked_bytes}B ({top_hosts or 'none'}), "
+            f"types={dict(self.blocked_types)}, allowlisted={self.allowlisted}, "
+            f"responses={self.responses} of {self.loaded_bytes}B loaded"
+        )
+
+
+def _host_matches(host: str, domains: tuple[str, ...]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class RequestFilter:
+    """
+    Aborts ad, analytics and asset requests that are not needed to drive the game.
+    The route is registered with a regular expression, so only candidate requests
+    (denylisted hosts or blocked file types) are sent to Python at all; every
+    other request is handled by the browser without an extra round trip.
+    """
+
+    def __init__(self, config: Optional[RequestFilterConfig] = None):
+        self.config = config or RequestFilterConfig()
+        self.stats = RequestFilterStats()
+        self.pattern = self._build_pattern()
+
+    def _build_pattern(self) -> re.Pattern[str]:
+        hosts = "|".join(re.escape(h) for h in self.config.deny_hosts) or "(?!)"
+        extensions = "|".join(re.escape(e) for e in self.config.block_extensions) or "(?!)"
+        return re.compile(
+            rf"^[a-z]+://([^/?#]*\.)?({hosts})(:[0-9]+)?([/?#]|$)|\.({extensions})([?#]|$)",
+            re.IGNORECASE,
+        )
+
+    async def install(self, page: Page) -> None:
+        await page.route(self.pattern, self._handle)
+        page.on("response", self._on_response)
+        logger.info(
+            f"Request filter installed ({len(self.config.deny_hosts)} denied hosts, "
+            f"{len(self.config.block_extensions)} blocked extensions)"
+        )
+
+    async def uninstall(self, page: Page) -> None:
+        """Removes the route and listener again, e.g. before a pooled page is reused."""
+        page.remove_listener("response", self._on_response)
+        if not page.is_closed():
+            await page.unroute(self.pattern, self._handle)
+
+    def should_block(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if _host_matches(host, self.config.allow_hosts):
+            return False
+        return self.pattern.search(url) is not None
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        if not self.should_block(request.url):
+            self.stats.allowlisted += 1
+            await route.continue_()
+            return
+
+        self.stats.blocked += 1
+        self.stats.blocked_bytes += self._request_bytes(request)
+        self.stats.blocked_hosts[urlsplit(request.url).hostname or ""] += 1
+        self.stats.blocked_types[request.resource_type] += 1
+        await route.abort("blockedbyclient")
+
+    @staticmethod
+    def _request_bytes(request: Request) -> int:
+        # as sent over HTTP/1.1: "name: value\r\n" per header
+        headers = sum(len(name) + len(value) + 4 for name, value in request.headers.items())
+        return len(request.url) + headers + len(request.post_data_buffer or b"")
+
+    def _on_response(self, response: Response) -> None:
+        self.stats.responses += 1
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.stats.loaded_bytes += int(length)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from src.custom_types import Guess
+from src.model import DailyRound, DailyRoundResult, GameResults
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_ROUND_POINTS = 10_000
+
+
+@dataclass(frozen=True)
+class ScoringCurve:
+    """
+    Approximation of TimeGuessr's scoring, 5000 points for location and 5000 for year.
+    - location: -20 points per km up to `linear_km`, exponential decay over `decay_km` beyond that
+    - year: `year_points` for 0..5 years off, then -`points_per_extra_year` per year
+
+    Only three things are fitted, to the shared result of daily #972 (tests/test_scoring.py):
+    the 20 points per km below 1 km (e.g. 935.9 m -> 4981), 4950 points for 1 year off and
+    4600 for 3 years off. Everything else is a guess: the 1 km break, the 1500 km decay,
+    the 5000/4800/4300/3900 points for 0/2/4/5 years off and the 300 points per year beyond.
+    """
+
+    linear_km: float = 1.0
+    points_per_km: float = 20.0
+    decay_km: float = 1500.0
+    year_points: tuple[int, ...] = (5000, 4950, 4800, 4600, 4300, 3900)
+    points_per_extra_year: int = 300
+
+    def location_points(self, distance_km: np.ndarray) -> np.ndarray:
+        km = np.asarray(distance_km, dtype=np.float64)
+        at_break = 5000 - self.points_per_km * self.linear_km
+        points = np.where(
+            km <= self.linear_km,
+            5000 - self.points_per_km * km,
+            at_break * np.exp(-(km - self.linear_km) / self.decay_km),
+        )
+        return np.floor(np.clip(points, 0, 5000)).astype(np.int64)
+
+    def year_points_for(self, year_error: np.ndarray) -> np.ndarray:
+        error = np.abs(np.asarray(year_error, dtype=np.int64))
+        table = np.asarray(self.year_points, dtype=np.int64)
+        last = len(table) - 1
+        beyond = table[last] - (error - last) * self.points_per_extra_year
+        return np.clip(np.where(error <= last, table[np.minimum(error, last)], beyond), 0, 5000)
+
+
+DEFAULT_CURVE = ScoringCurve()
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distance in km, element-wise over arrays (or scalars) in degrees."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lng1, lat2, lng2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def format_distance(distance_km: float) -> str:
+    """Formats a distance like the game does, e.g. "935.9 m" or "12.3 km"."""
+    if distance_km < 1:
+        return f"{distance_km * 1000:.1f} m"
+    return f"{distance_km:.1f} km"
+
+
+def parse_distance(text: str) -> float:
+    """Distance in km from the game's text ("935.9 m", "12.3 km"), NaN if it cannot be parsed."""
+    value, _, unit = text.strip().partition(" ")
+    try:
+        km = float(value.replace(",", ""))
+    except ValueError:
+        return float("nan")
+    return km / 1000 if unit.strip() == "m" else km
+
+
+@dataclass
+class ScoredRounds:
+    distance_km: np.ndarray
+    year_error: np.ndarray
+    location_points: np.ndarray
+    year_points: np.ndarray
+
+    @property
+    def points(self) -> np.ndarray:
+        return self.location_points + self.year_points
+
+    @property
+    def total(self) -> int:
+        return int(self.points.sum())
+
+    def to_game_results(self, daily_number: int = 0) -> GameResults:
+        """The rounds as `GameResults`, e.g. to share them with `format_results`."""
+        rounds = [
+            DailyRoundResult(score=int(points), year=int(error), distance=format_distance(float(km)))
+            for points, error, km in zip(self.points, self.year_error, self.distance_km)
+        ]
+        return GameResults(daily_number=daily_number, total_score=self.total, rounds=rounds)
+
+
+def score_arrays(
+    guess_lat, guess_lng, guess_year, answer_lat, answer_lng, answer_year,
+    curve: ScoringCurve = DEFAULT_CURVE,
+) -> ScoredRounds:
+    """Scores any number of rounds at once; all arguments are array-likes of equal length."""
+    distance_km = haversine_km(guess_lat, guess_lng, answer_lat, answer_lng)
+    year_error = np.abs(np.asarray(guess_year, dtype=np.int64) - np.asarray(answer_year, dtype=np.int64))
+    return ScoredRounds(
+        distance_km=distance_km,
+        year_error=year_error,
+        location_points=curve.location_points(distance_km),
+        year_points=curve.year_points_for(year_error),
+    )
+
+
+def score_guesses(
+    guesses: Sequence[Guess],
+    answers: Sequence[DailyRound],
+    curve: ScoringCurve = DEFAULT_CURVE,
+) -> ScoredRounds:
+    """Scores bot guesses against the `DailyRound` answers of the same rounds."""
+    if len(guesses) != len(answers):
+        raise ValueError(f"Got {len(guesses)} guess(es) for {len(answers)} answer(s)")
+    return score_arrays(
+        [location.lat for location, _ in guesses],
+        [location.lng for location, _ in guesses],
+        [int(year) for _, year in guesses],
+        [answer.Location.lat for answer in answers],
+        [answer.Location.lng for answer in answers],
+        [int(answer.Year) for answer in answers],
+        curve=curve,
+    )
+
@@ -1,4 +1,7 @@
 # config.py
+from functools import lru_cache
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,15 +9,62 @@ class Settings(BaseSettings):
     # ----------------------------
     # Application Keys and Tokens
     # ----------------------------
-    AZURE_OPENAI_ENDPOINT: str
-    AZURE_OPENAI_DEPLOYMENT_NAME: str
-    AZURE_OPENAI_API_KEY: str
-    TEAMS_WEBHOOK_URL: str
-    AZURE_MAPS_KEY: str
+    # Only validated for the bots and notifier that need them, see `required`/`validate`
+    AZURE_OPENAI_ENDPOINT: Optional[str] = None
+    AZURE_OPENAI_DEPLOYMENT_NAME: Optional[str] = None
+    AZURE_OPENAI_API_KEY: Optional[str] = None
+    TEAMS_WEBHOOK_URL: Optional[str] = None
+    AZURE_MAPS_KEY: Optional[str] = None
+
+    # ----------------------------
+    # Optional Caches
+    # ----------------------------
+    GEOCODE_CACHE_PATH: Optional[str] = None
+    IMAGE_CACHE_DIR: Optional[str] = None
+    IMAGE_MAX_EDGE: Optional[int] = None
+    IMAGE_QUALITY: int = 85
+    LLM_CACHE_PATH: Optional[str] = None
+    LLM_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    # directory of the dailies/results archive (src/archive.py)
+    ARCHIVE_PATH: Optional[str] = None
+
+    # ----------------------------
+    # Request rates per endpoint (src/rate_control.py); concurrency adapts to throttling on top
+    # ----------------------------
+    AZURE_OPENAI_REQUESTS_PER_MINUTE: float = 60
+    AZURE_MAPS_REQUESTS_PER_SECOND: float = 50
+
+    # ----------------------------
+    # Geocoder of the LLM bots (src/geocoders/registry.py), e.g. azure_batch
+    # ----------------------------
+    GEOCODER: str = "azure"
+    # send all fallback queries of a location at once (GEOCODER=azure), trading requests for latency
+    GEOCODE_CONCURRENT: bool = False
+    # index built with `python -m src.geocoders.gazetteer build`, for GEOCODER=gazetteer
+    GAZETTEER_INDEX_PATH: Optional[str] = None
+
+    # ----------------------------
+    # Optional warm browser (python -m src.browser_server), e.g. http://127.0.0.1:9222
+    # ----------------------------
+    BROWSER_ENDPOINT: Optional[str] = None
 
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=True, extra="allow"
     )
 
-# Instantiate settings
-settings = Settings()  # ty:ignore[missing-argument]
+    def validate(self, *keys: str) -> None:
+        """Raises ValueError listing every key in `keys` that is not set."""
+        missing = [key for key in keys if not getattr(self, key, None)]
+        if missing:
+            raise ValueError(f"Missing required setting(s): {', '.join(missing)}")
+
+    def required(self, key: str) -> str:
+        self.validate(key)
+        return getattr(self, key)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Reads the environment and .env on first use instead of at import."""
+    return Settings()
+
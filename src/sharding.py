@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Optional
+
+from src.bots.base import BaseBot
+from src.gameloop import GameLoopConfig
+from src.rate_control import RateController
+from src.request_filter import RequestFilterConfig
+from src.teams import send_to_teams
+
+logger = logging.getLogger(__name__)
+
+# Creates a bot inside a worker process. Must be picklable: a bot class,
+# a module level function or a functools.partial of one, e.g. partial(LLMBot, model="gpt-5.2-chat").
+BotFactory = Callable[[], BaseBot]
+
+
+@dataclass
+class BotOutcome:
+    bot_name: str
+    shard: int
+    results: Optional[str] = None
+    error: Optional[str] = None
+    phase_seconds: dict[str, list[float]] = field(default_factory=dict)
+    # path that produced each round's guess, see GameLoop.round_paths
+    round_paths: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.results is not None
+
+
+def split_shards(factories: list[BotFactory], workers: int) -> list[list[BotFactory]]:
+    """Round-robin split, so bots of the same kind end up spread over the workers."""
+    shards = [factories[i::workers] for i in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def _run_shard(
+    shard: int,
+    factories: list[BotFactory],
+    headless: bool,
+    config: GameLoopConfig,
+    request_filter: Optional[RequestFilterConfig],
+    rate_share: float = 1.0,
+) -> list[BotOutcome]:
+    """
+    Worker entry point: plays the shard's games with its own Playwright and browser,
+    using `rate_share` of each API's configured rate (set before the bots create their controllers).
+    """
+    from src.main import run_bots_parallel
+
+    RateController.rate_share = rate_share
+    bots = [factory() for factory in factories]
+    try:
+        loops = asyncio.run(run_bots_parallel(
+            bots, headless=headless, config=config, request_filter=request_filter, return_exceptions=True,
+        ))
+    except Exception as e:
+        return [BotOutcome(bot.name, shard, error=f"{type(e).__name__}: {e}") for bot in bots]
+
+    return [
+        BotOutcome(
+            bot_name=loop.bot.name,
+            shard=shard,
+            results=loop.results,
+            error=f"{type(loop.error).__name__}: {loop.error}" if loop.error is not None else None,
+            phase_seconds=dict(loop.phase_seconds),
+            round_paths=dict(loop.round_paths),
+        )
+        for loop in loops
+    ]
+
+
+def format_aggregated(outcomes: list[BotOutcome]) -> str:
+    message = "\n\n".join(outcome.results for outcome in outcomes if outcome.ok and outcome.results)
+    failed = [outcome for outcome in outcomes if not outcome.ok]
+    if failed:
+        lines = "\n".join(f"- {outcome.bot_name}: {outcome.error}" for outcome in failed)
+        message = f"{message}\n\nFailed ({len(failed)}):\n{lines}".strip()
+    return message
+
+
+async def run_bots_sharded(
+    factories: list[BotFactory],
+    workers: Optional[int] = None,
+    headless: bool = True,
+    config: Optional[GameLoopConfig] = None,
+    request_filter: Optional[RequestFilterConfig] = None,
+) -> list[BotOutcome]:
+    """
+    Like `run_bots_parallel`, but splits the bots over `workers` processes (default:
+    CPU count), each with its own Playwright instance and browser. Workers don't post
+    to Teams; the parent sends a single message with all results and failures. The
+    API rate limits are per process, so every worker gets an equal share of them.
+    """
+    config = config or GameLoopConfig()
+    shards = split_shards(list(factories), max(1, workers or os.cpu_count() or 1))
+    worker_config = replace(config, send_results=False)
+    logger.info(f"Running {len(factories)} bot(s) in {len(shards)} worker process(es)")
+
+    loop = asyncio.get_running_loop()
+    # spawn: workers must not inherit the parent's event loop or Playwright state
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            loop.run_in_executor(
+                pool, _run_shard, i, shard, headless, worker_config, request_filter, 1 / len(shards)
+            )
+            for i, shard in enumerate(shards)
+        ]
+        shard_results = await asyncio.gather(*futures, return_exceptions=True)
+
+    outcomes: list[BotOutcome] = []
+    for i, result in enumerate(shard_results):
+        if isinstance(result, BaseException):
+            logger.error(f"Worker for shard {i} crashed: {result}")
+            outcomes.extend(
+                BotOutcome(f"shard {i} bot {j + 1}", i, error=f"worker crashed: {result}")
+                for j in range(len(shards[i]))
+            )
+        else:
+            outcomes.extend(result)
+
+    failed = sum(not outcome.ok for outcome in outcomes)
+    logger.info(f"Sharded run finished: {len(outcomes) - failed} succeeded, {failed} failed")
+
+    if config.send_results and any(outcome.ok for outcome in outcomes):
+        logger.info("Sending aggregated results to Teams")
+        await send_to_teams(format_aggregated(outcomes), webhook_url=config.webhook_url)
+    return outcomes
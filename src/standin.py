@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import random
+from typing import Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+ROUND_PATHS = ["roundonedaily", "roundtwodaily", "roundthreedaily", "roundfourdaily", "roundfivedaily"]
+
+# 1x1 grey PNG, served as the round image
+ROUND_IMAGE = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNoAAAAggCBd81ytgAAAABJRU5ErkJggg=="
+)
+
+DEFAULT_ROUNDS: list[dict] = [
+    {"Year": "1969", "Location": {"lat": 48.8584, "lng": 2.2945}, "Country": "France"},
+    {"Year": "1987", "Location": {"lat": 40.6892, "lng": -74.0445}, "Country": "United States"},
+    {"Year": "2003", "Location": {"lat": -33.8568, "lng": 151.2153}, "Country": "Australia"},
+    {"Year": "1955", "Location": {"lat": 35.6586, "lng": 139.7454}, "Country": "Japan"},
+    {"Year": "1921", "Location": {"lat": -22.9519, "lng": -43.2105}, "Country": "Brazil"},
+]
+
+HOME_HTML = """<!doctype html>
+<html><head><title>TimeGuessr (stand-in)</title></head>
+<body>
+  <h1>TimeGuessr</h1>
+  <a id="daily" href="/roundonedaily">Daily</a>
+</body></html>"""
+
+# Reproduces the parts of the round page the client relies on: the start overlay, an optional
+# cookie dialog, #googleMap backed by a stubbed `mapkit.maps[0]` (equirectangular projection),
+# #myRange, #makeGuess, #nextRound and the localStorage keys written by the real game.
+ROUND_HTML = """<!doctype html>
+<html><head><title>TimeGuessr (stand-in) - round __ROUND__</title>
+<style>
+  body { margin: 0; font-family: sans-serif; }
+  #start { position: fixed; inset: 0; background: #fff; z-index: 10; }
+  .fc-dialog.fc-choice-dialog { position: fixed; inset: 30% 30%; background: #eee; z-index: 20; }
+  #googleMap { position: absolute; right: 20px; bottom: 20px; width: 320px; height: 220px;
+               transition: width 120ms, height 120ms; background: #8ab; }
+  #googleMap:hover { width: 640px; height: 440px; }
+  .mk-map-view { width: 100%; height: 100%; }
+  #nextRound { display: none; }
+</style></head>
+<body>
+  <div id="start"><button id="continue">Continue to game</button></div>
+  <img id="roundImage" src="/images/__ROUND__.png" width="200" height="200">
+  <input id="myRange" type="range" min="1900" max="2026" value="1963">
+  <button id="makeGuess">Make guess</button>
+  <button id="nextRound">Next round</button>
+  <div id="result"></div>
+  <div id="googleMap"></div>
+<script>
+const ROUND = __ROUND__;
+const ROUND_NAMES = ["one", "two", "three", "four", "five"];
+const NEXT_URL = "__NEXT__";
+const DAILY = __DAILY__;
+const DAILY_NUMBER = "__DAILY_NUMBER__";
+
+if (ROUND === 1) {
+  localStorage.setItem("dailyArray", JSON.stringify(DAILY));
+  localStorage.setItem("dailyNumber", DAILY_NUMBER);
+}
+
+class Coordinate {
+  constructor(latitude, longitude) { this.latitude = latitude; this.longitude = longitude; }
+}
+
+class StubMap {
+  constructor(element) {
+    this.element = element;
+    this.center = new Coordinate(0, 0);
+    this.span = { lat: 180, lng: 360 };
+    this._cameraDistance = 1;
+    this.listeners = {};
+  }
+  get cameraDistance() { return this._cameraDistance; }
+  set cameraDistance(value) {
+    const factor = value / this._cameraDistance;
+    this._cameraDistance = value;
+    this.span = { lat: this.span.lat * factor, lng: this.span.lng * factor };
+    this._regionChanged();
+  }
+  setCenterAnimated(coordinate) { this.center = coordinate; this._regionChanged(); }
+  addEventListener(type, fn) { (this.listeners[type] ||= []).push(fn); }
+  removeEventListener(type, fn) { this.listeners[type] = (this.listeners[type] || []).filter((f) => f !== fn); }
+  _regionChanged() {
+    setTimeout(() => (this.listeners["region-change-end"] || []).slice().forEach((fn) => fn()), 0);
+  }
+  convertCoordinateToPointOnPage(coordinate) {
+    const rect = this.element.getBoundingClientRect();
+    const x = rect.left + rect.width / 2 + (coordinate.longitude - this.center.longitude) / this.span.lng * rect.width;
+    const y = rect.top + rect.height / 2 - (coordinate.latitude - this.center.latitude) / this.span.lat * rect.height;
+    return { x: x + window.scrollX, y: y + window.scrollY };
+  }
+  convertPointOnPageToCoordinate(point) {
+    const rect = this.element.getBoundingClientRect();
+    const x = point.x - window.scrollX, y = point.y - window.scrollY;
+    return new Coordinate(
+      this.center.latitude - (y - rect.top - rect.height / 2) / rect.height * this.span.lat,
+      this.center.longitude + (x - rect.left - rect.width / 2) / rect.width * this.span.lng,
+    );
+  }
+}
+
+function haversineKm(a, b) {
+  const rad = Math.PI / 180;
+  const dLat = (b.lat - a.lat) * rad, dLng = (b.lng - a.lng) * rad;
+  const h = Math.sin(dLat / 2) ** 2 + Math.cos(a.lat * rad) * Math.cos(b.lat * rad) * Math.sin(dLng / 2) ** 2;
+  return 2 * 6371 * Math.asin(Math.sqrt(h));
+}
+
+function formatDistance(km) {
+  return km < 1 ? `${(km * 1000).toFixed(1)} m` : `${km.toFixed(1)} km`;
+}
+
+const YEAR_SCORES = [5000, 4950, 4800, 4600, 4300, 3900];
+
+// same curve as src/scoring.py (DEFAULT_CURVE)
+function score(km, yearDiff) {
+  const location = km <= 1 ? 5000 - 20 * km : 4980 * Math.exp(-(km - 1) / 1500);
+  const year = yearDiff < YEAR_SCORES.length ? YEAR_SCORES[yearDiff] : 3900 - (yearDiff - 5) * 300;
+  return Math.floor(Math.max(0, location)) + Math.max(0, year);
+}
+
+document.getElementById("continue").addEventListener("click", () => {
+  document.getElementById("start").remove();
+  setTimeout(() => {
+    const mapElement = document.getElementById("googleMap");
+    const view = document.createElement("div");
+    view.className = "mk-map-view";
+    mapElement.appendChild(view);
+    window.mapkit = { Coordinate, maps: [new StubMap(mapElement)] };
+    mapElement.addEventListener("click", (event) => {
+      const c = mapkit.maps[0].convertPointOnPageToCoordinate({ x: event.pageX, y: event.pageY });
+      localStorage.setItem("coords", `${c.latitude},${c.longitude}`);
+    });
+    if (__CONSENT__) {
+      const dialog = document.createElement("div");
+      dialog.className = "fc-dialog fc-choice-dialog";
+      dialog.innerHTML = '<button class="fc-cta-do-not-consent">Do not consent</button>';
+      dialog.querySelector("button").addEventListener("click", () => dialog.remove());
+      document.body.appendChild(dialog);
+    }
+  }, __MAP_DELAY_MS__);
+});
+
+document.getElementById("makeGuess").addEventListener("click", () => {
+  const coords = localStorage.getItem("coords");
+  if (!coords) return;
+  const [lat, lng] = coords.split(",").map(Number);
+  const answer = DAILY[ROUND - 1];
+  const km = haversineKm({ lat, lng }, answer.Location);
+  const yearDiff = Math.abs(parseInt(document.getElementById("myRange").value, 10) - parseInt(answer.Year, 10));
+  const name = ROUND_NAMES[ROUND - 1];
+  localStorage.setItem(`${name}Total`, String(score(km, yearDiff)));
+  localStorage.setItem(`${name}Year`, String(yearDiff));
+  localStorage.setItem(`${name}Distance`, formatDistance(km));
+  document.getElementById("result").textContent = `${formatDistance(km)}, ${yearDiff}y`;
+  document.getElementById("nextRound").style.display = "inline-block";
+});
+
+document.getElementById("nextRound").addEventListener("click", () => { window.location.href = NEXT_URL; });
+</script>
+</body></html>"""
+
+FINAL_HTML = """<!doctype html>
+<html><head><title>TimeGuessr (stand-in) - results</title></head>
+<body><h1>Daily complete</h1></body></html>"""
+
+
+def build_standin_app(
+    rounds: Optional[list[dict]] = None,
+    daily_number: int = 1000,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    map_delay_ms: int = 100,
+    consent_dialog: bool = True,
+) -> web.Application:
+    """
+    TimeGuessr stand-in. Every response is delayed by `latency_ms` (+ up to `jitter_ms`),
+    the map becomes usable `map_delay_ms` after "Continue to game". Results posted to
+    `/webhook` are kept in `app["webhook_messages"]`.
+    """
+    rounds = rounds or DEFAULT_ROUNDS
+    webhook_messages: list[dict] = []
+
+    @web.middleware
+    async def latency(request: web.Request, handler):
+        delay = latency_ms + random.uniform(0, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return await handler(request)
+
+    def daily_array(request: web.Request) -> list[dict]:
+        base = f"{request.scheme}://{request.host}"
+        return [
+            {"No": str(i), "URL": f"{base}/images/{i}.png", "Description": f"Stand-in round {i}",
+             "License": "", "StreetView": "", **round_data}
+            for i, round_data in enumerate(rounds, start=1)
+        ]
+
+    async def home(request: web.Request) -> web.Response:
+        return web.Response(text=HOME_HTML, content_type="text/html")
+
+    async def round_page(request: web.Request) -> web.Response:
+        index = ROUND_PATHS.index(request.match_info["round"]) + 1
+        next_url = f"/{ROUND_PATHS[index]}" if index < len(ROUND_PATHS) else "/finalscoredaily"
+        html = (
+            ROUND_HTML.replace("__ROUND__", str(index))
+            .replace("__NEXT__", next_url)
+            .replace("__DAILY__", json.dumps(daily_array(request)))
+            .replace("__DAILY_NUMBER__", str(daily_number))
+            .replace("__CONSENT__", "true" if consent_dialog and index == 1 else "false")
+            .replace("__MAP_DELAY_MS__", str(map_delay_ms))
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def final(request: web.Request) -> web.Response:
+        return web.Response(text=FINAL_HTML, content_type="text/html")
+
+    async def image(request: web.Request) -> web.Response:
+        return web.Response(body=ROUND_IMAGE, content_type="image/png", headers={"ETag": '"standin-round"'})
+
+    async def webhook(request: web.Request) -> web.Response:
+        webhook_messages.append(await request.json())
+        return web.Response(text="1")
+
+    app = web.Application(middlewares=[latency])
+    app["webhook_messages"] = webhook_messages
+    app.router.add_get("/", home)
+    app.router.add_get("/finalscoredaily", final)
+    app.router.add_get(r"/{round:round\w+daily}", round_page)
+    app.router.add_get(r"/images/{index:\d+}.png", image)
+    app.router.add_post("/webhook", webhook)
+    return app
+
+
+class StandInSite:
+    """Serves `build_standin_app` on a free local port for the lifetime of the context."""
+
+    def __init__(self, host: str = "127.0.0.1", **app_options):
+        self.host = host
+        self.app = build_standin_app(**app_options)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.base_url}webhook"
+
+    @property
+    def webhook_messages(self) -> list[dict]:
+        return self.app["webhook_messages"]
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, 0).start()
+        self.base_url = f"http://{self.host}:{self._runner.addresses[0][1]}/"
+        logger.info(f"Stand-in TimeGuessr site serving at {self.base_url}")
+        return self.base_url
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> StandInSite:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+async def run(args: argparse.Namespace) -> None:
+    from src.bots.perfect import PerfectBot
+    from src.gameloop import GameLoopConfig
+    from src.main import run_bots_parallel
+    from src.request_filter import RequestFilterConfig
+
+    async with StandInSite(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms) as site:
+        config = GameLoopConfig(
+            pipeline_guesses=True,
+            fast_guess=args.fast_guess,
+            base_url=site.base_url,
+            webhook_url=site.webhook_url,
+        )
+        await run_bots_parallel(
+            [PerfectBot() for _ in range(args.bots)],
+            headless=True,
+            config=config,
+            request_filter=None if args.no_filter else RequestFilterConfig(),
+        )
+        if len(site.webhook_messages) != args.bots:
+            raise SystemExit(f"Expected {args.bots} result message(s), got {len(site.webhook_messages)}")
+        print(f"{args.bots} game(s) completed against the stand-in:")
+        for message in site.webhook_messages:
+            print(message["text"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play the daily against a local TimeGuessr stand-in")
+    parser.add_argument("--bots", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fast-guess", action="store_true")
+    parser.add_argument("--no-filter", action="store_true", help="Disable the request filter")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable
+
+
+def cancel_and_reap(tasks: Iterable[asyncio.Task]) -> None:
+    """
+    Cancels the tasks still running and marks the exceptions of finished ones as
+    retrieved, for tasks whose results are no longer needed (a race was won, a round
+    failed), so asyncio doesn't log "Task exception was never retrieved" for them.
+    """
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
@@ -1,10 +1,14 @@
 
 import aiohttp
 import asyncio
-from src.settings import settings
+from typing import Optional
+
+from src.http_client import HttpClient, use_session
 import logging
 
-async def send_to_teams(message: str) -> None:
+async def send_to_teams(
+    message: str, http: Optional[HttpClient] = None, webhook_url: Optional[str] = None
+) -> None:
     logger = logging.getLogger(__name__)
     logger.info("Preparing to send message to Teams")
 
@@ -18,11 +22,16 @@ async def send_to_teams(message: str) -> None:
         "text": message
     }
 
+    if webhook_url is None:
+        # imported here so runs with an explicit webhook never load the settings
+        from src.settings import get_settings
+        webhook_url = get_settings().required("TEAMS_WEBHOOK_URL")
+
     try:
         logger.info(f"Sending POST request to Teams webhook")
-        async with aiohttp.ClientSession() as session:
+        async with use_session(http) as session:
             async with session.post(
-                settings.TEAMS_WEBHOOK_URL,
+                webhook_url,
                 json=payload,
                 timeout=aiohttp.ClientTimeout(total=10)
             ) as response:
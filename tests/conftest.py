@@ -0,0 +1,14 @@
+import pytest
+
+from src.settings import get_settings
+
+
+@pytest.fixture
+def settings_env(monkeypatch):
+    """Dummy keys, the tests only talk to local stubs and fakes."""
+    for key in ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_API_KEY",
+                "TEAMS_WEBHOOK_URL", "AZURE_MAPS_KEY"):
+        monkeypatch.setenv(key, "http://localhost")
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
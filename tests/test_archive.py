@@ -0,0 +1,58 @@
+from src.archive import DAILIES, RESULTS, Archive
+from src.model import DailyRound, DailyRoundResult, GameResults, Location
+
+
+def daily(daily_number: int, year: int = 1950) -> list[DailyRound]:
+    return [
+        DailyRound(No=str(i), URL=f"https://example.com/{daily_number}/{i}.jpg", Year=str(year + i),
+                   Location=Location(lat=10.0 * i, lng=-5.0 * i), Country="France" if i % 2 else None)
+        for i in range(1, 6)
+    ]
+
+
+def game(daily_number: int, score: int) -> GameResults:
+    rounds = [DailyRoundResult(score=score + i, year=i, distance=f"{i * 100}.5 m") for i in range(5)]
+    return GameResults(daily_number=daily_number, total_score=sum(r.score for r in rounds), rounds=rounds)
+
+
+def snapshot(archive: Archive):
+    dailies, results = archive.dailies(), archive.results()
+    return (
+        [(d, [r.model_dump() for r in dailies.rounds_for(d)]) for d in dailies.daily_numbers().tolist()],
+        sorted((bot, g.model_dump_json()) for bot, g in results.game_results()),
+    )
+
+
+def test_append_load_compact_keeps_rows_and_drops_duplicates(tmp_path):
+    archive = Archive(tmp_path)
+    archive.append_dailies(971, daily(971))
+    archive.append_dailies(972, daily(972, year=1900))
+    archive.append_dailies(972, daily(972))  # the same daily stored again, newer wins
+    archive.append_results("llm", game(971, 9000), recorded_at=1.0)
+    archive.append_results("llm", game(972, 8000), recorded_at=2.0)
+    archive.append_results("llm", game(972, 9500), recorded_at=3.0)  # rerun of the same game
+    archive.append_results("perfect", game(972, 10_000), recorded_at=4.0)
+
+    before = snapshot(archive)
+    assert len(archive.dailies()) == 10 and len(archive.results()) == 15
+    assert archive.dailies().rounds_for(972) == daily(972)
+    assert archive.results().totals() == {"llm": {971: 45010, 972: 47510}, "perfect": {972: 50010}}
+
+    stats = archive.compact()
+
+    assert (stats[DAILIES].segments_before, stats[DAILIES].rows_before, stats[DAILIES].rows_after) == (3, 15, 10)
+    assert (stats[RESULTS].segments_before, stats[RESULTS].rows_before, stats[RESULTS].rows_after) == (4, 20, 15)
+    assert len(list((tmp_path / DAILIES).iterdir())) == len(list((tmp_path / RESULTS).iterdir())) == 1
+    assert snapshot(Archive(tmp_path)) == before
+    assert archive.has_daily(972) and not archive.has_daily(973)
+
+
+def test_rows_appended_after_compaction_replace_compacted_ones(tmp_path):
+    archive = Archive(tmp_path)
+    archive.append_results("llm", game(972, 8000))
+    archive.append_results("llm", game(972, 8500))
+    archive.compact()
+    archive.append_results("llm", game(972, 9000))
+
+    [(bot, results)] = list(archive.results().game_results())
+    assert bot == "llm" and results == game(972, 9000)
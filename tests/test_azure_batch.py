@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from src.benchmarks.geocoding import build_stub_app
+from src.geocoders.azure_batch import AzureMapsBatchGeocoder
+from src.http_client import HttpClient
+from src.model import LLMLocation
+from src.rate_control import RateController
+
+LATENCY_MS = 100
+
+
+def location(i: int) -> LLMLocation:
+    return LLMLocation(country="France", city=f"Paris {i}", street="Rue de Rivoli")
+
+
+async def with_stub(scenario, batch_window: float = 5.0):
+    runner = web.AppRunner(build_stub_app(latency_ms=LATENCY_MS, jitter_ms=0, max_parts=2))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        async with HttpClient() as http:
+            geocoder = AzureMapsBatchGeocoder(
+                batch_url=f"http://127.0.0.1:{runner.addresses[0][1]}/search/address/batch/sync/json",
+                batch_window=batch_window,
+                rate_control=RateController("stub", max_concurrency=64),
+            )
+            geocoder.use_http(http)
+            return await scenario(geocoder)
+    finally:
+        await runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def _settings(settings_env):
+    yield
+
+
+def test_calls_made_together_share_one_request():
+    async def scenario(geocoder):
+        found = await asyncio.gather(*(geocoder.geocode(location(i)) for i in range(5)))
+        return geocoder.batch_requests, found
+
+    requests, found = asyncio.run(with_stub(scenario))
+    assert requests == 1
+    assert all(loc.lat == pytest.approx(48.8566) for loc in found)
+
+
+def test_lone_call_does_not_wait_for_the_window():
+    async def scenario(geocoder):
+        start = time.perf_counter()
+        await geocoder.geocode(location(0))
+        return time.perf_counter() - start
+
+    # far below the 5 s window
+    assert asyncio.run(with_stub(scenario)) < 1.0
+
+
+def test_calls_during_a_batch_go_out_when_it_finishes():
+    async def scenario(geocoder):
+        start = time.perf_counter()
+        first = asyncio.create_task(geocoder.geocode(location(0)))
+        await asyncio.sleep(LATENCY_MS / 1000 / 4)  # first batch in flight
+        await asyncio.gather(*(geocoder.geocode(location(i)) for i in range(1, 4)))
+        await first
+        return geocoder.batch_requests, time.perf_counter() - start
+
+    requests, seconds = asyncio.run(with_stub(scenario))
+    assert requests == 2
+    assert seconds < 1.0
+
+
+def test_geocode_many_sends_one_request():
+    async def scenario(geocoder):
+        found = await geocoder.geocode_many([location(i) for i in range(10)])
+        return geocoder.batch_requests, found
+
+    requests, found = asyncio.run(with_stub(scenario))
+    assert requests == 1
+    assert len(found) == 10 and all(loc is not None for loc in found)
+
+
+def test_running_flush_is_referenced_until_it_finishes():
+    async def scenario(geocoder):
+        call = asyncio.create_task(geocoder.geocode(location(0)))
+        await asyncio.sleep(LATENCY_MS / 1000 / 4)  # batch in flight, past its window
+        running = set(geocoder._flush_tasks)
+        await call
+        await asyncio.sleep(0)
+        return running, geocoder._flush_task, set(geocoder._flush_tasks)
+
+    running, waiting, remaining = asyncio.run(with_stub(scenario))
+    assert len(running) == 1
+    assert waiting is None and remaining == set()
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from src.geocoders.azure import AzureMapsGeocoder
+from src.http_client import HttpClient
+from src.model import LLMLocation, Location
+from src.rate_control import RateController
+from src.settings import get_settings
+
+LOCATION = LLMLocation(country="France", city="Paris", street="Rue de Rivoli", building="Louvre")
+# the building query finds nothing, so the street query is the most specific result
+MAX_PARTS = 3
+SLOW_SECONDS = 2.0
+
+
+def build_app() -> web.Application:
+    """Answers with a latitude per specificity; queries less specific than the street one are slow."""
+
+    async def search(request: web.Request) -> web.Response:
+        parts = len(request.query["query"].split(","))
+        await asyncio.sleep(0.05 if parts >= MAX_PARTS else SLOW_SECONDS)
+        if parts > MAX_PARTS:
+            return web.json_response({"results": []})
+        return web.json_response({"results": [{"position": {"lat": float(parts), "lon": 2.35}}]})
+
+    app = web.Application()
+    app.router.add_get("/search/address/json", search)
+    return app
+
+
+class RecordingGeocoder(AzureMapsGeocoder):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cancelled: list[str] = []
+
+    async def _geocode_query(self, session, query):
+        try:
+            return await super()._geocode_query(session, query)
+        except asyncio.CancelledError:
+            self.cancelled.append(query)
+            raise
+
+
+async def geocode(concurrent: bool) -> tuple[Location, float, list[str]]:
+    runner = web.AppRunner(build_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        async with HttpClient() as http:
+            geocoder = RecordingGeocoder(
+                concurrent=concurrent,
+                search_url=f"http://127.0.0.1:{runner.addresses[0][1]}/search/address/json",
+                rate_control=RateController("stub", max_concurrency=64),
+            )
+            geocoder.use_http(http)
+            start = time.perf_counter()
+            found = await geocoder.geocode(LOCATION)
+            return found, time.perf_counter() - start, geocoder.cancelled
+    finally:
+        await runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def _settings(settings_env):
+    yield
+
+
+def test_concurrent_matches_sequential_and_cancels_less_specific_queries():
+    sequential, _, _ = asyncio.run(geocode(concurrent=False))
+    concurrent, elapsed, cancelled = asyncio.run(geocode(concurrent=True))
+
+    assert sequential == concurrent == Location(lat=3.0, lng=2.35)
+    assert cancelled == ["Paris, France", "France"]
+    assert elapsed < SLOW_SECONDS
+
+
+def test_concurrent_mode_follows_the_setting(monkeypatch):
+    assert AzureMapsGeocoder().concurrent is False
+    monkeypatch.setenv("GEOCODE_CONCURRENT", "true")
+    get_settings.cache_clear()
+    assert AzureMapsGeocoder().concurrent is True
+    assert AzureMapsGeocoder(concurrent=False).concurrent is False
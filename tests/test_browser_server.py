@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+import src.browser_server
+from src.browser_server import BrowserServer
+
+
+class FakeCDPSession:
+    def __init__(self, browser: "FakeBrowser"):
+        self.browser = browser
+
+    async def send(self, method: str) -> dict:
+        if self.browser.cdp_error:
+            raise PlaywrightError("Target closed")
+        if method == "Target.getBrowserContexts":
+            return {"browserContextIds": list(self.browser.contexts)}
+        if method == "Target.getTargets":
+            return {"targetInfos": [{"type": kind} for kind in self.browser.targets]}
+        raise AssertionError(f"unexpected CDP call {method}")
+
+    async def detach(self) -> None:
+        self.browser.detached += 1
+
+
+class FakeBrowser:
+    """What a run attached over CDP leaves visible: its contexts and targets."""
+
+    def __init__(self):
+        self.contexts: list[str] = []
+        self.targets: list[str] = []
+        self.cdp_error = False
+        self.detached = 0
+        self.closed = False
+
+    async def new_browser_cdp_session(self) -> FakeCDPSession:
+        return FakeCDPSession(self)
+
+    def is_connected(self) -> bool:
+        return not self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def busy(browser: FakeBrowser) -> bool:
+    server = BrowserServer()
+    server.browser = browser
+    return asyncio.run(server._busy())
+
+
+def test_idle_browser_is_not_busy():
+    browser = FakeBrowser()
+    browser.targets = ["browser", "service_worker"]
+    assert not busy(browser)
+    assert browser.detached == 1
+
+
+@pytest.mark.parametrize("contexts, targets", [(["ctx-1"], []), ([], ["page"]), (["ctx-1"], ["page", "page"])])
+def test_browser_with_a_context_or_page_is_busy(contexts, targets):
+    browser = FakeBrowser()
+    browser.contexts, browser.targets = contexts, targets
+    assert busy(browser)
+
+
+def test_browser_that_cannot_be_asked_counts_as_busy():
+    browser = FakeBrowser()
+    browser.cdp_error = True
+    assert busy(browser)
+
+
+def test_serve_recycles_only_once_the_run_is_done(monkeypatch):
+    browsers: list[FakeBrowser] = []
+
+    async def launch(**kwargs) -> FakeBrowser:
+        browser = FakeBrowser()
+        browser.contexts = ["run"]  # a run attaches right away
+        browsers.append(browser)
+        return browser
+
+    class FakePlaywright:
+        async def __aenter__(self):
+            return SimpleNamespace(chromium=SimpleNamespace(launch=launch))
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def healthy(endpoint: str) -> bool:
+        return True
+
+    monkeypatch.setattr(src.browser_server, "async_playwright", FakePlaywright)
+    monkeypatch.setattr(src.browser_server, "endpoint_healthy", healthy)
+
+    async def run() -> tuple[int, bool, int]:
+        # due for recycling at every check
+        server = BrowserServer(health_interval=0.01, recycle_seconds=0)
+        task = asyncio.create_task(server.serve())
+        await asyncio.sleep(0.1)
+        while_busy = server.launches, browsers[0].closed
+        browsers[0].contexts = []  # the run finished
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return *while_busy, server.launches
+
+    launches_while_busy, closed_while_busy, launches = asyncio.run(run())
+    assert (launches_while_busy, closed_while_busy) == (1, False)
+    assert launches == 2 and browsers[0].closed
+    assert browsers[-1].closed  # serve closes its browser on the way out
@@ -0,0 +1,113 @@
+import asyncio
+
+from playwright.async_api import Error as PlaywrightError
+
+from src.context_pool import ContextPool
+
+
+class FakePage:
+    def __init__(self, context: "FakeContext"):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def evaluate(self, script: str) -> None:
+        if self.context.browser.fail_reset:
+            raise PlaywrightError("Target page, context or browser has been closed")
+
+    async def goto(self, url: str) -> None:
+        self.context.visited.append(url)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser"):
+        self.browser = browser
+        self.pages: list[FakePage] = []
+        self.visited: list[str] = []
+        self.cookies_cleared = 0
+        self.closed = False
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def clear_cookies(self) -> None:
+        self.cookies_cleared += 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts: list[FakeContext] = []
+        self.fail_reset = False
+
+    async def new_context(self, viewport: dict) -> FakeContext:
+        await asyncio.sleep(0)
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+
+def test_pool_never_exceeds_its_size():
+    browser = FakeBrowser()
+    pool = ContextPool(browser, size=2)
+
+    async def use() -> None:
+        entry = await pool.acquire()
+        await asyncio.sleep(0.01)
+        await pool.release(entry)
+
+    async def run() -> None:
+        await asyncio.gather(*(use() for _ in range(6)))
+        await pool.close()
+
+    asyncio.run(run())
+    assert len(browser.contexts) == 2
+    assert pool.stats.peak_in_use == 2
+    assert pool.stats.waits > 0
+    assert (pool.stats.created, pool.stats.reused) == (2, 4)
+
+
+def test_released_context_is_reset_and_reused():
+    browser = FakeBrowser()
+    pool = ContextPool(browser, size=1)
+
+    async def run():
+        first = await pool.acquire()
+        await first.context.new_page()  # e.g. a popup the game opened
+        await pool.release(first)
+        second = await pool.acquire()
+        return first, second
+
+    first, second = asyncio.run(run())
+    context = first.context
+    assert second is first and second.uses == 2
+    assert context.cookies_cleared == 1 and context.visited == ["about:blank"]
+    assert [page.closed for page in context.pages] == [False, True]
+    assert not context.closed
+
+
+def test_context_whose_reset_fails_is_discarded():
+    browser = FakeBrowser()
+    pool = ContextPool(browser, size=1)
+
+    async def run():
+        first = await pool.acquire()
+        browser.fail_reset = True
+        await pool.release(first)
+        browser.fail_reset = False
+        second = await pool.acquire()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.context.closed
+    assert second.context is not first.context
+    assert (pool.stats.discarded, pool.stats.created) == (1, 2)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.bots.ensemble import robust_year, spherical_geometric_median
+from src.scoring import haversine_km
+
+
+def total_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray, weights: np.ndarray) -> float:
+    return float((weights * haversine_km(lat, lng, lats, lngs)).sum())
+
+
+def test_majority_at_one_place_is_the_median():
+    lat = np.array([48.8566, 48.8566, 48.8566, 40.7128, -33.8688])
+    lng = np.array([2.3522, 2.3522, 2.3522, -74.006, 151.2093])
+    assert spherical_geometric_median(lat, lng) == pytest.approx((48.8566, 2.3522))
+
+
+def test_symmetric_points_meet_in_the_middle():
+    lat, lng = spherical_geometric_median(np.array([10.0, -10.0, 0.0, 0.0]), np.array([0.0, 0.0, 10.0, -10.0]))
+    assert (lat, lng) == pytest.approx((0.0, 0.0), abs=1e-6)
+
+
+def test_points_around_the_antimeridian_stay_there():
+    lat = np.array([-17.7, -18.1, -16.5, -17.0])
+    lng = np.array([178.4, 179.9, -179.8, -178.6])
+    median_lat, median_lng = spherical_geometric_median(lat, lng)
+    # an average of the longitudes would land near 0, on the other side of the earth
+    assert abs(median_lng) > 178
+    assert -18.1 < median_lat < -16.5
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_median_minimizes_the_weighted_distance(seed):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(30, 60, 7)
+    lng = rng.uniform(170, 200, 7)  # crosses the antimeridian
+    lng = (lng + 180) % 360 - 180
+    weights = rng.uniform(0.5, 2.0, 7)
+
+    median = spherical_geometric_median(lat, lng, weights)
+    best = total_km(*median, lat, lng, weights)
+
+    # no sample and no point close to the median does better
+    for sample in zip(lat, lng):
+        assert best <= total_km(*sample, lat, lng, weights) + 1e-6
+    for d_lat, d_lng in [(0.05, 0), (-0.05, 0), (0, 0.05), (0, -0.05)]:
+        assert best <= total_km(median[0] + d_lat, median[1] + d_lng, lat, lng, weights) + 1e-6
+
+
+def test_robust_year():
+    assert robust_year([1950, 1952, 2020]) == 1952
+    assert robust_year([1950, 1951, 1954, 1960]) == 1952  # median between the middle two, rounded
+    assert robust_year([1900, 1950, 1951, 1952, 2020], trim=0.2) == 1951
+    # trimming never drops every value
+    assert robust_year([1940, 1960], trim=0.5) == 1950
+    assert robust_year([1975]) == 1975
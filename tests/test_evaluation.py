@@ -0,0 +1,63 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from src.archive import Archive
+from src.bots.base import BaseBot
+from src.custom_types import Guess
+from src.evaluation import Checkpoint, evaluate
+from src.model import DailyRound, Location
+
+
+class OffsetBot(BaseBot):
+    """Deterministic guesses some distance and years off; fails the rounds in `fail_rounds`."""
+
+    def __init__(self, name: str, km_per_round: float, fail_rounds: frozenset[int] = frozenset()):
+        self.name = name
+        self.km_per_round = km_per_round
+        self.fail_rounds = fail_rounds
+
+    async def guess_for_round(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        await asyncio.sleep(0)
+        if round_index in self.fail_rounds:
+            raise TimeoutError("model timed out")
+        lat = round_data.Location.lat + self.km_per_round * round_index / 111.2
+        return Location(lat=lat, lng=round_data.Location.lng), int(round_data.Year) + round_index
+
+
+def archived_dailies(root):
+    archive = Archive(root)
+    for daily_number in (970, 971, 972):
+        archive.append_dailies(daily_number, [
+            DailyRound(No=str(i), URL=f"https://example.com/{daily_number}/{i}.jpg", Year=str(1900 + 10 * i),
+                       Location=Location(lat=daily_number / 20 + i, lng=2.0 * i))
+            for i in range(1, 6)
+        ])
+    return archive.dailies()
+
+
+def bots(fail_rounds: frozenset[int] = frozenset()) -> list[BaseBot]:
+    return [OffsetBot("near", 0.5, fail_rounds), OffsetBot("far", 300.0)]
+
+
+def test_resumed_run_matches_a_full_run(tmp_path):
+    dailies = archived_dailies(tmp_path / "archive")
+    checkpoint = tmp_path / "eval.jsonl"
+
+    full = asyncio.run(evaluate(bots(), dailies, concurrency=4))
+
+    interrupted = asyncio.run(evaluate(bots(fail_rounds=frozenset({2, 4})), dailies, checkpoint_path=checkpoint))
+    assert interrupted.summaries[0].failed == 6
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        f.write('{"bot": "far", "daily_nu')  # cut off by the interruption
+
+    resumed = asyncio.run(evaluate(bots(), dailies, concurrency=4, checkpoint_path=checkpoint))
+
+    assert (resumed.resumed, resumed.guessed) == (24, 6)
+    # same guesses, possibly summed in another order
+    assert [vars(s) for s in resumed.summaries] == [pytest.approx(vars(s)) for s in full.summaries]
+    assert sorted(r.key for r in resumed.records) == sorted(r.key for r in full.records)
+    assert (full.summaries[0].rounds, full.summaries[0].failed) == (15, 0)
+    # the retried guesses were stored after the cut off line, not merged into it
+    assert all(record.error is None for record in Checkpoint(checkpoint).load().values())
@@ -0,0 +1,74 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from src.bots.base import BaseBot
+from src.custom_types import Guess
+from src.gameloop import FALLBACK, PRIMARY, GameLoop, GameLoopConfig
+from src.model import DailyRound, Location
+from src.rate_control import RateController
+
+GUESS: Guess = (Location(lat=48.8566, lng=2.3522), 1950)
+FALLBACK_GUESS: Guess = (Location(lat=46.6, lng=2.2), 1950)
+
+
+class FakeBot(BaseBot):
+    """Guesses after `seconds`, or raises `error`; always has a fallback guess."""
+
+    name = "fake"
+
+    def __init__(self, seconds: float = 0.0, error: Optional[BaseException] = None):
+        self.seconds = seconds
+        self.error = error
+
+    async def guess_for_round(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        await asyncio.sleep(self.seconds)
+        if self.error is not None:
+            raise self.error
+        return GUESS
+
+    async def fallback_guess(self, round_index: int, round_data: Optional[DailyRound]) -> Optional[Guess]:
+        return FALLBACK_GUESS
+
+
+def guess(bot: BaseBot, round_deadline_seconds: Optional[float] = 0.2) -> tuple[Guess, GameLoop]:
+    loop = GameLoop(bot=bot, player=None, config=GameLoopConfig(round_deadline_seconds=round_deadline_seconds))
+    return asyncio.run(loop._timed_guess(1, None)), loop
+
+
+def test_guess_within_the_budget_is_the_primary():
+    result, loop = guess(FakeBot())
+    assert result == GUESS
+    assert loop.round_paths == {1: PRIMARY}
+
+
+def test_budget_running_out_uses_the_fallback():
+    result, loop = guess(FakeBot(seconds=5))
+    assert result == FALLBACK_GUESS
+    assert loop.round_paths == {1: FALLBACK}
+
+
+def test_rate_controller_giving_up_before_the_budget_uses_the_fallback():
+    class ThrottledBot(FakeBot):
+        async def guess_for_round(self, round_index, round_data):
+            controller = RateController("throttled")
+
+            async def throttled():
+                # the retry after 10s would pass the 1s budget
+                raise type("Throttled", (Exception,), {"status": 429, "headers": {"Retry-After": "10"}})()
+
+            return await controller.call(throttled)
+
+    result, loop = guess(ThrottledBot(), round_deadline_seconds=1.0)
+    assert result == FALLBACK_GUESS
+    assert loop.round_paths == {1: FALLBACK}
+
+
+@pytest.mark.parametrize("error", [RuntimeError("model unavailable"), TimeoutError("request timed out")])
+@pytest.mark.parametrize("budget", [None, 5.0])
+def test_bot_errors_still_fail_the_round(error, budget):
+    loop = GameLoop(bot=FakeBot(error=error), player=None, config=GameLoopConfig(round_deadline_seconds=budget))
+    with pytest.raises(type(error)):
+        asyncio.run(loop._timed_guess(1, None))
+    assert loop.round_paths == {}
@@ -0,0 +1,116 @@
+import pytest
+
+from src.geocoders.gazetteer import GazetteerGeocoder, build_index, normalize_name
+from src.model import LLMLocation
+
+# GeoNames columns: id, name, asciiname, alternatenames, lat, lng, class, code, country, ..., population (14)
+PLACES = [
+    (1, "Paris", "Paris", "Lutetia,Parigi", 48.8534, 2.3488, "P", "PPLC", "FR", 2_138_551),
+    (2, "Paris", "Paris", "", 33.6609, -95.5555, "P", "PPLS", "US", 24_171),
+    (3, "Springfield", "Springfield", "", 39.8017, -89.6437, "P", "PPLA", "US", 116_250),
+    (4, "Springfield", "Springfield", "", 42.1015, -72.5898, "P", "PPL", "US", 155_929),
+    (5, "São Paulo", "Sao Paulo", "Sampa", -23.5475, -46.6361, "P", "PPLA", "BR", 10_021_295),
+    (6, "New York City", "New York City", "New York,NYC", 40.7143, -74.0060, "P", "PPL", "US", 8_804_190),
+    (7, "Harlem", "Harlem", "", 40.8116, -73.9465, "P", "PPLX", "US", 0),
+    (8, "Broadway", "Broadway", "", 38.6137, -78.7989, "P", "PPL", "US", 3_691),
+    (9, "Toulouse", "Toulouse", "", 43.6047, 1.4442, "P", "PPLA", "FR", 433_055),
+]
+COUNTRY_ROWS = [
+    (10, "France", "France", "Frankreich", 46.0, 2.0, "A", "PCLI", "FR", 66_987_244),
+    (11, "United States", "United States", "USA", 39.76, -98.5, "A", "PCLI", "US", 327_167_434),
+    (12, "Brazil", "Brazil", "Brasil", -10.0, -55.0, "A", "PCLI", "BR", 209_469_333),
+]
+
+
+def write_dump(path, rows):
+    lines = []
+    for gid, name, ascii_name, aliases, lat, lng, cls, code, cc, pop in rows:
+        cols = [str(gid), name, ascii_name, aliases, str(lat), str(lng), cls, code, cc] + [""] * 5 + [str(pop)]
+        lines.append("\t".join(cols))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def geocoder(tmp_path):
+    stats = build_index(write_dump(tmp_path / "dump.txt", PLACES + COUNTRY_ROWS), tmp_path / "index.bin")
+    assert (stats.rows_read, stats.records, stats.countries) == (12, 12, 3)
+    geocoder = GazetteerGeocoder(tmp_path / "index.bin")
+    yield geocoder
+    geocoder.index.close()
+
+
+def resolve(geocoder, country, city, street=None):
+    found = geocoder.resolve(LLMLocation(country=country, city=city, street=street))
+    return None if found is None else (round(found.lat, 2), round(found.lng, 2))
+
+
+def test_normalize_name():
+    assert normalize_name("  São-Paulo ") == "sao paulo"
+    assert normalize_name("SAINT-ÉTIENNE") == "saint etienne"
+
+
+def test_aliases_and_normalized_names(geocoder):
+    assert resolve(geocoder, "Brasil", "sao paulo") == (-23.55, -46.64)
+    assert resolve(geocoder, "Brazil", "Sampa") == (-23.55, -46.64)
+    assert resolve(geocoder, "USA", "NYC") == (40.71, -74.01)
+    assert resolve(geocoder, "fr", "Lutetia") == (48.85, 2.35)
+
+
+def test_country_scopes_the_city(geocoder):
+    assert resolve(geocoder, "France", "Paris") == (48.85, 2.35)
+    assert resolve(geocoder, "United States", "Paris") == (33.66, -95.56)
+
+
+def test_most_populous_place_wins(geocoder):
+    assert resolve(geocoder, "United States", "Springfield") == (42.1, -72.59)
+
+
+def test_street_only_near_the_city(geocoder):
+    assert resolve(geocoder, "United States", "New York", street="Harlem") == (40.81, -73.95)
+    assert resolve(geocoder, "United States", "New York", street="Broadway") == (40.71, -74.01)
+
+
+def test_unknown_city_falls_back_to_the_country(geocoder):
+    assert resolve(geocoder, "France", "Atlantis") == (46.0, 2.0)
+
+
+def test_unknown_country_only_resolves_unambiguous_cities(tmp_path):
+    # no country rows and no countryInfo.txt: "United States" is unknown
+    build_index(write_dump(tmp_path / "dump.txt", PLACES), tmp_path / "index.bin")
+    geocoder = GazetteerGeocoder(tmp_path / "index.bin")
+    try:
+        assert resolve(geocoder, "United States", "Paris") is None
+        assert resolve(geocoder, "United States", "Toulouse") == (43.6, 1.44)
+        assert resolve(geocoder, "Atlantis", "Atlantis") is None
+    finally:
+        geocoder.index.close()
+
+
+def test_country_info_adds_country_names(tmp_path):
+    country_info = tmp_path / "countryInfo.txt"
+    country_info.write_text("#ISO\tISO3\tnumeric\tfips\tCountry\nUS\tUSA\t840\tUS\tUnited States\n", encoding="utf-8")
+    build_index(write_dump(tmp_path / "dump.txt", PLACES), tmp_path / "index.bin", country_info_path=country_info)
+    geocoder = GazetteerGeocoder(tmp_path / "index.bin")
+    try:
+        assert resolve(geocoder, "United States", "Paris") == (33.66, -95.56)
+        # no country row: its most populous place stands in for the country
+        assert resolve(geocoder, "United States", "Atlantis") == (40.71, -74.01)
+    finally:
+        geocoder.index.close()
+
+
+def test_selectable_by_name_with_the_index_setting(tmp_path, monkeypatch, settings_env):
+    from src.geocoders.registry import create_geocoder
+    from src.settings import get_settings
+
+    build_index(write_dump(tmp_path / "dump.txt", PLACES + COUNTRY_ROWS), tmp_path / "index.bin")
+    monkeypatch.setenv("GAZETTEER_INDEX_PATH", str(tmp_path / "index.bin"))
+    get_settings.cache_clear()
+
+    geocoder = create_geocoder("gazetteer")
+    try:
+        assert isinstance(geocoder, GazetteerGeocoder)
+        assert resolve(geocoder, "France", "Paris") == (48.85, 2.35)
+    finally:
+        geocoder.index.close()
@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+
+from aiohttp import web
+
+from src.http_client import HttpClient
+from src.images import ImagePipeline
+
+IMAGE = b"\xff\xd8 not really a jpeg \xff\xd9" * 100
+ETAG = '"v1"'
+
+
+async def with_image_server(scenario, etag: str | None = ETAG, latency: float = 0.05):
+    requests: list[dict] = []
+
+    async def image(request: web.Request) -> web.Response:
+        requests.append(dict(request.headers))
+        await asyncio.sleep(latency)
+        if etag and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        headers = {"ETag": etag} if etag else {}
+        return web.Response(body=IMAGE, content_type="image/jpeg", headers=headers)
+
+    app = web.Application()
+    app.router.add_get("/image.jpg", image)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        async with HttpClient() as http:
+            url = f"http://127.0.0.1:{runner.addresses[0][1]}/image.jpg"
+            return await scenario(url, http), requests
+    finally:
+        await runner.cleanup()
+
+
+def test_cached_image_is_revalidated_with_its_etag(tmp_path):
+    pipeline = ImagePipeline(cache_dir=tmp_path)
+
+    async def scenario(url, http):
+        return await pipeline.fetch(url, http), await pipeline.fetch(url, http)
+
+    (first, second), requests = asyncio.run(with_image_server(scenario))
+
+    assert not first.from_cache and first.downloaded_bytes == len(IMAGE)
+    assert second.from_cache and second.downloaded_bytes == 0
+    assert requests[1]["If-None-Match"] == ETAG
+    assert first.data_uri == second.data_uri
+    assert first.sha256 == second.sha256 == hashlib.sha256(IMAGE).hexdigest()
+    assert pipeline.stats.cache_hits == 1
+
+
+def test_cached_image_without_etag_is_served_from_disk(tmp_path):
+    pipeline = ImagePipeline(cache_dir=tmp_path)
+
+    async def scenario(url, http):
+        await pipeline.fetch(url, http)
+        return await pipeline.fetch(url, http)
+
+    second, requests = asyncio.run(with_image_server(scenario, etag=None))
+
+    assert len(requests) == 1
+    assert second.from_cache and second.original_bytes == len(IMAGE)
+
+
+def test_concurrent_fetches_of_one_url_share_a_download(tmp_path):
+    pipeline = ImagePipeline(cache_dir=tmp_path)
+
+    async def scenario(url, http):
+        return await asyncio.gather(*(pipeline.fetch(url, http) for _ in range(5)))
+
+    payloads, requests = asyncio.run(with_image_server(scenario))
+
+    assert len(requests) == 1
+    assert len({p.data_uri for p in payloads}) == 1
+    assert (pipeline.stats.images, pipeline.stats.shared) == (1, 4)
+
+
+def test_shared_returns_one_pipeline_per_configuration(tmp_path):
+    assert ImagePipeline.shared(tmp_path, 1024, 85) is ImagePipeline.shared(str(tmp_path), 1024, 85)
+    assert ImagePipeline.shared(tmp_path, 1024, 85) is not ImagePipeline.shared(tmp_path, 512, 85)
@@ -0,0 +1,25 @@
+import pytest
+
+from src.benchmarks.importtime import REFERENCE_MODULE, RELATIVE_BUDGETS, SCENARIOS, median_ms, profile, startup_modules
+
+
+@pytest.fixture(scope="module")
+def startup() -> set[str]:
+    return startup_modules()
+
+
+@pytest.mark.parametrize("module", sorted(SCENARIOS))
+def test_entry_module_skips_forbidden_imports(module, startup):
+    _, forbidden = SCENARIOS[module]
+    loaded = set(profile(module, startup).modules)
+    assert not loaded.intersection(forbidden), f"{module} imports {sorted(loaded.intersection(forbidden))}"
+
+
+@pytest.mark.parametrize("module", sorted(RELATIVE_BUDGETS))
+def test_entry_module_stays_within_its_budget(module, startup):
+    reference = median_ms(REFERENCE_MODULE, startup)
+    total = median_ms(module, startup)
+    assert total <= RELATIVE_BUDGETS[module] * reference, (
+        f"import {module} took {total:.1f}ms, {total / reference:.1f}x import {REFERENCE_MODULE} "
+        f"(budget {RELATIVE_BUDGETS[module]:.0f}x)"
+    )
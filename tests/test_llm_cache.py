@@ -0,0 +1,47 @@
+import asyncio
+
+from src.llm_cache import LLMResponseCache
+from src.model import LLMGuessResponse, LLMLocation
+
+ANSWER = LLMGuessResponse(location=LLMLocation(country="France", city="Paris"), year=1950)
+
+
+def test_concurrent_misses_share_one_call_and_later_calls_hit(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return ANSWER, 100
+
+    async def run():
+        first = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(8)))
+        again = await cache.get_or_compute("key", compute)
+        return first, again
+
+    first, again = asyncio.run(run())
+    cache.close()
+
+    assert calls == 1
+    assert first == [ANSWER] * 8 and again == ANSWER
+    assert (cache.stats.misses, cache.stats.shared, cache.stats.hits) == (1, 7, 1)
+    assert cache.stats.tokens_avoided == 800
+
+
+def test_failed_call_is_reported_to_every_waiter_and_not_cached(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite")
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("key") is None
+    cache.close()
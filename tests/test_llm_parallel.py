@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from src.bots.llm import LLMBot
+from src.geocoders.base import BaseGeocoder
+from src.images import ImagePayload
+from src.model import DailyRound, LLMGuessResponse, LLMLocation, Location
+from src.rate_control import RateController
+
+MODEL_SECONDS = 0.3
+ROUNDS = 3
+
+
+class FakeGeocoder(BaseGeocoder):
+    async def geocode(self, location: LLMLocation) -> Location:
+        return Location(lat=48.8566, lng=2.3522)
+
+
+class SlowModelBot(LLMBot):
+    """LLMBot whose model takes MODEL_SECONDS per answer, without network."""
+
+    async def _fetch_image(self, url: str) -> ImagePayload:
+        return ImagePayload(
+            data_uri="data:image/jpeg;base64,", sha256=url, content_type="image/jpeg",
+            original_bytes=0, sent_bytes=0, downloaded_bytes=0, from_cache=False,
+        )
+
+    async def _parse_guess(self, image_uri: str, reasoning_effort: str):
+        await asyncio.sleep(MODEL_SECONDS)
+        return LLMGuessResponse(location=LLMLocation(country="France", city="Paris"), year=1950), 100
+
+
+def daily_round(i: int) -> DailyRound:
+    return DailyRound(No=str(i), URL=f"https://example.com/{i}.jpg", Year="1950",
+                      Location=Location(lat=48.8566, lng=2.3522))
+
+
+async def play(bot_count: int) -> float:
+    rate_control = RateController("fake model", max_concurrency=64)
+    bots = [SlowModelBot(geocoder=FakeGeocoder(), use_cache=False, rate_control=rate_control) for _ in range(bot_count)]
+
+    async def game(bot: LLMBot) -> None:
+        for i in range(ROUNDS):
+            await bot.guess_for_round(i, daily_round(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(game(bot) for bot in bots))
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize("bot_count", [4, 16])
+def test_bots_overlap_on_one_loop(settings_env, bot_count):
+    single = asyncio.run(play(1))
+    many = asyncio.run(play(bot_count))
+    # a blocking model call would make this bot_count times the single bot's time
+    assert single >= ROUNDS * MODEL_SECONDS
+    assert many < single * 1.5
@@ -0,0 +1,32 @@
+import pytest
+
+from src.bots.registry import create_bot
+from src.gameloop import GameLoopConfig
+from src.main import required_settings
+from src.settings import get_settings
+
+KEYS = ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_API_KEY",
+        "TEAMS_WEBHOOK_URL", "AZURE_MAPS_KEY")
+
+
+@pytest.fixture
+def empty_settings(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # no .env either
+    for key in KEYS:
+        monkeypatch.delenv(key, raising=False)
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+def test_missing_keys_are_reported_by_the_settings_validation(empty_settings):
+    bot = create_bot("llm")
+    keys = required_settings([bot], GameLoopConfig())
+
+    with pytest.raises(ValueError, match="Missing required setting"):
+        empty_settings.validate(*keys)
+    assert set(keys) == {"AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_KEY", "AZURE_MAPS_KEY", "TEAMS_WEBHOOK_URL"}
+
+
+def test_perfect_bot_needs_no_keys(empty_settings):
+    assert required_settings([create_bot("perfect")], GameLoopConfig(send_results=False)) == []
@@ -0,0 +1,111 @@
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from src import rate_control
+from src.rate_control import AIMDLimiter, RateController, TokenBucket, classify, parse_retry_after
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve(now=100.0) for _ in range(6)]
+    assert waits == pytest.approx([0, 0, 0, 0.1, 0.2, 0.3])
+
+
+def test_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert bucket.reserve(now=0.0) == 0
+    assert bucket.reserve(now=0.05) == pytest.approx(0.05)
+    # idle for a while: one slot is free again, but no burst builds up
+    assert bucket.reserve(now=10.0) == 0
+    assert bucket.reserve(now=10.0) == pytest.approx(0.1)
+
+
+def test_bucket_pause_delays_the_next_slot():
+    bucket = TokenBucket(rate=10, burst=3)
+    bucket.pause(now=0.0, seconds=2.0)
+    assert bucket.reserve(now=0.0) == pytest.approx(2.0)
+
+
+def test_limiter_increases_additively_and_decreases_multiplicatively(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(rate_control.time, "monotonic", lambda: clock.now)
+    limiter = AIMDLimiter(initial=4, minimum=1, maximum=8, cooldown=1.0)
+
+    for _ in range(4):  # one limit's worth of successes
+        limiter.on_success()
+    assert 4.9 < limiter.limit < 5.0
+
+    assert limiter.on_throttle() is True
+    lowered = limiter.limit
+    assert 2.4 < lowered < 2.5
+
+    clock.now = 0.5  # same overload, within the cooldown
+    assert limiter.on_throttle() is False and limiter.limit == lowered
+
+    clock.now = 2.0
+    for _ in range(3):
+        assert limiter.on_throttle() is True
+        clock.now += 1.0
+    assert limiter.limit == 1.0  # never below the minimum
+
+    for _ in range(1000):
+        limiter.on_success()
+    assert limiter.limit == 8.0  # nor above the maximum
+
+
+def test_throttling_lowers_and_pauses_the_controllers_rate(monkeypatch):
+    monkeypatch.setattr(rate_control.time, "monotonic", lambda: 100.0)
+    controller = RateController("test", requests_per_second=10, burst=1, max_concurrency=8)
+
+    controller._on_throttle(now=0.0, retry_after=3.0)
+    assert controller.bucket.rate == pytest.approx(8.0)
+    assert controller.limiter.limit == 4.0
+    assert controller.bucket.reserve(now=0.0) == pytest.approx(3.0)
+
+    controller._on_success()
+    assert controller.bucket.rate == pytest.approx(8.125)
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        (None, None),
+        ({}, None),
+        ({"Retry-After": "7"}, 7.0),
+        ({"retry-after": "1.5"}, 1.5),
+        ({"retry-after-ms": "250", "Retry-After": "7"}, 0.25),
+        ({"retry-after-ms": "soon", "Retry-After": "7"}, 7.0),
+        ({"Retry-After": "-3"}, 0.0),
+        ({"Retry-After": "not a date"}, None),
+    ],
+)
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_parse_retry_after_http_date():
+    headers = {"Retry-After": formatdate(rate_control.time.time() + 120, usegmt=True)}
+    assert parse_retry_after(headers) == pytest.approx(120, abs=2)
+
+
+def test_classify():
+    throttled = classify(aiohttp.ClientResponseError(None, (), status=429, headers={"Retry-After": "2"}))
+    assert (throttled.retryable, throttled.throttled, throttled.retry_after) == (True, True, 2.0)
+
+    # openai's APIStatusError keeps the headers on its response
+    openai_like = SimpleNamespace(status_code=503, response=SimpleNamespace(headers={"retry-after-ms": "500"}))
+    overloaded = classify(openai_like)
+    assert (overloaded.retryable, overloaded.throttled, overloaded.retry_after) == (True, True, 0.5)
+
+    server_error = classify(aiohttp.ClientResponseError(None, (), status=502))
+    assert (server_error.retryable, server_error.throttled) == (True, False)
+
+    not_found = classify(aiohttp.ClientResponseError(None, (), status=404))
+    assert (not_found.retryable, not_found.throttled) == (False, False)
+
+    assert classify(aiohttp.ServerDisconnectedError()).retryable
+    assert classify(ConnectionResetError()).retryable
+    assert not classify(ValueError("bad answer")).retryable
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.request_filter import RequestFilter, RequestFilterConfig
+
+
+@pytest.mark.parametrize(
+    "url, blocked",
+    [
+        ("https://timeguessr.com/", False),
+        ("https://timeguessr.com/images/round1.jpg", False),
+        # allowlisted hosts are never blocked, not even their fonts
+        ("https://timeguessr.com/fonts/inter.woff2", False),
+        ("https://cdn.apple-mapkit.com/mk/5.x.x/mapkit.js", False),
+        ("https://securepubads.g.doubleclick.net/tag/js/gpt.js", True),
+        ("https://doubleclick.net/", True),
+        ("HTTPS://WWW.GOOGLETAGMANAGER.COM/gtag/js?id=G-1", True),
+        ("https://ad.doubleclick.net:443/ddm/ad", True),
+        ("https://googletagmanager.com?id=1", True),
+        # only the host counts, not a denylisted name elsewhere in the URL
+        ("https://notdoubleclick.net/app.js", False),
+        ("https://example.com/?ref=doubleclick.net", False),
+        ("https://doubleclick.net.example.com/", False),
+        ("https://fonts.gstatic.com/s/inter/v12/inter.woff2", True),
+        ("https://cdn.example.com/media/intro.MP4?v=3", True),
+        ("https://cdn.example.com/video.webm#t=1", True),
+        ("https://cdn.example.com/woff2/loader.js", False),
+        ("https://cdn.example.com/font.woff2.js", False),
+    ],
+)
+def test_should_block(url, blocked):
+    assert RequestFilter().should_block(url) is blocked
+
+
+def test_empty_lists_block_nothing():
+    request_filter = RequestFilter(RequestFilterConfig(deny_hosts=(), block_extensions=()))
+    assert not request_filter.should_block("https://securepubads.g.doubleclick.net/tag/js/gpt.js")
+    assert not request_filter.should_block("https://fonts.gstatic.com/s/inter.woff2")
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str, headers: dict[str, str], body: bytes | None = None):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type, headers=headers, post_data_buffer=body)
+        self.outcome: str | None = None
+
+    async def abort(self, error_code: str) -> None:
+        self.outcome = error_code
+
+    async def continue_(self) -> None:
+        self.outcome = "continued"
+
+
+def test_stats_count_blocked_requests_and_their_bytes():
+    request_filter = RequestFilter()
+    routes = [
+        FakeRoute("https://securepubads.g.doubleclick.net/gpt.js", "script", {"accept": "*/*"}),
+        FakeRoute("https://www.google-analytics.com/collect", "xhr", {"content-type": "text/plain"}, b"v=1&t=pageview"),
+        FakeRoute("https://timeguessr.com/fonts/inter.woff2", "font", {}),
+    ]
+
+    async def handle():
+        for route in routes:
+            await request_filter._handle(route)
+
+    asyncio.run(handle())
+
+    stats = request_filter.stats
+    assert [route.outcome for route in routes] == ["blockedbyclient", "blockedbyclient", "continued"]
+    assert (stats.blocked, stats.allowlisted) == (2, 1)
+    assert stats.blocked_bytes == (
+        len(routes[0].request.url) + len("accept") + len("*/*") + 4
+        + len(routes[1].request.url) + len("content-type") + len("text/plain") + 4 + len(b"v=1&t=pageview")
+    )
+    assert stats.blocked_types == {"script": 1, "xhr": 1}
+    assert f"blocked=2 requests of {stats.blocked_bytes}B" in stats.format_stats()
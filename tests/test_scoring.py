@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.model import DailyRound, DailyRoundResult, GameResults, Location
+from src.scoring import DEFAULT_CURVE, EARTH_RADIUS_KM, MAX_ROUND_POINTS, score_arrays, score_guesses
+
+# The shared result in teams.py: TimeGuessr #972 - 48.269/50.000, as (points, years off, km)
+SAMPLE_972 = [(9931, 1, 0.9359), (9584, 3, 0.7945), (9582, 3, 0.8803), (9585, 3, 0.7298), (9587, 3, 0.6255)]
+
+
+def test_reproduces_daily_972():
+    expected = np.array([points for points, _, _ in SAMPLE_972])
+    year_error = np.array([error for _, error, _ in SAMPLE_972])
+    distance_km = np.array([km for _, _, km in SAMPLE_972])
+
+    points = DEFAULT_CURVE.location_points(distance_km) + DEFAULT_CURVE.year_points_for(year_error)
+
+    assert points.tolist() == expected.tolist()
+    assert points.sum() == 48269
+
+
+def test_random_rounds_stay_in_range():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    scored = score_arrays(
+        rng.uniform(-90, 90, n), rng.uniform(-180, 180, n), rng.integers(1900, 2026, n),
+        rng.uniform(-90, 90, n), rng.uniform(-180, 180, n), rng.integers(1900, 2026, n),
+    )
+    assert ((scored.points >= 0) & (scored.points <= MAX_ROUND_POINTS)).all()
+
+
+def test_scored_guesses_share_like_the_game_results():
+    answers = [
+        DailyRound(No=str(i), URL=f"https://example.com/{i}.jpg", Year="1950", Location=Location(lat=lat, lng=lng))
+        for i, (lat, lng) in enumerate([(48.8566, 2.3522), (-33.8688, 151.2093), (40.7128, -74.006),
+                                        (35.6762, 139.6503), (-22.9068, -43.1729)])
+    ]
+    # each guess lies due north of its answer, so the distance is exact
+    guesses = [
+        (Location(lat=answer.Location.lat + np.degrees(km / EARTH_RADIUS_KM), lng=answer.Location.lng), 1950 + error)
+        for answer, (_, error, km) in zip(answers, SAMPLE_972)
+    ]
+    # the per-round results as the game reports them
+    game = GameResults(
+        daily_number=972,
+        total_score=48269,
+        rounds=[DailyRoundResult(score=9931, year=1, distance="935.9 m"),
+                DailyRoundResult(score=9584, year=3, distance="794.5 m"),
+                DailyRoundResult(score=9582, year=3, distance="880.3 m"),
+                DailyRoundResult(score=9585, year=3, distance="729.8 m"),
+                DailyRoundResult(score=9587, year=3, distance="625.5 m")],
+    )
+
+    results = score_guesses(guesses, answers).to_game_results(daily_number=972)
+
+    assert results == game
+    assert results.format_results() == game.format_results()
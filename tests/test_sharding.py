@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+import src.main
+import src.sharding
+from src.bots.base import BaseBot
+from src.custom_types import Guess
+from src.gameloop import GameLoopConfig
+from src.model import DailyRound, Location
+from src.rate_control import RateController
+from src.sharding import run_bots_sharded
+
+RATE = 12.0
+
+
+class StubBot(BaseBot):
+    """Creates its API's rate controller like the real bots do, in the worker."""
+
+    def __init__(self, name: str, fail: bool = False):
+        self.name = name
+        self.fail = fail
+        self.rate_control = RateController.shared(f"stub api {name}", requests_per_second=RATE)
+
+    async def guess_for_round(self, round_index: int, round_data: Optional[DailyRound]) -> Guess:
+        return Location(lat=0.0, lng=0.0), 1950
+
+
+class InlinePool(ThreadPoolExecutor):
+    """Runs the shards in threads of this process, so the stubs below apply."""
+
+    def __init__(self, max_workers: int, mp_context=None):
+        super().__init__(max_workers)
+
+
+async def fake_run_bots_parallel(bots, config, **kwargs):
+    assert not config.send_results  # workers leave the Teams message to the parent
+    return [
+        SimpleNamespace(
+            bot=bot,
+            results=None if bot.fail else f"{bot.name}: {bot.rate_control.bucket.rate:g}/s",
+            error=RuntimeError("game failed") if bot.fail else None,
+            phase_seconds={},
+            round_paths={1: "primary"},
+        )
+        for bot in bots
+    ]
+
+
+@pytest.fixture
+def stubbed(monkeypatch):
+    messages: list[str] = []
+
+    async def send_to_teams(message: str, webhook_url=None) -> None:
+        messages.append(message)
+
+    monkeypatch.setattr(src.sharding, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(src.sharding, "send_to_teams", send_to_teams)
+    monkeypatch.setattr(src.main, "run_bots_parallel", fake_run_bots_parallel)
+    monkeypatch.setattr(RateController, "_instances", {})
+    monkeypatch.setattr(RateController, "rate_share", 1.0)
+    return messages
+
+
+def test_workers_share_the_rate_and_the_parent_sends_one_message(stubbed):
+    factories = [partial(StubBot, f"bot {i}") for i in range(3)] + [partial(StubBot, "bot 3", fail=True)]
+
+    outcomes = asyncio.run(run_bots_sharded(factories, workers=2, config=GameLoopConfig(webhook_url="http://teams")))
+
+    assert [(o.bot_name, o.shard, o.ok) for o in outcomes] == [
+        ("bot 0", 0, True), ("bot 2", 0, True), ("bot 1", 1, True), ("bot 3", 1, False),
+    ]
+    # every worker gets half of each API's configured rate
+    assert {o.results for o in outcomes if o.ok} == {f"bot {i}: {RATE / 2:g}/s" for i in range(3)}
+    assert len(stubbed) == 1
+    assert stubbed[0] == "bot 0: 6/s\n\nbot 2: 6/s\n\nbot 1: 6/s\n\nFailed (1):\n- bot 3: RuntimeError: game failed"
+
+
+def test_cli_workers_run_the_selected_bots_sharded(monkeypatch, settings_env):
+    calls = []
+
+    async def fake_run_bots_sharded(factories, workers, **kwargs):
+        calls.append(([factory().name for factory in factories], workers))
+
+    monkeypatch.setattr(src.sharding, "run_bots_sharded", fake_run_bots_sharded)
+    src.main.main(["--bot", "perfect", "--bot", "random_offset", "--workers", "2"])
+
+    assert len(calls) == 1
+    names, workers = calls[0]
+    assert workers == 2 and len(names) == 2
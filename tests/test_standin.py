@@ -0,0 +1,53 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.client import TimeGuessrClient
+from src.standin import StandInSite
+
+
+def chromium_installed() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            return Path(p.chromium.executable_path).exists()
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not chromium_installed(), reason="Playwright's Chromium is not installed")
+
+
+def test_perfect_bot_plays_the_standin(monkeypatch):
+    from src.bots.perfect import PerfectBot
+    from src.gameloop import GameLoopConfig
+    from src.main import run_bots_parallel
+    from src.request_filter import RequestFilterConfig
+
+    results_round_trips: list[int] = []
+    get_game_results = TimeGuessrClient.get_game_results
+
+    async def counted(self):
+        before = self.total_round_trips
+        results = await get_game_results(self)
+        results_round_trips.append(self.total_round_trips - before)
+        return results
+
+    monkeypatch.setattr(TimeGuessrClient, "get_game_results", counted)
+
+    async def play():
+        async with StandInSite() as site:
+            config = GameLoopConfig(pipeline_guesses=True, base_url=site.base_url, webhook_url=site.webhook_url)
+            loops = await run_bots_parallel(
+                [PerfectBot()], headless=True, config=config, request_filter=RequestFilterConfig(),
+            )
+            return loops, list(site.webhook_messages)
+
+    loops, messages = asyncio.run(play())
+
+    assert [loop.error for loop in loops] == [None]
+    assert len(messages) == 1
+    # one localStorage snapshot for all results
+    assert results_round_trips == [1]